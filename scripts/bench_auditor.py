@@ -0,0 +1,104 @@
+import os
+import sys
+import time
+import shutil
+import argparse
+import tempfile
+import logging
+import numpy as np
+import pandas as pd
+
+# Añadir el directorio raíz al path para que encuentre 'src'
+root_dir = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+if root_dir not in sys.path:
+    sys.path.insert(0, root_dir)
+
+from src.utils.auditor import DataAuditor
+
+def build_table(schema, base_days, scale, random_state):
+    """
+    Tabla sintética `scale` veces el histórico diario (`base_days`), con el contrato de la tabla.
+    Las fechas se repiten por bloque (como varias sedes) y se inyectan nulos y centinelas.
+    """
+    rng = np.random.default_rng(random_state)
+    rows = base_days * scale
+    dates = pd.date_range("2018-01-01", periods=base_days, freq="D")
+    data = {}
+    for col, col_type in schema.items():
+        if col_type == "datetime":
+            data[col] = np.tile(dates.values, scale)
+        elif col_type == "int":
+            data[col] = rng.integers(0, 5000, size=rows)
+        elif col_type == "float":
+            values = rng.normal(100, 15, size=rows).round(2)
+            values[rng.random(rows) < 0.01] = np.nan
+            values[rng.random(rows) < 0.005] = -999
+            data[col] = values
+        else:
+            data[col] = rng.choice(["Ninguna", "Ligera", "Fuerte", "N/A"], size=rows)
+    return pd.DataFrame(data)
+
+def best_of(fn, repeat):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+def time_incremental(auditor, df, table, rows_per_day, repeat):
+    """
+    Auditoría incremental del último día (`rows_per_day` filas) sobre el estado del resto de la tabla.
+    El estado se restaura antes de cada repetición para medir siempre el mismo delta.
+    """
+    history = df.iloc[:len(df) - rows_per_day]
+    with tempfile.TemporaryDirectory() as work_dir:
+        state_path = os.path.join(work_dir, f"{table}.audit.json")
+        auditor.audit_dataframe(history, table, state_path=state_path, merge_stats={"inserted": len(history)})
+        shutil.copy(state_path, f"{state_path}.base")
+
+        def audit_delta():
+            shutil.copy(f"{state_path}.base", state_path)
+            auditor.audit_dataframe(df, table, state_path=state_path,
+                                    merge_stats={"inserted": rows_per_day, "updated": 0})
+        return best_of(audit_delta, repeat)
+
+def run_benchmark(base_days, scales, repeat):
+    """
+    Compara el auditor legacy (pandas, un recorrido por métrica) con el perfilador columnar sobre la tabla
+    completa, y con la auditoría incremental (estado fusionable + delta de un día).
+    """
+    auditors = {}
+    for engine in DataAuditor.ENGINES:
+        auditor = DataAuditor()
+        auditor.engine = engine
+        auditors[engine] = auditor
+
+    random_state = auditors["legacy"].config["general"]["random_state"]
+    results = {}
+    print(f"\nBenchmark de auditoría (histórico base {base_days} días, mejor de {repeat})")
+    print(f"  {'tabla':<16}{'escala':>8}{'filas':>10}{'legacy':>11}{'columnar':>11}{'speedup':>9}{'delta 1 día':>13}")
+    for scale in scales:
+        for table, schema in auditors["legacy"].schemas.items():
+            # Orden por fecha, como la tabla que persiste el raw store (el delta son las últimas filas)
+            df = build_table(schema, base_days, scale, random_state).sort_values("fecha", kind="stable", ignore_index=True)
+            timings = {
+                engine: best_of(lambda: auditor.audit_dataframe(df, table), repeat)
+                for engine, auditor in auditors.items()
+            }
+            timings["incremental"] = time_incremental(auditors["columnar"], df, table, scale, repeat)
+            results[(table, scale)] = timings
+            print(f"  {table:<16}{scale:>7}x{len(df):>10}{timings['legacy']:>10.3f}s"
+                  f"{timings['columnar']:>10.3f}s{timings['legacy'] / timings['columnar']:>8.1f}x"
+                  f"{timings['incremental']:>12.3f}s")
+    return results
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark del auditor legacy vs el perfilador columnar")
+    parser.add_argument("--base-days", type=int, default=3300)
+    parser.add_argument("--scales", type=int, nargs="+", default=[10, 100])
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    logging.getLogger().setLevel(logging.WARNING)
+    run_benchmark(args.base_days, args.scales, args.repeat)
@@ -0,0 +1,86 @@
+import os
+import sys
+import time
+import argparse
+import warnings
+import numpy as np
+import pandas as pd
+
+# Añadir el directorio raíz al path para que encuentre 'src'
+root_dir = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+if root_dir not in sys.path:
+    sys.path.insert(0, root_dir)
+
+from src.utils.config_loader import load_config
+from src.utils.sentinels import SentinelReplacer
+
+def build_table(schema, base_days, scale, random_state):
+    """
+    Tabla sintética `scale` veces el histórico diario (`base_days`), con el contrato de la tabla y
+    centinelas inyectados en cada tipo de columna (-999 en numéricas, 'N/A' en texto, 1900-01-01 en fechas).
+    """
+    rng = np.random.default_rng(random_state)
+    rows = base_days * scale
+    dates = pd.date_range("2018-01-01", periods=base_days, freq="D")
+    data = {}
+    for col, col_type in schema.items():
+        if col_type == "datetime":
+            values = np.tile(dates.values, scale)
+            values[rng.random(rows) < 0.001] = np.datetime64("1900-01-01")
+            data[col] = values
+        elif col_type == "int":
+            values = rng.integers(0, 5000, size=rows)
+            values[rng.random(rows) < 0.005] = -999
+            data[col] = values
+        elif col_type == "float":
+            values = rng.normal(100, 15, size=rows).round(2)
+            values[rng.random(rows) < 0.01] = np.nan
+            values[rng.random(rows) < 0.005] = -999
+            data[col] = values
+        else:
+            data[col] = rng.choice(["Ninguna", "Ligera", "Fuerte", "N/A"], size=rows)
+    return pd.DataFrame(data)
+
+def best_of(fn, repeat):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+def run_benchmark(base_days, scales, repeat):
+    """
+    Compara `df.replace(todos_los_centinelas, np.nan)` (reemplazo original de `_clean_table`) con el
+    reemplazo por dtype, verificando que ambos produzcan el mismo DataFrame.
+    """
+    config = load_config()
+    replacer = SentinelReplacer(config["extractions"]["sentinel_values"])
+    random_state = config["general"]["random_state"]
+    results = {}
+    print(f"\nBenchmark de centinelas (histórico base {base_days} días, mejor de {repeat})")
+    print(f"  {'tabla':<16}{'escala':>8}{'filas':>10}{'replace':>11}{'por dtype':>11}{'speedup':>9}")
+    for scale in scales:
+        for table, schema in config["extractions"]["schemas"].items():
+            df = build_table(schema, base_days, scale, random_state)
+            with warnings.catch_warnings():
+                # Aviso de pandas sobre el downcast de `replace` (es el comportamiento que se replica)
+                warnings.simplefilter("ignore", FutureWarning)
+                legacy = df.replace(replacer.all_values, np.nan)
+                timings = {"replace": best_of(lambda: df.replace(replacer.all_values, np.nan), repeat)}
+            result, _ = replacer.replace(df)
+            pd.testing.assert_frame_equal(result, legacy)
+            timings["dtype"] = best_of(lambda: replacer.replace(df), repeat)
+            results[(table, scale)] = timings
+            print(f"  {table:<16}{scale:>7}x{len(df):>10}{timings['replace']:>10.3f}s"
+                  f"{timings['dtype']:>10.3f}s{timings['replace'] / timings['dtype']:>8.1f}x")
+    return results
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark del reemplazo de centinelas: df.replace vs por dtype")
+    parser.add_argument("--base-days", type=int, default=3300)
+    parser.add_argument("--scales", type=int, nargs="+", default=[10, 100])
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    run_benchmark(args.base_days, args.scales, args.repeat)
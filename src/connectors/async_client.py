@@ -0,0 +1,97 @@
+import asyncio
+import logging
+from typing import Any, Dict, List, Optional, Tuple
+import httpx
+
+logger = logging.getLogger(__name__)
+
+class AsyncRangeQuery:
+    """
+    Description of one page request: the subset of PostgREST parameters used by the loader
+    (projection, order on `fecha`, date bounds, limit and offset).
+    """
+
+    def __init__(self, table: str, select: str = "*", order: Optional[str] = "fecha", desc: bool = False,
+                 limit: Optional[int] = None, offset: Optional[int] = None,
+                 lower: Optional[str] = None, lower_inclusive: bool = False,
+                 upper: Optional[str] = None):
+        self.table = table
+        self.select = select
+        self.order = order
+        self.desc = desc
+        self.limit = limit
+        self.offset = offset
+        self.lower = lower
+        self.lower_inclusive = lower_inclusive
+        self.upper = upper
+
+    def to_params(self) -> List[Tuple[str, str]]:
+        """PostgREST query string (a list, since `fecha` may carry two filters)."""
+        params = [("select", self.select)]
+        if self.order:
+            params.append(("order", f"{self.order}.{'desc' if self.desc else 'asc'}"))
+        if self.lower:
+            params.append(("fecha", f"{'gte' if self.lower_inclusive else 'gt'}.{self.lower}"))
+        if self.upper:
+            params.append(("fecha", f"lt.{self.upper}"))
+        if self.limit is not None:
+            params.append(("limit", str(self.limit)))
+        if self.offset:
+            params.append(("offset", str(self.offset)))
+        return params
+
+class AsyncPostgrestClient:
+    """
+    Non-blocking PostgREST client over a single pooled, keep-alive httpx.AsyncClient.
+    `max_connections` caps the sockets opened against Supabase; idle connections are reused
+    across pages and tables instead of paying a new TLS handshake per request.
+    """
+
+    def __init__(self, url: str, key: str, max_connections: int = 8, timeout: float = 30.0):
+        self._client = httpx.AsyncClient(
+            base_url=f"{url.rstrip('/')}/rest/v1",
+            headers={"apikey": key, "Authorization": f"Bearer {key}"},
+            limits=httpx.Limits(max_connections=max_connections, max_keepalive_connections=max_connections),
+            timeout=timeout
+        )
+
+    async def fetch(self, query: AsyncRangeQuery) -> List[Dict[str, Any]]:
+        response = await self._client.get(f"/{query.table}", params=query.to_params())
+        response.raise_for_status()
+        return response.json()
+
+    async def aclose(self) -> None:
+        await self._client.aclose()
+
+class LocalAsyncClient:
+    """
+    Async stand-in over LocalReplayClient: the simulated round trip is an `asyncio.sleep`, so
+    concurrent requests overlap like real network I/O. A semaphore of `max_connections`
+    emulates the connection pool size.
+    """
+
+    def __init__(self, replay_client: Any, max_connections: int = 8):
+        self.replay_client = replay_client
+        self._pool = asyncio.Semaphore(max_connections)
+
+    @property
+    def requests(self) -> int:
+        return self.replay_client.requests
+
+    async def fetch(self, query: AsyncRangeQuery) -> List[Dict[str, Any]]:
+        async with self._pool:
+            await asyncio.sleep(self.replay_client.next_latency())
+            local = self.replay_client.table(query.table).select(query.select)
+            if query.order:
+                local = local.order(query.order, desc=query.desc)
+            if query.lower:
+                local = local.gte("fecha", query.lower) if query.lower_inclusive else local.gt("fecha", query.lower)
+            if query.upper:
+                local = local.lt("fecha", query.upper)
+            if query.limit is not None:
+                start = query.offset or 0
+                local = local.range(start, start + query.limit - 1)
+            return local.collect().data
+
+    async def aclose(self) -> None:
+        return None
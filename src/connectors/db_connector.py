@@ -1,5 +1,7 @@
 import os
 import logging
+from abc import ABC, abstractmethod
+from typing import Any, Optional
 from dotenv import load_dotenv
 from supabase import create_client, Client
 
@@ -7,49 +9,113 @@ from supabase import create_client, Client
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
+class DatabaseBackend(ABC):
+    """
+    Interface for the data sources behind DBConnector.
+    A backend builds a client exposing the PostgREST query surface used by the loader:
+    client.table(name).select(...).order(...).limit(...).range(...).gt/gte/lt(...).execute().
+    """
+
+    name = "abstract"
+
+    @abstractmethod
+    def create_client(self) -> Any:
+        """Builds a new client for this backend."""
+
+    def create_async_client(self, max_connections: int = 8) -> Any:
+        """Builds a non-blocking client exposing `await fetch(AsyncRangeQuery)` (see async_client.py)."""
+        raise NotImplementedError(f"Backend '{self.name}' does not provide an async client")
+
+    def describe(self) -> str:
+        """Human readable target of the backend, used in logs."""
+        return self.name
+
+class SupabaseBackend(DatabaseBackend):
+    """Supabase REST API backend (production source of truth)."""
+
+    name = "supabase"
+
+    def __init__(self, url: str, key: str):
+        self.url = url
+        self.key = key
+
+    def create_client(self) -> Client:
+        return create_client(self.url, self.key)
+
+    def create_async_client(self, max_connections: int = 8) -> Any:
+        from src.connectors.async_client import AsyncPostgrestClient
+        return AsyncPostgrestClient(self.url, self.key, max_connections=max_connections)
+
+    def describe(self) -> str:
+        return self.url
+
 class DBConnector:
     """
-    Class responsible for managing connection to Supabase via REST API.
-    Uses SUPABASE_URL and SUPABASE_KEY (anon/service_role).
+    Class responsible for managing connection to the data source.
+    Default backend is Supabase via REST API, using SUPABASE_URL and SUPABASE_KEY (anon/service_role).
+    The 'local' backend replays a directory of Parquet files offline (see local_backend.py).
     """
-    
-    def __init__(self):
+
+    BACKENDS = ("supabase", "local")
+
+    def __init__(self, backend: Optional[str] = None, default_backend: Optional[str] = None, **options):
         """
         Initializes the connector by loading environment variables from project root.
+        The backend is taken from the argument, then the DB_BACKEND env var, then `default_backend`
+        (the config value, so the env var can override it), then defaults to 'supabase'.
+        Extra options are forwarded to the backend (e.g. local_path, latency_ms for 'local').
         """
         # Search for .env in project root relative to this file
         current_dir = os.path.dirname(os.path.abspath(__file__))
         # src/connectors -> root (../../)
         project_root = os.path.abspath(os.path.join(current_dir, "../.."))
         dotenv_path = os.path.join(project_root, ".env")
-        
+
         if os.path.exists(dotenv_path):
             load_dotenv(dotenv_path=dotenv_path)
             logger.info(f"Loaded .env from {dotenv_path}")
         else:
             load_dotenv()
             logger.info("Loaded .env from default path")
-        
+
+        self.backend_name = backend or os.getenv("DB_BACKEND") or default_backend or "supabase"
+        if self.backend_name not in self.BACKENDS:
+            raise ValueError(f"Unsupported DB backend '{self.backend_name}'. Options: {self.BACKENDS}")
+
         self.url = os.getenv("SUPABASE_URL")
         self.key = os.getenv("SUPABASE_KEY")
-        
-        if not self.url or not self.key:
-            logger.error("Error: SUPABASE_URL or SUPABASE_KEY not found in .env file")
-            raise EnvironmentError("Missing critical Supabase credentials (URL/KEY) in .env")
+
+        if self.backend_name == "supabase":
+            if not self.url or not self.key:
+                logger.error("Error: SUPABASE_URL or SUPABASE_KEY not found in .env file")
+                raise EnvironmentError("Missing critical Supabase credentials (URL/KEY) in .env")
+            self.backend = SupabaseBackend(self.url, self.key)
+        else:
+            # Lazy import: the replay backend depends on this module's interface
+            from src.connectors.local_backend import LocalReplayBackend
+            self.backend = LocalReplayBackend(**options)
 
         self._client = None
 
-    def get_client(self) -> Client:
+    def get_client(self) -> Any:
         """
-        Returns a Supabase Client. Singleton pattern.
+        Returns the backend client (Supabase Client or local replay client). Singleton pattern.
         """
         if self._client is None:
             try:
-                logger.info(f"Initializing Supabase client for {self.url}...")
-                self._client = create_client(self.url, self.key)
-                logger.info("Supabase client initialized successfully.")
+                logger.info(f"Initializing {self.backend_name} client for {self.backend.describe()}...")
+                self._client = self.backend.create_client()
+                logger.info(f"{self.backend_name.capitalize()} client initialized successfully.")
             except Exception as e:
-                logger.error(f"Critical error initializing Supabase client: {str(e)}")
+                logger.error(f"Critical error initializing {self.backend_name} client: {str(e)}")
                 raise
-        
+
         return self._client
+
+    def get_async_client(self, max_connections: int = 8) -> Any:
+        """
+        Returns a new async client with a pooled HTTP session of `max_connections`.
+        Not cached: the client is bound to the event loop of the run that creates it.
+        """
+        logger.info(f"Initializing async {self.backend_name} client ({max_connections} connections)...")
+        return self.backend.create_async_client(max_connections=max_connections)
@@ -0,0 +1,198 @@
+import os
+import time
+import random
+import logging
+import threading
+import numpy as np
+import pandas as pd
+from typing import Any, Dict, List, Optional
+from src.connectors.db_connector import DatabaseBackend
+from src.connectors.async_client import LocalAsyncClient
+
+logger = logging.getLogger(__name__)
+
+class LocalResponse:
+    """Mimics the postgrest APIResponse: `data` (list of records) and `count` (when requested)."""
+
+    def __init__(self, data: List[Dict[str, Any]], count: Optional[int] = None):
+        self.data = data
+        self.count = count
+
+class LocalQuery:
+    """
+    Query builder over a pandas DataFrame with the subset of the PostgREST surface used by the loader:
+    select(columns, count=...), eq/neq/gt/gte/lt/lte, order(column, desc=...), limit(n), range(start, end)
+    and execute(). Builder methods return self, like postgrest-py.
+    """
+
+    _OPERATORS = {
+        "eq": lambda s, v: s == v,
+        "neq": lambda s, v: s != v,
+        "gt": lambda s, v: s > v,
+        "gte": lambda s, v: s >= v,
+        "lt": lambda s, v: s < v,
+        "lte": lambda s, v: s <= v,
+    }
+
+    def __init__(self, client: "LocalReplayClient", table: str):
+        self._client = client
+        self._table = table
+        self._columns: Optional[List[str]] = None
+        self._count: Optional[str] = None
+        self._filters: List[tuple] = []
+        self._order: Optional[tuple] = None
+        self._limit: Optional[int] = None
+        self._range: Optional[tuple] = None
+
+    def select(self, *columns: str, count: Optional[str] = None) -> "LocalQuery":
+        names = [c.strip() for col in columns for c in col.split(",") if c.strip()]
+        self._columns = None if not names or names == ["*"] else names
+        self._count = count
+        return self
+
+    def eq(self, column: str, value: Any) -> "LocalQuery":
+        return self._filter("eq", column, value)
+
+    def neq(self, column: str, value: Any) -> "LocalQuery":
+        return self._filter("neq", column, value)
+
+    def gt(self, column: str, value: Any) -> "LocalQuery":
+        return self._filter("gt", column, value)
+
+    def gte(self, column: str, value: Any) -> "LocalQuery":
+        return self._filter("gte", column, value)
+
+    def lt(self, column: str, value: Any) -> "LocalQuery":
+        return self._filter("lt", column, value)
+
+    def lte(self, column: str, value: Any) -> "LocalQuery":
+        return self._filter("lte", column, value)
+
+    def order(self, column: str, desc: bool = False) -> "LocalQuery":
+        self._order = (column, desc)
+        return self
+
+    def limit(self, size: int) -> "LocalQuery":
+        self._limit = size
+        return self
+
+    def range(self, start: int, end: int) -> "LocalQuery":
+        self._range = (start, end)
+        return self
+
+    def execute(self) -> LocalResponse:
+        self._client.simulate_latency()
+        return self.collect()
+
+    def collect(self) -> LocalResponse:
+        """Evaluates the query without the simulated round trip (used by the async client)."""
+        df = self._client.load_table(self._table)
+
+        mask = np.ones(len(df), dtype=bool)
+        for op, column, value in self._filters:
+            series = df[column]
+            if pd.api.types.is_datetime64_any_dtype(series):
+                value = pd.Timestamp(value)
+            mask &= self._OPERATORS[op](series, value).to_numpy()
+        result = df[mask]
+        total = int(mask.sum())
+
+        if self._order is not None:
+            column, desc = self._order
+            result = result.sort_values(column, ascending=not desc, kind="stable")
+
+        # PostgREST aplica range (offset) y luego el límite de filas del servidor (max-rows)
+        if self._range is not None:
+            start, end = self._range
+            result = result.iloc[start:end + 1]
+        if self._limit is not None:
+            result = result.iloc[:self._limit]
+        if self._client.max_rows:
+            result = result.iloc[:self._client.max_rows]
+
+        if self._columns is not None:
+            result = result[self._columns]
+
+        return LocalResponse(self._client.to_records(result), total if self._count else None)
+
+    def _filter(self, op: str, column: str, value: Any) -> "LocalQuery":
+        self._filters.append((op, column, value))
+        return self
+
+class LocalReplayClient:
+    """
+    Offline stand-in for the Supabase client that replays `{local_path}/{table}.parquet` files.
+    Each `execute()` sleeps `latency_ms` (+ uniform jitter) to emulate the network round trip,
+    and responses are capped at `max_rows` like the PostgREST server setting.
+    """
+
+    def __init__(self, local_path: str, latency_ms: float = 0.0, jitter_ms: float = 0.0,
+                 max_rows: Optional[int] = 1000, seed: int = 42):
+        self.local_path = local_path
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.max_rows = max_rows
+        self.requests = 0
+        self._random = random.Random(seed)
+        self._tables: Dict[str, pd.DataFrame] = {}
+        self._lock = threading.Lock()
+
+    def table(self, name: str) -> LocalQuery:
+        return LocalQuery(self, name)
+
+    def load_table(self, name: str) -> pd.DataFrame:
+        """Loads (and caches) the replay table; missing tables fail like an unknown relation in PostgREST."""
+        with self._lock:
+            self.requests += 1
+            if name not in self._tables:
+                path = os.path.join(self.local_path, f"{name}.parquet")
+                if not os.path.exists(path):
+                    raise FileNotFoundError(f"Replay table '{name}' not found at {path}")
+                self._tables[name] = pd.read_parquet(path)
+            return self._tables[name]
+
+    def simulate_latency(self) -> None:
+        delay = self.next_latency()
+        if delay > 0:
+            time.sleep(delay)
+
+    def next_latency(self) -> float:
+        """Seconds of simulated round trip for the next request (latency + uniform jitter)."""
+        if self.latency_ms <= 0 and self.jitter_ms <= 0:
+            return 0.0
+        with self._lock:
+            jitter = self._random.uniform(0, self.jitter_ms) if self.jitter_ms > 0 else 0.0
+        return (self.latency_ms + jitter) / 1000.0
+
+    @staticmethod
+    def to_records(df: pd.DataFrame) -> List[Dict[str, Any]]:
+        """Serializes rows like the REST API does: ISO date strings, None for nulls, native Python scalars."""
+        out = df.copy()
+        for col in out.select_dtypes(include=["datetime64", "datetimetz"]).columns:
+            out[col] = out[col].dt.strftime("%Y-%m-%d")
+        out = out.astype(object).where(out.notna(), None)
+        return out.to_dict(orient="records")
+
+class LocalReplayBackend(DatabaseBackend):
+    """Backend that serves a directory of Parquet files through LocalReplayClient (offline runs and benchmarks)."""
+
+    name = "local"
+
+    def __init__(self, local_path: str = "data/00_replay", latency_ms: float = 0.0, jitter_ms: float = 0.0,
+                 max_rows: Optional[int] = 1000, seed: int = 42):
+        self.local_path = local_path
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.max_rows = max_rows
+        self.seed = seed
+
+    def describe(self) -> str:
+        return f"{self.local_path} (latency={self.latency_ms}ms, jitter={self.jitter_ms}ms)"
+
+    def create_client(self) -> LocalReplayClient:
+        if not os.path.isdir(self.local_path):
+            raise FileNotFoundError(f"Local replay directory not found: {self.local_path}")
+        return LocalReplayClient(self.local_path, self.latency_ms, self.jitter_ms, self.max_rows, self.seed)
+
+    def create_async_client(self, max_connections: int = 8) -> LocalAsyncClient:
+        return LocalAsyncClient(self.create_client(), max_connections)
@@ -1,16 +1,51 @@
 import os
+import json
+import asyncio
 import pandas as pd
 import numpy as np
+import pyarrow as pa
+import pyarrow.compute as pc
 import logging
 import datetime
-from typing import Dict, Any, List, Optional
+import time
+import multiprocessing
+from concurrent.futures import Executor, ThreadPoolExecutor, ProcessPoolExecutor, as_completed
+from typing import Dict, Any, List, Optional, Tuple
 from src.connectors.db_connector import DBConnector
+from src.connectors.async_client import AsyncRangeQuery
 from src.utils.auditor import DataAuditor
+from src.utils.raw_store import RawStore
+from src.utils.projection import ProjectionPlanner
+from src.utils.staging import StagingArea, StagedRange, TableStaging
 from src.utils.config_loader import load_config
 from src.utils.helpers import save_report
 
 logger = logging.getLogger(__name__)
 
+# Tipos Arrow con los que se decodifica cada tipo del contrato de datos (extractions.schemas)
+CONTRACT_ARROW_TYPES = {
+    "int": pa.int64(),
+    "float": pa.float64(),
+    "datetime": pa.timestamp("ns"),
+    "object": pa.string()
+}
+
+
+def _timed_audit(auditor: DataAuditor, df: pd.DataFrame, table: str, state_path: Optional[str] = None,
+                 merge_stats: Optional[Dict[str, int]] = None,
+                 drift_path: Optional[str] = None) -> Tuple[Dict[str, Any], float]:
+    """
+    Ejecuta la auditoría de una tabla y mide su duración.
+    Función de módulo para que pueda enviarse (pickle) a un ProcessPoolExecutor.
+    Con `state_path` la auditoría es incremental sobre el estado persistido junto al raw; con
+    `drift_path` compara las filas nuevas con el perfil histórico de drift.
+    """
+    start = time.perf_counter()
+    audit_results = auditor.audit_dataframe(df, table, state_path=state_path, merge_stats=merge_stats,
+                                            drift_path=drift_path)
+    return audit_results, time.perf_counter() - start
+
+
 class DataLoader:
     """
     Orquestador de la Fase 01: Extractions.
@@ -18,10 +53,16 @@ class DataLoader:
     y persistir los resultados localmente en formato Parquet siguiendo el protocolo de dual persistencia.
     """
 
-    def __init__(self):
-        self.config = load_config()
-        self.db = DBConnector()
-        self.auditor = DataAuditor()
+    def __init__(self, config_path: str = "config.yaml"):
+        self.config = load_config(config_path)
+        self.extraction_config = self.config.get("extractions", {})
+
+        # Backend de datos (Supabase por defecto o réplica local offline); DB_BACKEND prevalece sobre el config
+        backend_options = dict(self.extraction_config.get("backend", {}))
+        self.db = DBConnector(default_backend=backend_options.pop("type", None), **backend_options)
+        # Columnas a solicitar por tabla según el contrato y lo que consumen las fases posteriores
+        self.projection = ProjectionPlanner(self.config)
+        self.auditor = DataAuditor(config_path)
         
         # Rutas desde config
         self.raw_path = self.config.get("general", {}).get("data_raw_path", "data/01_raw")
@@ -33,11 +74,28 @@ class DataLoader:
         os.makedirs(self.raw_path, exist_ok=True)
         os.makedirs(self.reports_path, exist_ok=True)
 
+    @property
+    def raw_store(self) -> RawStore:
+        """Capa de persistencia raw (layout `file` o `partitioned`) sobre la ruta raw vigente."""
+        return RawStore(self.raw_path, **self.extraction_config.get("raw_store", {}))
+
+    @property
+    def staging_area(self) -> StagingArea:
+        """Zona de staging de descargas en curso (checkpoints por página) bajo la ruta raw vigente."""
+        checkpoint = self.extraction_config.get("checkpoint", {})
+        return StagingArea(self.raw_path, checkpoint.get("staging_dir", "_staging"))
+
     def run_extraction(self) -> Dict[str, Any]:
         """
         Ejecuta el proceso completo de extracción (incremental) para todas las tablas configuradas.
+        Según `extractions.execution.mode` las tablas se procesan en serie ("sequential"), de forma
+        concurrente ("concurrent"): descargas en un pool de hilos (I/O) y auditorías en un pool de procesos,
+        o con un cliente asyncio sobre un pool de conexiones HTTP persistentes ("async").
         """
-        tables = self.config.get("extractions", {}).get("tables", [])
+        tables = self.extraction_config.get("tables", [])
+        execution = self.extraction_config.get("execution", {})
+        mode = execution.get("mode", "sequential")
+
         phase_report = {
             "phase": "01_extractions",
             "timestamp": datetime.datetime.now().isoformat(),
@@ -48,126 +106,900 @@ class DataLoader:
                 "failed_extractions": 0,
                 "total_rows_extracted": 0,
                 "incremental_updates": 0,
-                "full_extractions": 0
+                "full_extractions": 0,
+                "skipped_unchanged": 0,
+                "rows_inserted": 0,
+                "rows_updated": 0,
+                "rows_unchanged": 0,
+                "tables_with_drift": 0
             },
-            "table_audits": {}
+            "table_audits": {},
+            # Columnas marcadas por el detector de drift en las filas nuevas de esta corrida, por tabla
+            "drift_flags": {}
         }
 
-        logger.info(f"Iniciando extracción de {len(tables)} tablas en formato Parquet...")
+        logger.info(f"Iniciando extracción de {len(tables)} tablas en formato Parquet (modo: {mode})...")
+        start = time.perf_counter()
+
+        # Pre-flight: tablas sin cambios en la fuente se omiten y reutilizan su auditoría previa
+        probes, results = self._run_preflight(tables)
+        pending = [table for table in tables if table not in results]
 
+        if mode == "async":
+            results.update(self._run_async(pending, execution, probes))
+        elif mode == "concurrent":
+            results.update(self._run_concurrent(
+                pending,
+                max_workers=execution.get("max_workers", 4),
+                audit_workers=execution.get("audit_workers", 2),
+                probes=probes
+            ))
+        else:
+            results.update(self._run_sequential(pending, probes))
+
+        # Consolidación en el hilo principal (orden del config) para mantener el reporte determinista
         for table in tables:
-            phase_report["metrics"]["total_tables_processed"] += 1
-            try:
-                file_path = os.path.join(self.raw_path, f"{table}.parquet")
-                df_existing = pd.DataFrame()
-                last_date = None
-
-                # 1. Cargar datos existentes si el archivo existe
-                if os.path.exists(file_path):
-                    logger.info(f"Archivo existente encontrado para '{table}'. Cargando para extracción incremental.")
-                    df_existing = pd.read_parquet(file_path)
-                    if not df_existing.empty and "fecha" in df_existing.columns:
-                        # Asegurar tipo datetime
-                        df_existing["fecha"] = pd.to_datetime(df_existing["fecha"])
-                        last_date = df_existing["fecha"].max()
-                        phase_report["metrics"]["incremental_updates"] += 1
-                    else:
-                        phase_report["metrics"]["full_extractions"] += 1
-                else:
-                    logger.info(f"No hay archivo local para '{table}'. Iniciando extracción completa.")
-                    phase_report["metrics"]["full_extractions"] += 1
-
-                # 2. Descargar nuevos datos (con paginación y filtro incremental)
-                df_new = self._fetch_table(table, last_date=last_date)
-                
-                if df_new.empty:
-                    logger.info(f"No hay registros nuevos para la tabla '{table}'.")
-                    df_final = df_existing
-                else:
-                    # Combinar datos
-                    df_final = pd.concat([df_existing, df_new], ignore_index=True)
-                    # Eliminar duplicados si existen (por fecha si aplica)
-                    if "fecha" in df_final.columns:
-                        df_final = df_final.drop_duplicates(subset=["fecha"], keep="last")
-                    
-                    # Persistencia Local (Formato Parquet)
-                    df_final.to_parquet(file_path, index=False, engine="pyarrow")
-                    logger.info(f"Tabla '{table}' actualizada y guardada en {file_path}")
-
-                # 3. Ejecutar Auditoría (Abogado del Diablo)
-                audit_results = self.auditor.audit_dataframe(df_final, table)
-                
-                # 4. Generar Vista Previa (Preview)
-                audit_results["preview"] = self._get_preview(df_final)
-                
-                phase_report["table_audits"][table] = {
-                    "status": "success",
-                    "audit_details": audit_results,
-                    "preview": audit_results.get("preview", {})
-                }
-                
-                # Actualizar métricas globales
-                phase_report["metrics"]["total_rows_extracted"] += df_new.shape[0]
-                phase_report["metrics"]["successful_extractions"] += 1
+            self._register_result(phase_report, results[table])
 
-            except Exception as e:
-                logger.error(f"Error procesando tabla '{table}': {str(e)}", exc_info=True)
-                phase_report["metrics"]["failed_extractions"] += 1
-                phase_report["table_audits"][table] = {
-                    "status": "error",
-                    "error_message": str(e)
+        phase_report["timings"] = {
+            "execution_mode": mode,
+            "wall_clock_seconds": round(time.perf_counter() - start, 4),
+            "tables": {table: results[table]["timings"] for table in tables}
+        }
+        phase_report["projection"] = {
+            "mode": self.projection.mode,
+            "tables": {
+                table: {
+                    "select": self.projection.select_clause(table),
+                    "pruned_columns": [
+                        col for col in self.projection.schemas.get(table, {})
+                        if col not in self.projection.contract_columns(table)
+                    ]
                 }
+                for table in tables
+            }
+        }
 
         # Guardar Reporte Final (Protoclo Dual Persistencia con soporte UTF-8 via helper)
         save_report(phase_report, "phase_01_extractions", outputs_path=self.reports_path)
         
         return phase_report
 
+    def _run_sequential(self, tables: List[str],
+                        probes: Optional[Dict[str, Any]] = None) -> Dict[str, Dict[str, Any]]:
+        """Extrae y audita las tablas una tras otra (comportamiento histórico)."""
+        probes = probes or {}
+        results = {}
+        for table in tables:
+            result = self._extract_table(table, probes.get(table))
+            if result["status"] == "success":
+                try:
+                    audit_results, audit_seconds = _timed_audit(
+                        self.auditor, result["df_final"], table, *self._audit_state_args(result)
+                    )
+                    self._attach_audit(result, audit_results, audit_seconds)
+                except Exception as e:
+                    self._mark_failed(result, e)
+            results[table] = result
+        return results
+
+    def _run_concurrent(self, tables: List[str], max_workers: int, audit_workers: int,
+                        probes: Optional[Dict[str, Any]] = None) -> Dict[str, Dict[str, Any]]:
+        """
+        Extrae las tablas en un pool de hilos y envía cada auditoría a un pool de procesos
+        apenas termina su descarga, de modo que red, disco y CPU se solapan.
+        """
+        probes = probes or {}
+        results = {}
+        if not tables:
+            return results
+        with ThreadPoolExecutor(max_workers=max_workers) as io_pool, \
+             self._audit_executor(audit_workers) as audit_pool:
+            extract_futures = {io_pool.submit(self._extract_table, table, probes.get(table)): table for table in tables}
+            audit_futures = {}
+
+            for future in as_completed(extract_futures):
+                table = extract_futures[future]
+                result = future.result()
+                results[table] = result
+                if result["status"] == "success":
+                    audit_future = audit_pool.submit(
+                        _timed_audit, self.auditor, result["df_final"], table, *self._audit_state_args(result)
+                    )
+                    audit_futures[audit_future] = table
+
+            for future in as_completed(audit_futures):
+                result = results[audit_futures[future]]
+                try:
+                    audit_results, audit_seconds = future.result()
+                    self._attach_audit(result, audit_results, audit_seconds)
+                except Exception as e:
+                    self._mark_failed(result, e)
+
+        return results
+
+    @staticmethod
+    def _audit_executor(audit_workers: int) -> Executor:
+        """
+        Pool de auditorías: procesos dedicados (CPU en paralelo) o, con `audit_workers: 0`, un hilo del
+        propio proceso, que evita el arranque de intérpretes nuevos en cargas pequeñas.
+        """
+        if audit_workers <= 0:
+            return ThreadPoolExecutor(max_workers=1)
+        # 'spawn' evita hacer fork de un proceso con hilos activos (y es el comportamiento nativo en Windows)
+        return ProcessPoolExecutor(max_workers=audit_workers, mp_context=multiprocessing.get_context("spawn"))
+
+    def _run_async(self, tables: List[str], execution: Dict[str, Any],
+                   probes: Optional[Dict[str, Any]] = None) -> Dict[str, Dict[str, Any]]:
+        """
+        Extracción asyncio: todas las páginas de todas las tablas comparten un cliente HTTP con pool de
+        conexiones keep-alive. La concurrencia se acota por tabla (`per_table_concurrency`, relevante con
+        shards) y globalmente (`max_connections`). Las páginas fluyen por una cola acotada
+        (`writer_queue_size`) hacia un único escritor: si la persistencia se atrasa, las descargas esperan.
+        """
+        if not tables:
+            return {}
+        coroutine = self._extract_all_async(tables, execution, probes or {})
+        try:
+            asyncio.get_running_loop()
+        except RuntimeError:
+            return asyncio.run(coroutine)
+        # Ya hay un event loop activo (ej. notebooks ejecutados con papermill): se usa un hilo propio
+        with ThreadPoolExecutor(max_workers=1) as pool:
+            return pool.submit(asyncio.run, coroutine).result()
+
+    async def _extract_all_async(self, tables: List[str], execution: Dict[str, Any],
+                                 probes: Dict[str, Any]) -> Dict[str, Dict[str, Any]]:
+        """Coordina productores (descarga por tabla), el escritor y las auditorías en el pool de procesos."""
+        max_connections = execution.get("max_connections", 8)
+        client = self.db.get_async_client(max_connections=max_connections)
+        global_limit = asyncio.Semaphore(max_connections)
+        queue = asyncio.Queue(maxsize=execution.get("writer_queue_size", 32))
+        results = {table: self._new_result(table) for table in tables}
+        contexts = {}
+
+        with self._audit_executor(execution.get("audit_workers", 2)) as audit_pool:
+            audits = {}
+            writer = asyncio.create_task(self._write_pages_async(queue, results, contexts, probes, audit_pool, audits))
+            producers = [
+                asyncio.create_task(self._produce_table_async(
+                    client, table, results[table], contexts, queue,
+                    (asyncio.Semaphore(execution.get("per_table_concurrency", 2)), global_limit)
+                ))
+                for table in tables
+            ]
+            try:
+                producing = asyncio.gather(*producers)
+                await asyncio.wait([producing, writer], return_when=asyncio.FIRST_COMPLETED)
+                if writer.done():
+                    # El escritor solo termina antes del centinela si falló: los productores quedarían
+                    # bloqueados en la cola llena
+                    writer.result()
+                    raise RuntimeError("El escritor de páginas terminó antes que las descargas.")
+                await producing
+                await queue.put(None)
+                await writer
+            finally:
+                # Ninguna descarga puede seguir en vuelo (ni bloqueada en la cola) al cerrar el cliente
+                await self._cancel_tasks(producers + [writer])
+                await client.aclose()
+
+            for table, future in audits.items():
+                result = results[table]
+                try:
+                    audit_results, audit_seconds = await future
+                    self._attach_audit(result, audit_results, audit_seconds)
+                except Exception as e:
+                    self._mark_failed(result, e)
+
+        return results
+
+    async def _produce_table_async(self, client, table: str, result: Dict[str, Any], contexts: Dict[str, Any],
+                                   queue: asyncio.Queue, limits: Tuple[asyncio.Semaphore, asyncio.Semaphore]) -> None:
+        """Descarga los rangos de una tabla (completa o por shards) y encola sus páginas para el escritor."""
+        start = time.perf_counter()
+        try:
+            pagination = self.extraction_config.get("pagination", {})
+            mode = pagination.get("mode", "offset")
+            page_size = pagination.get("page_size", 1000)
+            sharding = self.extraction_config.get("sharding", {})
+
+            store = self.raw_store
+            table_exists, last_date = self._resolve_watermark(store, table, result)
+            contexts[table] = {"store": store, "table_exists": table_exists, "start": start}
+            lower_bound = last_date.strftime("%Y-%m-%d") if last_date else None
+            sharded = last_date is None and sharding.get("enabled", False)
+            staging = self._open_staging(table, lower_bound, mode, page_size, sharded)
+
+            ranges = [("full", lower_bound, False, None)]
+            if sharded:
+                shards = staging.shards if staging is not None else None
+                if shards is None:
+                    bounds = await self._fetch_date_bounds_async(client, table, limits)
+                    shards = self._plan_shards(bounds[0], bounds[1], sharding.get("shards", 8)) if bounds else []
+                    if staging is not None:
+                        staging.shards = shards
+                ranges = [(f"shard-{i:03d}", lower, True, upper) for i, (lower, upper) in enumerate(shards)]
+
+            await self._gather_or_cancel(*(
+                self._fetch_range_async(
+                    client, table, mode, page_size, lower, inclusive, upper, key,
+                    staging.range(key) if staging is not None else None, limits, queue
+                )
+                for key, lower, inclusive, upper in ranges
+            ))
+            await queue.put((table, "end", True))
+        except Exception as e:
+            self._mark_failed(result, e)
+            await queue.put((table, "end", False))
+
+    @staticmethod
+    async def _cancel_tasks(tasks: List[asyncio.Future]) -> None:
+        """Cancela las tareas pendientes y espera a que terminen (sus excepciones ya no importan)."""
+        for task in tasks:
+            if not task.done():
+                task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+    @classmethod
+    async def _gather_or_cancel(cls, *coroutines) -> List[Any]:
+        """Como `asyncio.gather`, pero si una tarea falla cancela y espera a las demás antes de propagar el error."""
+        tasks = [asyncio.ensure_future(coroutine) for coroutine in coroutines]
+        try:
+            return await asyncio.gather(*tasks)
+        finally:
+            await cls._cancel_tasks(tasks)
+
+    async def _fetch_date_bounds_async(self, client, table: str,
+                                       limits: Tuple[asyncio.Semaphore, asyncio.Semaphore]) -> Optional[Tuple[str, str]]:
+        """Versión async de `_fetch_date_bounds` (ambas consultas en paralelo)."""
+        async def edge(desc: bool):
+            async with limits[0], limits[1]:
+                return await client.fetch(AsyncRangeQuery(table, "fecha", desc=desc, limit=1))
+        first, last = await self._gather_or_cancel(edge(False), edge(True))
+        if not first or not last:
+            return None
+        return first[0]["fecha"], last[0]["fecha"]
+
+    async def _fetch_range_async(self, client, table: str, mode: str, page_size: int,
+                                 lower_bound: Optional[str], lower_inclusive: bool, upper_bound: Optional[str],
+                                 range_key: str, stage: Optional[StagedRange],
+                                 limits: Tuple[asyncio.Semaphore, asyncio.Semaphore], queue: asyncio.Queue) -> None:
+        """
+        Pagina un rango (offset o keyset, misma semántica que la versión síncrona) y encola cada página
+        decodificada junto al cursor a confirmar. Las páginas de un checkpoint previo se reenvían sin pedirlas.
+        """
+        select_clause = self.projection.select_clause(table)
+        restored, _, state = self._resume_stage(stage, table)
+        for page in restored:
+            await queue.put((table, "page", (range_key, page, None, None)))
+        if state.get("done"):
+            return
+        offset = state.get("offset", 0)
+        cursor = state.get("cursor", lower_bound)
+        inclusive = state.get("inclusive", lower_inclusive)
+
+        while True:
+            if mode == "keyset":
+                query = AsyncRangeQuery(table, select_clause, limit=page_size, lower=cursor,
+                                        lower_inclusive=inclusive, upper=upper_bound)
+            else:
+                query = AsyncRangeQuery(table, select_clause, order=None, limit=page_size, offset=offset,
+                                        lower=lower_bound, lower_inclusive=lower_inclusive, upper=upper_bound)
+            async with limits[0], limits[1]:
+                data = await client.fetch(query)
+
+            if not data:
+                await queue.put((table, "page", (range_key, None, stage, {"done": True})))
+                return
+
+            last_page = len(data) < page_size
+            if mode == "keyset" and not last_page:
+                rows, cursor = self._split_keyset_page(data, page_size, table)
+                inclusive = True
+                cursor_state = {"cursor": cursor, "inclusive": True}
+            else:
+                rows = data
+                offset += page_size
+                cursor_state = {"offset": offset} if mode == "offset" else {}
+            cursor_state["done"] = last_page
+
+            # put() bloquea si la cola está llena: backpressure del escritor hacia las descargas
+            await queue.put((table, "page", (range_key, self._decode_page(rows, table), stage, cursor_state)))
+            if last_page:
+                return
+
+    async def _write_pages_async(self, queue: asyncio.Queue, results: Dict[str, Dict[str, Any]],
+                                 contexts: Dict[str, Any], probes: Dict[str, Any],
+                                 audit_pool: Executor, audits: Dict[str, Any]) -> None:
+        """
+        Escritor único: confirma cada página en staging (si hay checkpoints), y al cerrar una tabla
+        reensambla sus rangos en orden, persiste el delta en el raw store y envía la auditoría al pool.
+        """
+        loop = asyncio.get_running_loop()
+        pages: Dict[str, Dict[str, List[pa.Table]]] = {table: {} for table in results}
+        finished = set()
+
+        while True:
+            item = await queue.get()
+            if item is None:
+                return
+            table, kind, payload = item
+            if table in finished:
+                continue
+
+            if kind == "page":
+                range_key, page, stage, cursor_state = payload
+                if stage is not None:
+                    await asyncio.to_thread(stage.commit, page, **cursor_state)
+                if page is not None and page.num_rows > 0:
+                    pages[table].setdefault(range_key, []).append(page)
+                continue
+
+            finished.add(table)
+            table_pages = pages.pop(table, {})
+            if not payload:
+                continue
+
+            result = results[table]
+            context = contexts[table]
+            try:
+                df_new = self._pages_to_frame([page for key in sorted(table_pages) for page in table_pages[key]])
+                await asyncio.to_thread(
+                    self._persist_delta, result, context["store"], table, context["table_exists"],
+                    df_new, probes.get(table)
+                )
+            except Exception as e:
+                self._mark_failed(result, e)
+                continue
+            finally:
+                result["timings"]["extract_seconds"] = round(time.perf_counter() - context["start"], 4)
+                result["timings"]["total_seconds"] = result["timings"]["extract_seconds"]
+
+            audits[table] = loop.run_in_executor(
+                audit_pool, _timed_audit, self.auditor, result["df_final"], table, *self._audit_state_args(result)
+            )
+
+    def _extract_table(self, table: str, probe: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        """
+        Descarga el delta de una tabla, lo combina con la copia local y persiste el Parquet.
+        Nunca lanza excepciones: los errores quedan registrados en el resultado para que
+        el orquestador (serie o concurrente) los consolide en el reporte.
+        `probe` es el estado de la fuente medido en el pre-flight; se registra tras persistir.
+        """
+        result = self._new_result(table)
+        start = time.perf_counter()
+        try:
+            store = self.raw_store
+            table_exists, last_date = self._resolve_watermark(store, table, result)
+
+            # 2. Descargar nuevos datos (con paginación y filtro incremental)
+            df_new = self._fetch_table(table, last_date=last_date)
+            self._persist_delta(result, store, table, table_exists, df_new, probe)
+
+        except Exception as e:
+            self._mark_failed(result, e)
+
+        result["timings"]["extract_seconds"] = round(time.perf_counter() - start, 4)
+        result["timings"]["total_seconds"] = result["timings"]["extract_seconds"]
+        return result
+
+    @staticmethod
+    def _new_result(table: str) -> Dict[str, Any]:
+        """Resultado inicial de la extracción de una tabla (lo completan la descarga y la auditoría)."""
+        return {
+            "table": table,
+            "status": "success",
+            "extraction_type": None,
+            "rows_extracted": 0,
+            "df_final": None,
+            "merge_stats": {"inserted": 0, "updated": 0, "unchanged": 0},
+            "timings": {"extract_seconds": 0.0, "audit_seconds": 0.0, "total_seconds": 0.0}
+        }
+
+    def _resolve_watermark(self, store: RawStore, table: str,
+                           result: Dict[str, Any]) -> Tuple[bool, Optional[pd.Timestamp]]:
+        """
+        High Water Mark: fecha máxima local leída de metadatos (sidecar o footer Parquet).
+        Con `extractions.backfill_days` el límite inferior retrocede N días para recoger correcciones
+        de la fuente sobre días ya descargados; el merge ordenado las distingue de re-envíos idénticos.
+        """
+        table_exists = store.exists(table)
+        last_date = store.high_water_mark(table) if table_exists else None
+        if last_date is None:
+            logger.info(f"No hay datos locales para '{table}'. Iniciando extracción completa.")
+            result["extraction_type"] = "full"
+            return table_exists, None
+
+        logger.info(f"Datos existentes para '{table}' hasta {last_date}. Extracción incremental.")
+        result["extraction_type"] = "incremental"
+        backfill_days = self.extraction_config.get("backfill_days", 0)
+        if backfill_days > 0:
+            last_date = last_date - pd.Timedelta(int(backfill_days), unit="D")
+            logger.info(f"Ventana de backfill de {backfill_days} días para '{table}': fecha > {last_date.date()}.")
+        return table_exists, last_date
+
+    def _persist_delta(self, result: Dict[str, Any], store: RawStore, table: str, table_exists: bool,
+                       df_new: pd.DataFrame, probe: Optional[Dict[str, Any]] = None) -> None:
+        """Combina el delta con la copia local, lo persiste y promueve el staging de la tabla."""
+        if df_new.empty:
+            logger.info(f"No hay registros nuevos para la tabla '{table}'.")
+            df_final = store.read(table, self.projection.columns(table)) if table_exists else pd.DataFrame()
+        else:
+            # Combinar y persistir (Formato Parquet, layout según config).
+            # Solo el layout 'file' necesita la tabla actual en memoria para reescribirla, y se lee completa:
+            # la proyección limita lo que se descarga y se lee, nunca las columnas ya persistidas en el raw.
+            df_existing = store.read(table) if table_exists and store.layout == "file" else None
+            df_final, merge_stats = store.merge(table, df_new, df_existing)
+            columns = self.projection.columns(table)
+            if df_final is None:
+                # Layout particionado: la vista final solo se lee para la auditoría
+                df_final = store.read(table, columns)
+            elif columns is not None:
+                # Misma vista que `store.read(table, columns)`: fecha primero y solo las columnas proyectadas
+                df_final = df_final[[col for col in dict.fromkeys([store.date_column] + columns)
+                                     if col in df_final.columns]]
+            result["merge_stats"] = merge_stats
+            logger.info(
+                f"Tabla '{table}' actualizada en {store.table_path(table)}: {merge_stats['inserted']} insertadas, "
+                f"{merge_stats['updated']} actualizadas, {merge_stats['unchanged']} sin cambios."
+            )
+
+        # 3. Promoción completada: el staging solo se descarta cuando el raw store ya tiene el delta
+        if self.extraction_config.get("checkpoint", {}).get("enabled", False):
+            self.staging_area.clear(table)
+        if probe is not None:
+            store.record_source_state(table, probe)
+
+        result["df_final"] = df_final
+        result["rows_extracted"] = df_new.shape[0]
+
+    def _audit_state_args(self, result: Dict[str, Any]) -> Tuple[Optional[str], Optional[Dict[str, int]], Optional[str]]:
+        """
+        Argumentos de estado para `_timed_audit`: con `extractions.audit.incremental` la ruta del estado
+        de auditoría (junto al raw) y los conteos del merge, que indican si el delta fue un append puro;
+        con `extractions.audit.drift.enabled` la ruta del perfil histórico de drift.
+        """
+        audit_config = self.extraction_config.get("audit", {})
+        drift_path = (
+            self.raw_store.drift_profile_path(result["table"])
+            if audit_config.get("drift", {}).get("enabled", False) else None
+        )
+        if not audit_config.get("incremental", False):
+            return None, None, drift_path
+        return self.raw_store.audit_state_path(result["table"]), result["merge_stats"], drift_path
+
+    def _attach_audit(self, result: Dict[str, Any], audit_results: Dict[str, Any], audit_seconds: float) -> None:
+        """Adjunta la auditoría (Abogado del Diablo) y la vista previa al resultado de una tabla."""
+        audit_results["preview"] = self._get_preview(result["df_final"])
+        result["audit_results"] = audit_results
+        result["timings"]["audit_seconds"] = round(audit_seconds, 4)
+        result["timings"]["total_seconds"] = round(result["timings"]["extract_seconds"] + audit_seconds, 4)
+
+    def _mark_failed(self, result: Dict[str, Any], error: Exception) -> None:
+        """Marca el resultado de una tabla como fallido conservando el mensaje de error."""
+        logger.error(f"Error procesando tabla '{result['table']}': {str(error)}", exc_info=True)
+        result["status"] = "error"
+        result["error_message"] = str(error)
+
+    def _register_result(self, phase_report: Dict[str, Any], result: Dict[str, Any]) -> None:
+        """Actualiza las métricas globales y la sección de auditoría de una tabla en el reporte."""
+        metrics = phase_report["metrics"]
+        metrics["total_tables_processed"] += 1
+
+        if result["extraction_type"] == "incremental":
+            metrics["incremental_updates"] += 1
+        elif result["extraction_type"] == "full":
+            metrics["full_extractions"] += 1
+
+        if result["status"] == "skipped":
+            # Sin cambios en la fuente: se conserva la sección de auditoría de la corrida anterior
+            phase_report["table_audits"][result["table"]] = result["audit_section"]
+            metrics["skipped_unchanged"] += 1
+            metrics["successful_extractions"] += 1
+        elif result["status"] == "success":
+            audit_results = result["audit_results"]
+            phase_report["table_audits"][result["table"]] = {
+                "status": "success",
+                "audit_details": audit_results,
+                "preview": audit_results.get("preview", {}),
+                "merge_stats": result["merge_stats"]
+            }
+            metrics["total_rows_extracted"] += result["rows_extracted"]
+            for name, count in result["merge_stats"].items():
+                metrics[f"rows_{name}"] += count
+            metrics["successful_extractions"] += 1
+            flagged = audit_results.get("drift", {}).get("flagged_columns", [])
+            if flagged:
+                phase_report["drift_flags"][result["table"]] = flagged
+                metrics["tables_with_drift"] += 1
+        else:
+            metrics["failed_extractions"] += 1
+            phase_report["table_audits"][result["table"]] = {
+                "status": "error",
+                "error_message": result["error_message"]
+            }
+
+    def _run_preflight(self, tables: List[str]) -> Tuple[Dict[str, Any], Dict[str, Dict[str, Any]]]:
+        """
+        Sondeo previo de frescura (`extractions.preflight`): consulta en paralelo el conteo y la fecha
+        máxima de cada tabla en la fuente. Una tabla cuyo estado coincide con el registrado en su última
+        extracción (sidecar del raw store) y que tiene una auditoría exitosa previa se omite por completo:
+        no se descarga, no se lee su Parquet ni se vuelve a auditar.
+        Retorna los sondeos por tabla y los resultados de las tablas omitidas.
+        """
+        preflight = self.extraction_config.get("preflight", {})
+        if not preflight.get("enabled", False) or not tables:
+            return {}, {}
+
+        client = self.db.get_client()
+        with ThreadPoolExecutor(max_workers=preflight.get("max_workers", len(tables))) as pool:
+            probes = dict(zip(tables, pool.map(lambda table: self._probe_table(client, table), tables)))
+
+        if self.extraction_config.get("backfill_days", 0) > 0:
+            # Una corrección dentro de la ventana no altera count ni max(fecha): no se puede omitir la tabla
+            logger.info("Ventana de backfill activa: el pre-flight registra el estado de la fuente sin omitir tablas.")
+            return probes, {}
+
+        previous = self._load_previous_audits()
+        store = self.raw_store
+        skipped = {}
+        for table in tables:
+            probe = probes[table]
+            section = previous.get(table, {})
+            if probe is None or section.get("status") != "success" or store.source_state(table) != probe:
+                continue
+            logger.info(f"'{table}' sin cambios en la fuente ({probe['rows']} filas hasta {probe['max_date']}). Se omite.")
+            skipped[table] = {
+                "table": table,
+                "status": "skipped",
+                "extraction_type": "skipped",
+                "rows_extracted": 0,
+                "audit_section": dict(section, skipped_unchanged=True),
+                "timings": {"extract_seconds": 0.0, "audit_seconds": 0.0, "total_seconds": 0.0}
+            }
+        return probes, skipped
+
+    def _probe_table(self, client, table_name: str) -> Optional[Dict[str, Any]]:
+        """Conteo exacto y `fecha` máxima de una tabla remota en un solo request (None si falla)."""
+        try:
+            response = (
+                client.table(table_name).select("fecha", count="exact")
+                .order("fecha", desc=True).limit(1).execute()
+            )
+            max_date = pd.Timestamp(response.data[0]["fecha"]).isoformat() if response.data else None
+            return {"rows": int(response.count or 0), "max_date": max_date}
+        except Exception as e:
+            logger.warning(f"Pre-flight de '{table_name}' falló; se extrae normalmente: {str(e)}")
+            return None
+
+    def _load_previous_audits(self) -> Dict[str, Any]:
+        """Secciones `table_audits` del último reporte de la fase (vacío si no existe o no se puede leer)."""
+        latest_path = os.path.join(self.reports_path, "phase_01_extractions_latest.json")
+        try:
+            with open(latest_path, "r", encoding="utf-8") as f:
+                return json.load(f).get("table_audits", {})
+        except (OSError, ValueError):
+            return {}
+
     def _fetch_table(self, table_name: str, last_date: Optional[datetime.datetime] = None) -> pd.DataFrame:
         """
-        Descarga datos de Supabase manejando el límite de 1000 registros mediante paginación.
+        Descarga datos de Supabase manejando el límite de registros por respuesta mediante paginación.
         Si se provee last_date, solo descarga registros con fecha > last_date.
+        El modo de paginación (`offset` o `keyset`) y el tamaño de página se leen de `extractions.pagination`.
         """
+        pagination = self.extraction_config.get("pagination", {})
+        mode = pagination.get("mode", "offset")
+        page_size = pagination.get("page_size", 1000)
         client = self.db.get_client()
-        all_data = []
-        page_size = 1000
-        offset = 0
-        
-        logger.info(f"Consultando Supabase para '{table_name}'...")
+
+        # El formato de fecha debe ser compatible con Supabase (ISO)
+        lower_bound = last_date.strftime("%Y-%m-%d") if last_date else None
         
+        logger.info(f"Consultando Supabase para '{table_name}' (paginación: {mode}, página: {page_size})...")
+        if lower_bound:
+            logger.info(f"Filtro incremental activo: fecha > {lower_bound}")
+
+        sharding = self.extraction_config.get("sharding", {})
+        sharded = last_date is None and sharding.get("enabled", False)
+
+        staging = self._open_staging(table_name, lower_bound, mode, page_size, sharded)
+
+        start = time.perf_counter()
+        if sharded:
+            page_tables, pages = self._fetch_sharded(client, table_name, mode, page_size, sharding, staging)
+        else:
+            page_tables, pages = self._fetch_range(
+                client, table_name, mode, page_size, lower_bound,
+                stage=staging.range("full") if staging is not None else None
+            )
+        elapsed = time.perf_counter() - start
+
+        total_rows = sum(t.num_rows for t in page_tables)
+        rows_per_second = total_rows / elapsed if elapsed > 0 else float(total_rows)
+        logger.info(
+            f"'{table_name}': {pages} páginas, {total_rows} registros en {elapsed:.2f}s "
+            f"({rows_per_second:.0f} filas/s)."
+        )
+
+        return self._pages_to_frame(page_tables)
+
+    def _open_staging(self, table_name: str, lower_bound: Optional[str], mode: str, page_size: int,
+                      sharded: bool) -> Optional[TableStaging]:
+        """
+        Checkpoints (`extractions.checkpoint`): las páginas confirmadas sobreviven a un fallo y el
+        reintento continúa desde el cursor. None si los checkpoints están desactivados.
+        """
+        if not self.extraction_config.get("checkpoint", {}).get("enabled", False):
+            return None
+        return self.staging_area.open(table_name, {
+            "watermark": lower_bound,
+            "mode": mode,
+            "page_size": page_size,
+            "select": self.projection.select_clause(table_name),
+            "sharded": sharded
+        })
+
+    @staticmethod
+    def _pages_to_frame(page_tables: List[pa.Table]) -> pd.DataFrame:
+        """Una sola conversión Arrow -> pandas al final (sin lista acumulada de dicts por fila)."""
+        if sum(t.num_rows for t in page_tables) == 0:
+            return pd.DataFrame()
+
+        df = pa.concat_tables(page_tables, promote_options="permissive").to_pandas()
+        if "fecha" in df.columns and not pd.api.types.is_datetime64_any_dtype(df["fecha"]):
+            df["fecha"] = pd.to_datetime(df["fecha"])
+            
+        return df
+
+    def _decode_page(self, rows: List[Dict[str, Any]], table_name: str) -> pa.Table:
+        """
+        Convierte una página de la API en un `pyarrow.Table` columnar tipado según `extractions.schemas`
+        (int -> int64, float -> float64, datetime -> timestamp[ns], object -> string).
+        Las filas se convierten en una sola llamada (`Table.from_pylist`, en C++) con los tipos del contrato
+        (las fechas llegan como texto ISO y se parsean después con un cast vectorizado). Si la página trae
+        columnas fuera de contrato o valores que no respetan el tipo, Arrow infiere los tipos y cada columna
+        se convierte con cast seguro; la que no cumple el contrato se conserva con el tipo inferido, para
+        que el DataAuditor reporte el desajuste en lugar de abortar la extracción.
+        """
+        if not rows:
+            return pa.table({})
+        schema = self.extraction_config.get("schemas", {}).get(table_name, {})
+        columns = list(rows[0].keys())
+        if all(schema.get(col) in CONTRACT_ARROW_TYPES for col in columns):
+            wire = pa.schema([
+                pa.field(col, pa.string() if schema[col] == "datetime" else CONTRACT_ARROW_TYPES[schema[col]])
+                for col in columns
+            ])
+            try:
+                return self._cast_to_contract(pa.Table.from_pylist(rows, schema=wire), schema, table_name)
+            except (pa.ArrowInvalid, pa.ArrowTypeError, pa.ArrowNotImplementedError):
+                pass
+        return self._cast_to_contract(pa.Table.from_pylist(rows).select(columns), schema, table_name)
+
+    @staticmethod
+    def _cast_to_contract(table: pa.Table, schema: Dict[str, str], table_name: str) -> pa.Table:
+        """Cast seguro de cada columna al tipo del contrato (ej. 12.0 en una columna int, fechas ISO)."""
+        for i, col in enumerate(table.column_names):
+            target = CONTRACT_ARROW_TYPES.get(schema.get(col))
+            column = table.column(i)
+            if target is None or column.type == target:
+                continue
+            try:
+                table = table.set_column(i, col, pc.cast(column, target))
+            except (pa.ArrowInvalid, pa.ArrowTypeError, pa.ArrowNotImplementedError):
+                logger.warning(
+                    f"Columna '{col}' de '{table_name}' no cumple el tipo de contrato '{schema.get(col)}' "
+                    f"(tipo recibido: {column.type}). Se conserva el tipo inferido."
+                )
+        return table
+
+    def _fetch_range(self, client, table_name: str, mode: str, page_size: int,
+                     lower_bound: Optional[str], lower_inclusive: bool = False,
+                     upper_bound: Optional[str] = None,
+                     stage: Optional[StagedRange] = None) -> Tuple[List[pa.Table], int]:
+        """
+        Descarga todas las páginas de un rango de fechas con el modo de paginación indicado.
+        Retorna las páginas ya decodificadas como tablas Arrow y el número de requests realizados.
+        """
+        if mode == "keyset":
+            return self._fetch_pages_keyset(client, table_name, page_size, lower_bound, lower_inclusive, upper_bound, stage)
+        return self._fetch_pages_offset(client, table_name, page_size, lower_bound, lower_inclusive, upper_bound, stage)
+
+    def _fetch_sharded(self, client, table_name: str, mode: str, page_size: int,
+                       sharding: Dict[str, Any],
+                       staging: Optional[TableStaging] = None) -> Tuple[List[pa.Table], int]:
+        """
+        Extracción completa particionada por rangos de fecha: consulta el min/max de `fecha`,
+        divide el rango en shards contiguos y los descarga en paralelo sobre el mismo cliente.
+        Los resultados se reensamblan en el orden de los shards (orden cronológico).
+        Con `staging` el plan de shards se conserva entre reintentos y cada shard tiene su checkpoint.
+        """
+        shards = staging.shards if staging is not None else None
+        if shards is None:
+            bounds = self._fetch_date_bounds(client, table_name)
+            if bounds is None:
+                return [], 1
+
+            shards = self._plan_shards(bounds[0], bounds[1], sharding.get("shards", 8))
+            logger.info(f"'{table_name}': extracción completa en {len(shards)} shards ({bounds[0]} a {bounds[1]}).")
+            if staging is not None:
+                staging.shards = shards
+
+        with ThreadPoolExecutor(max_workers=sharding.get("max_workers", 4)) as pool:
+            futures = [
+                pool.submit(
+                    self._fetch_range, client, table_name, mode, page_size, lower, True, upper,
+                    stage=staging.range(f"shard-{i:03d}") if staging is not None else None
+                )
+                for i, (lower, upper) in enumerate(shards)
+            ]
+            shard_results = [future.result() for future in futures]
+
+        page_tables = [table for shard_tables, _ in shard_results for table in shard_tables]
+        pages = sum(shard_pages for _, shard_pages in shard_results)
+        return page_tables, pages
+
+    def _fetch_date_bounds(self, client, table_name: str) -> Optional[Tuple[str, str]]:
+        """Retorna la (min, max) `fecha` de una tabla remota, o None si está vacía."""
+        first = client.table(table_name).select("fecha").order("fecha").limit(1).execute().data
+        last = client.table(table_name).select("fecha").order("fecha", desc=True).limit(1).execute().data
+        if not first or not last:
+            return None
+        return first[0]["fecha"], last[0]["fecha"]
+
+    @staticmethod
+    def _plan_shards(min_date: str, max_date: str, n_shards: int) -> List[Tuple[str, Optional[str]]]:
+        """
+        Divide [min_date, max_date] en rangos diarios contiguos `[inicio, fin)`.
+        El último shard queda abierto por arriba para incluir la fecha máxima y cualquier fila posterior.
+        """
+        start = pd.Timestamp(min_date).normalize()
+        end = pd.Timestamp(max_date).normalize()
+        total_days = (end - start).days + 1
+        n_shards = max(1, min(int(n_shards), total_days))
+
+        edges = [start + pd.Timedelta((i * total_days) // n_shards, unit="D") for i in range(n_shards)]
+        shards = []
+        for i, lower in enumerate(edges):
+            upper = edges[i + 1].strftime("%Y-%m-%d") if i + 1 < n_shards else None
+            shards.append((lower.strftime("%Y-%m-%d"), upper))
+        return shards
+
+    @staticmethod
+    def _apply_bounds(query, lower_bound: Optional[str], lower_inclusive: bool, upper_bound: Optional[str]):
+        """Aplica los filtros de rango de fecha (`gt`/`gte` y `lt`) a una consulta."""
+        if lower_bound:
+            query = query.gte("fecha", lower_bound) if lower_inclusive else query.gt("fecha", lower_bound)
+        if upper_bound:
+            query = query.lt("fecha", upper_bound)
+        return query
+
+    def _fetch_pages_offset(self, client, table_name: str, page_size: int,
+                            lower_bound: Optional[str], lower_inclusive: bool = False,
+                            upper_bound: Optional[str] = None,
+                            stage: Optional[StagedRange] = None) -> Tuple[List[pa.Table], int]:
+        """
+        Paginación clásica con `.range(offset, offset + page_size - 1)`.
+        Postgres descarta todas las filas previas en cada página, por lo que el costo crece con el offset.
+        Con `stage` cada página se confirma en staging y un reintento continúa desde el último offset.
+        """
+        select_clause = self.projection.select_clause(table_name)
+        page_tables, rows, state = self._resume_stage(stage, table_name)
+        if state.get("done"):
+            return page_tables, 0
+        pages = 0
+        offset = state.get("offset", 0)
+
         while True:
-            query = client.table(table_name).select("*").range(offset, offset + page_size - 1)
+            query = client.table(table_name).select(select_clause).range(offset, offset + page_size - 1)
             
-            # Aplicar filtro incremental si existe
-            if last_date:
-                # El formato de fecha debe ser compatible con Supabase (ISO)
-                last_date_str = last_date.strftime("%Y-%m-%d")
-                query = query.gt("fecha", last_date_str)
-                logger.info(f"Filtro incremental activo: fecha > {last_date_str}")
-
-            response = query.execute()
-            data = response.data
+            # Aplicar filtro incremental / de shard si existe
+            query = self._apply_bounds(query, lower_bound, lower_inclusive, upper_bound)
+
+            data = query.execute().data
+            pages += 1
             
             if not data:
+                if stage is not None:
+                    stage.complete()
                 break
                 
-            all_data.extend(data)
+            page = self._decode_page(data, table_name)
+            page_tables.append(page)
+            rows += len(data)
+            offset += page_size
             
             # Si trajimos menos que el page_size, terminamos
-            if len(data) < page_size:
+            last_page = len(data) < page_size
+            if stage is not None:
+                stage.commit(page, offset=offset, done=last_page)
+            if last_page:
                 break
             
-            offset += page_size
-            logger.info(f"Descargados {len(all_data)} registros de '{table_name}'...")
+            logger.info(f"Descargados {rows} registros de '{table_name}'...")
 
-        if not all_data:
-            return pd.DataFrame()
-            
-        df = pd.DataFrame(all_data)
-        if "fecha" in df.columns:
-            df["fecha"] = pd.to_datetime(df["fecha"])
-            
-        return df
+        return page_tables, pages
+
+    def _fetch_pages_keyset(self, client, table_name: str, page_size: int,
+                            lower_bound: Optional[str], lower_inclusive: bool = False,
+                            upper_bound: Optional[str] = None,
+                            stage: Optional[StagedRange] = None) -> Tuple[List[pa.Table], int]:
+        """
+        Paginación por cursor sobre `fecha` (keyset): cada página pide `fecha > último_visto`
+        ordenado por fecha, de modo que el índice resuelve la consulta sin descartar filas previas.
+
+        Como `fecha` puede repetirse en la fuente (el auditor lo reporta), las filas de la última
+        fecha de una página llena se descartan y se vuelven a pedir con `fecha >= cursor` en la
+        página siguiente; así ninguna fecha queda partida entre dos páginas.
+        Con `stage` el cursor confirmado tras cada página se persiste y un reintento continúa desde él.
+        """
+        select_clause = self.projection.select_clause(table_name)
+        page_tables, rows, state = self._resume_stage(stage, table_name)
+        if state.get("done"):
+            return page_tables, 0
+        pages = 0
+        cursor = state.get("cursor", lower_bound)
+        inclusive = state.get("inclusive", lower_inclusive)
+
+        while True:
+            query = client.table(table_name).select(select_clause).order("fecha").limit(page_size)
+            query = self._apply_bounds(query, cursor, inclusive, upper_bound)
+
+            data = query.execute().data
+            pages += 1
+
+            if not data:
+                if stage is not None:
+                    stage.complete()
+                break
+
+            # Página incompleta: no quedan más filas después de esta
+            if len(data) < page_size:
+                page = self._decode_page(data, table_name)
+                page_tables.append(page)
+                if stage is not None:
+                    stage.commit(page, done=True)
+                break
+
+            complete_rows, boundary = self._split_keyset_page(data, page_size, table_name)
+            page = self._decode_page(complete_rows, table_name)
+            page_tables.append(page)
+            rows += len(complete_rows)
+            cursor, inclusive = boundary, True
+            if stage is not None:
+                stage.commit(page, cursor=cursor, inclusive=inclusive)
+            logger.info(f"Descargados {rows} registros de '{table_name}'...")
+
+        return page_tables, pages
+
+    @staticmethod
+    def _split_keyset_page(data: List[Dict[str, Any]], page_size: int,
+                           table_name: str) -> Tuple[List[Dict[str, Any]], str]:
+        """
+        Separa una página llena en filas completas y la fecha frontera, que se vuelve a pedir
+        completa en la página siguiente (`fecha >= frontera`).
+        """
+        boundary = data[-1]["fecha"]
+        complete_rows = [row for row in data if row["fecha"] != boundary]
+        if not complete_rows:
+            raise RuntimeError(
+                f"La fecha {boundary} de '{table_name}' tiene más de {page_size} registros; "
+                f"aumente extractions.pagination.page_size para usar paginación keyset."
+            )
+        return complete_rows, boundary
+
+    @staticmethod
+    def _resume_stage(stage: Optional[StagedRange], table_name: str) -> Tuple[List[pa.Table], int, Dict[str, Any]]:
+        """Páginas, filas y cursor confirmados en un checkpoint previo (vacíos si no hay nada que reanudar)."""
+        if stage is None or not stage.resumed:
+            return [], 0, {}
+        page_tables = stage.load_pages()
+        logger.info(
+            f"Reanudando '{table_name}' desde checkpoint: {stage.state['pages']} páginas "
+            f"({stage.state['rows']} registros) ya confirmadas."
+        )
+        return page_tables, stage.state["rows"], stage.state
 
     def _get_preview(self, df: pd.DataFrame) -> Dict[str, Any]:
         """
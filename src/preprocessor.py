@@ -1,14 +1,37 @@
 import os
+import tempfile
 import pandas as pd
 import numpy as np
 import logging
-from typing import Dict, List, Any
+import multiprocessing
+import pyarrow as pa
+import pyarrow.parquet as pq
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from typing import Dict, List, Any, Optional, Tuple
 from src.utils.config_loader import load_config
 from src.utils.auditor import DataAuditor
 from src.utils.helpers import save_report
+from src.utils.raw_store import RawStore
+from src.utils.projection import ProjectionPlanner
+from src.utils.sentinels import SentinelReplacer
+from src.utils.master_join import CalendarJoiner
+from src.utils.prep_state import PreprocessState
+from src.utils.memory_layout import CompactLayout
+from src.utils.cleaning_plan import compile_cleaning_plans
+from src.utils.streaming import MemoryBudget, SortedRuns, ChunkStats
+from src.utils.explain import ExplainTrace, rss_source
 
 logger = logging.getLogger(__name__)
 
+
+def _preprocess_worker(preprocessor: "DataPreprocessor", table: str):
+    """
+    Limpia una tabla en un proceso del pool (`preprocessing.execution.mode: parallel`).
+    Función de módulo para que pueda enviarse (pickle) a un ProcessPoolExecutor.
+    """
+    return preprocessor._preprocess_table(table)
+
+
 class DataPreprocessor:
     """
     Clase encargada de la Fase 02: Preprocessing.
@@ -23,6 +46,11 @@ class DataPreprocessor:
         self.reports_path = os.path.join(self.config['general']['outputs_path'], "reports/phase_02")
         self.schemas = self.config['extractions']['schemas']
         self.sentinels = self.config['extractions']['sentinel_values']
+        self.sentinel_replacer = SentinelReplacer(self.sentinels)
+        self.raw_store = RawStore(self.raw_path, **self.config['extractions'].get('raw_store', {}))
+        self.projection = ProjectionPlanner(self.config)
+        self.joiner = CalendarJoiner()
+        self.cleaning_plans = compile_cleaning_plans(self.config)
         self.logger = logger
         
         # Asegurar directorio de salida
@@ -31,6 +59,8 @@ class DataPreprocessor:
     def run(self) -> Dict[str, Any]:
         """
         Ejecuta el flujo de preprocesamiento para todas las tablas configuradas.
+        Según `preprocessing.execution.mode` las tablas se limpian en serie ("sequential") o en un pool
+        de procesos ("parallel", `workers` procesos); el reporte es el mismo en ambos modos.
         """
         logger.info("Iniciando Fase 02: Preprocessing (Integridad y Limpieza)")
         
@@ -42,82 +72,538 @@ class DataPreprocessor:
         }
         
         tables = self.config['extractions']['tables']
-        
+        execution = self.config.get('preprocessing', {}).get('execution', {})
+        mode = execution.get('mode', 'sequential')
+        logger.info(f"Limpiando {len(tables)} tablas (modo: {mode})...")
+
+        if mode == "parallel":
+            results = self._run_parallel(tables, execution.get('workers', 4))
+        else:
+            results = {table: self._preprocess_table(table) for table in tables}
+
+        # Consolidación en el orden del config para mantener el reporte determinista
+        cleansed = {}
+        explain = {}
         for table in tables:
-            try:
-                # 1. Cargar data raw
-                file_path = os.path.join(self.raw_path, f"{table}.parquet")
-                if not os.path.exists(file_path):
-                    logger.warning(f"Archivo raw no encontrado para la tabla: {table}")
-                    continue
-                
-                df = pd.read_parquet(file_path)
-                initial_shape = df.shape
-                
-                # 2. Aplicar limpieza de integridad
-                df_cleansed, audit_log = self._clean_table(df, table)
-                
-                # 3. Guardar en cleansed
-                output_file = os.path.join(self.cleansed_path, f"{table}.parquet")
-                df_cleansed.to_parquet(output_file, index=False)
-                
-                phase_report["table_reports"][table] = {
-                    "status": "success",
-                    "initial_shape": initial_shape,
-                    "final_shape": df_cleansed.shape,
-                    "audit_log": audit_log
-                }
-                logger.info(f"Tabla '{table}' preprocesada exitosamente.")
-                
-            except Exception as e:
-                logger.error(f"Error preprocesando tabla '{table}': {str(e)}")
-                phase_report["table_reports"][table] = {
-                    "status": "error",
-                    "error_message": str(e)
-                }
+            result = results.get(table)
+            if result is None:
+                continue
+            phase_report["table_reports"][table], arrow_table = result
+            if "explain" in phase_report["table_reports"][table]:
+                explain[table] = phase_report["table_reports"][table].pop("explain")
+            if arrow_table is not None:
+                cleansed[table] = arrow_table
         
         # 4. Merge Maestro (Consolidación)
-        try:
-            master_report = self._merge_master(phase_report["table_reports"])
-            phase_report["master_audit"] = master_report
-            logger.info("Merge Maestro completado exitosamente.")
-        except Exception as e:
-            logger.error(f"Error en el Merge Maestro: {str(e)}")
-            phase_report["master_audit"] = {"status": "error", "message": str(e)}
+        trace = self._explain_trace()
+        with trace.step("master_merge") as master_node:
+            try:
+                master_report = self._merge_master(phase_report["table_reports"], cleansed, trace)
+                phase_report["master_audit"] = master_report
+                logger.info("Merge Maestro completado exitosamente.")
+            except Exception as e:
+                logger.error(f"Error en el Merge Maestro: {str(e)}")
+                phase_report["master_audit"] = {"status": "error", "message": str(e)}
+
+        # Plan de ejecución instrumentado (`preprocessing.explain`)
+        if trace.enabled:
+            phase_report["explain"] = {
+                "rss_source": rss_source(),
+                "tables": explain,
+                "master_merge": master_node,
+                "hotspots": ExplainTrace.hotspots(list(explain.values()) + [master_node])
+            }
 
         # Guardar Reporte Final
         save_report(phase_report, "phase_02_preprocessing", outputs_path=self.reports_path)
         
         return phase_report
 
-    def _merge_master(self, table_reports: Dict[str, Any]) -> Dict[str, Any]:
+    def _explain_trace(self) -> ExplainTrace:
+        """Traza del plan de ejecución según `preprocessing.explain` (deshabilitada por defecto)."""
+        explain = self.config.get('preprocessing', {}).get('explain', {})
+        return ExplainTrace(explain.get('enabled', False), explain.get('rss_sample_ms', 1) / 1000)
+
+    def _preprocess_table(self, table: str) -> Optional[Tuple[Dict[str, Any], Optional[pa.Table]]]:
+        """
+        Lee, limpia y persiste una tabla. Retorna su entrada del reporte y la tabla limpia en Arrow
+        (None si falló), o None si no hay raw para la tabla.
+        Con `preprocessing.incremental.enabled` se intenta primero limpiar solo la cola (`_preprocess_tail`);
+        con `preprocessing.streaming.enabled` la tabla se limpia por lotes fuera de memoria (`_preprocess_streaming`).
+        Con `preprocessing.explain.enabled` el reporte de la tabla incluye su árbol de pasos (`explain`).
+        """
+        trace = self._explain_trace()
+        with trace.step(table) as node:
+            result = self._process_table(table, trace)
+        if result is not None and trace.enabled:
+            result[0]["explain"] = node
+        return result
+
+    def _process_table(self, table: str, trace: ExplainTrace) -> Optional[Tuple[Dict[str, Any], Optional[pa.Table]]]:
+        """Cuerpo de `_preprocess_table`; cada etapa abre un paso de `trace`."""
+        try:
+            # 1. Cargar data raw (archivo único o dataset particionado)
+            if not self.raw_store.exists(table):
+                logger.warning(f"Archivo raw no encontrado para la tabla: {table}")
+                return None
+
+            incremental = self.config.get('preprocessing', {}).get('incremental', {})
+            if incremental.get('enabled', False):
+                result = self._preprocess_tail(table, verify=incremental.get('verify', False), trace=trace)
+                if result is not None:
+                    return result
+
+            streaming = self.config.get('preprocessing', {}).get('streaming', {})
+            if streaming.get('enabled', False):
+                result = self._preprocess_streaming(table, streaming, trace)
+                if result is not None:
+                    return result
+            
+            with trace.step("read_raw") as node:
+                df = self.raw_store.read(table, self.projection.columns(table))
+                trace.describe(node, df, rows=len(df))
+            initial_shape = df.shape
+            
+            # 2. Aplicar limpieza de integridad
+            mode_input = [] if incremental.get('enabled', False) else None
+            with trace.step("clean_table"):
+                df_cleansed, audit_log = self._clean_table(df, table, trace=trace, mode_input=mode_input)
+            
+            # 3. Guardar en cleansed (misma conversión que DataFrame.to_parquet con index=False)
+            with trace.step("write_cleansed") as node:
+                arrow_table = pa.Table.from_pandas(df_cleansed, preserve_index=False)
+                output_file = os.path.join(self.cleansed_path, f"{table}.parquet")
+                pq.write_table(arrow_table, output_file)
+                trace.describe(node, df_cleansed, rows=len(df_cleansed))
+            
+            logger.info(f"Tabla '{table}' preprocesada exitosamente.")
+            report = {
+                "status": "success",
+                "initial_shape": initial_shape,
+                "final_shape": df_cleansed.shape,
+                "audit_log": audit_log
+            }
+            if incremental.get('enabled', False):
+                report["mode"] = "full"
+                self._save_prep_state(table, df_cleansed, audit_log, mode_input)
+            return report, arrow_table
+            
+        except Exception as e:
+            logger.error(f"Error preprocesando tabla '{table}': {str(e)}")
+            return {"status": "error", "error_message": str(e)}, None
+
+    def _preprocess_tail(self, table: str, verify: bool = False,
+                         trace: Optional[ExplainTrace] = None) -> Optional[Tuple[Dict[str, Any], pa.Table]]:
+        """
+        Limpieza incremental: solo se relee y limpia el raw desde la última fecha limpia (menos
+        `extractions.backfill_days`, donde el upsert puede haber corregido filas). La última fila ya limpia
+        antes de la ventana entra como semilla de los ffill, que es todo el contexto que necesitan las
+        transformaciones (por fila o de rango corto). La cola limpia se anexa al Parquet limpio existente.
+
+        Las modas de imputación salen de los conteos del estado más los de la cola (ver `PreprocessState`),
+        sin releer el histórico. Retorna None (limpieza completa) si no hay estado válido, si el raw cambió
+        fuera de la ventana, si cambió un valor global de imputación (moda) o si la cola alteraría filas ya
+        limpias. Con `verify` la tabla resultante se compara contra una reconstrucción completa (y esta
+        prevalece si difieren).
+        """
+        trace = trace or ExplainTrace(enabled=False)
+        state_path = PreprocessState.path(self.cleansed_path, table)
+        output_file = os.path.join(self.cleansed_path, f"{table}.parquet")
+        state = PreprocessState.load(state_path, self._prep_signature(table))
+        raw_rows = self.raw_store.row_count(table)
+        if state is None or raw_rows is None or not os.path.exists(output_file):
+            return None
+
+        since = self._window_start(state.end)
+        cleansed = pq.read_table(output_file)
+        keys = cleansed.column('fecha').to_numpy().astype("datetime64[ns]")
+        cut = int(np.searchsorted(keys, since.to_datetime64()))
+        if cut == 0:
+            # La ventana cubre todo el histórico: no hay nada que reutilizar
+            return None
+
+        with trace.step("read_window") as node:
+            window = self.raw_store.read(table, self.projection.columns(table), since=since)
+            trace.describe(node, window, rows=len(window))
+        window_dates = pd.to_datetime(window['fecha'], errors='coerce') if 'fecha' in window.columns else None
+        appended = int((window_dates > state.raw_end).sum()) if window_dates is not None else len(window)
+        if raw_rows - appended != state.raw_rows:
+            logger.info(f"El raw de '{table}' cambió fuera de la ventana incremental. Limpieza completa.")
+            return None
+
+        report = {"status": "success", "mode": "incremental", "window_start": since.isoformat(),
+                  "rows_reprocessed": len(window), "initial_shape": window.shape}
+        if window.empty:
+            logger.info(f"Tabla '{table}' sin filas nuevas desde {since.date()}. Se conserva el cleansed.")
+            report.update({"final_shape": (cleansed.num_rows, cleansed.num_columns),
+                           "audit_log": {"status": "success", "initial_rows": 0}})
+            return report, cleansed
+
+        prefix = cleansed.slice(0, cut)
+        seed = prefix.slice(cut - 1).to_pandas()
+        mode_input = []
+        with trace.step("clean_tail"):
+            df_tail, audit_log = self._clean_table(window, table, tail={"seed": seed, "modes": state.modes},
+                                                   trace=trace, mode_input=mode_input)
+        if audit_log.get("status") != "success" or df_tail.empty or not mode_input:
+            return None
+        # Moda del histórico = conteos previos (fechas antes de la ventana) + cola deduplicada
+        totals = self._mode_stats(table, state.mode_counts)
+        totals.count(mode_input[0])
+        modes = totals.modes()
+        if modes != state.modes:
+            logger.info(f"Cambió la moda de imputación de '{table}' ({state.modes} -> {modes}). Limpieza completa.")
+            return None
+        # Si la cola llena nulos de la semilla (ej. bfill de una columna sin historia), también cambiaría
+        # filas ya limpias: solo una reconstrucción completa es exacta
+        seed_nulls = seed.iloc[0].isna().to_numpy()
+        if (seed_nulls & df_tail.iloc[0].reindex(seed.columns).notna().to_numpy()).any():
+            logger.info(f"La cola de '{table}' imputa nulos del histórico limpio. Limpieza completa.")
+            return None
+
+        tail_table = pa.Table.from_pandas(df_tail.iloc[1:], preserve_index=False)
+        if tail_table.column_names != prefix.column_names:
+            return None
+        try:
+            # Mismo dtype que la reconstrucción completa: int64 + double -> double, null + string -> string
+            schema = pa.unify_schemas([prefix.schema.remove_metadata(), tail_table.schema.remove_metadata()],
+                                      promote_options="permissive")
+            combined = pa.concat_tables([prefix.replace_schema_metadata(None).cast(schema),
+                                         tail_table.replace_schema_metadata(None).cast(schema)])
+        except (pa.ArrowInvalid, pa.ArrowTypeError, pa.ArrowNotImplementedError) as e:
+            logger.info(f"Tipos de la cola de '{table}' incompatibles con el cleansed ({str(e)}). Limpieza completa.")
+            return None
+
+        audit_log["valores_nulos_finales"] = int(sum(column.null_count for column in combined.columns))
+        if verify:
+            df_full, _ = self._clean_table(self.raw_store.read(table, self.projection.columns(table)), table)
+            report["verified"] = bool(df_full.reset_index(drop=True).equals(combined.to_pandas()))
+            if not report["verified"]:
+                logger.error(f"La limpieza incremental de '{table}' difiere de la reconstrucción completa. "
+                             f"Se persiste la reconstrucción completa.")
+                combined = pa.Table.from_pandas(df_full, preserve_index=False)
+                audit_log["valores_nulos_finales"] = int(df_full.isnull().sum().sum())
+
+        with trace.step("write_cleansed") as node:
+            pq.write_table(combined, output_file)
+            trace.describe(node, combined, rows=combined.num_rows)
+        raw_end = max(state.raw_end, window_dates.max()) if window_dates is not None and window_dates.notna().any() else state.raw_end
+        end = pd.Timestamp(combined.column('fecha')[-1].as_py())
+        settled = self._mode_stats(table, state.mode_counts)
+        settled.count(mode_input[0][mode_input[0]['fecha'] < self._window_start(end)])
+        PreprocessState(state.signature, end, raw_rows, raw_end, modes, settled.counts).save(state_path)
+
+        logger.info(f"Tabla '{table}' preprocesada incrementalmente desde {since.date()} ({len(window)} filas raw).")
+        report.update({"final_shape": (combined.num_rows, combined.num_columns), "audit_log": audit_log})
+        return report, combined
+
+    def _preprocess_streaming(self, table: str, streaming: Dict[str, Any],
+                              trace: Optional[ExplainTrace] = None) -> Optional[Tuple[Dict[str, Any], None]]:
+        """
+        Limpieza fuera de memoria: el raw se recorre como record batches de un `pyarrow.dataset` sin
+        materializar la tabla, con los mismos pasos y el mismo resultado que `_clean_table`:
+
+        1. Por lote: centinelas, hash de fila (duplicados exactos), columnas de contrato y fecha; el lote se
+           escribe ordenado como una corrida en un directorio de spill (`SortedRuns`).
+        2. Merge k-vías de las corridas (última versión de cada fecha), etapa `before_reindex` del plan y
+           reindexación diaria continuando el calendario del trozo anterior; cada trozo se escribe al spill.
+        3. Etapa `after_reindex` por trozo con las modas de toda la tabla y los bordes de ffill/bfill (última
+           fila limpia del trozo anterior y siguiente valor no nulo de los posteriores, ver `ChunkStats`).
+        4. Los trozos limpios se escriben uno a uno al Parquet limpio con el esquema unificado (ej. int64 ->
+           double si algún trozo tiene huecos), igual que la tabla completa.
+
+        El tamaño de lote sale de `memory_limit_mb` (o `batch_rows`). Retorna None (limpieza en memoria) si la
+        tabla no tiene contrato con `fecha` o no tiene filas. La tabla limpia no se retorna en Arrow: el merge
+        maestro la lee del disco. Con `trace` (modo explain) cada una de las 4 etapas es un paso del plan.
+        """
+        trace = trace or ExplainTrace(enabled=False)
+        schema = self.schemas.get(table)
+        if schema is None or 'fecha' not in schema:
+            return None
+        columns = self.projection.columns(table)
+        budget = MemoryBudget(streaming.get('memory_limit_mb', 256), batch_rows=streaming.get('batch_rows'))
+        batch_rows = budget.batch_rows(self.raw_store.sample(table, columns))
+        valid_cols = list(schema.keys())
+        plan = self.cleaning_plans.get(table)
+        output_file = os.path.join(self.cleansed_path, f"{table}.parquet")
+
+        audit_log = {"status": "success", "initial_rows": 0, "sentinels_replaced": {}}
+        removed_columns = set()
+        initial_columns = 0
+        batches = 0
+        spill_root = streaming.get('spill_path') or self.cleansed_path
+        os.makedirs(spill_root, exist_ok=True)
+        with tempfile.TemporaryDirectory(prefix=f".{table}-spill-", dir=spill_root) as spill_dir:
+            # 1. Lotes del raw -> corridas ordenadas por fecha
+            with trace.step("scan_runs", batch_rows=batch_rows) as node:
+                runs = SortedRuns(spill_dir)
+                for batch in self.raw_store.iter_batches(table, columns, batch_rows):
+                    df = batch.to_pandas()
+                    budget.observe(df)
+                    batches += 1
+                    initial_columns = df.shape[1]
+                    audit_log["initial_rows"] += len(df)
+                    df, sentinel_counts = self.sentinel_replacer.replace(df)
+                    for col, hits in sentinel_counts.items():
+                        audit_log["sentinels_replaced"][col] = audit_log["sentinels_replaced"].get(col, 0) + hits
+                    hashes = SortedRuns.row_hashes(df)
+                    actual_valid_cols = [c for c in valid_cols if c in df.columns]
+                    removed_columns.update(set(df.columns) - set(actual_valid_cols))
+                    df = df[actual_valid_cols]
+                    if 'fecha' not in df.columns:
+                        return None
+                    df['fecha'] = pd.to_datetime(df['fecha'])
+                    runs.add(df, hashes)
+                trace.describe(node, rows=audit_log["initial_rows"])
+            if not runs.paths:
+                return None
+
+            # 2. Merge k-vías + before_reindex + reindexación diaria
+            with trace.step("merge_reindex") as node:
+                stats = ChunkStats(plan.mode_columns if plan is not None else {})
+                stage_paths = []
+                previous_end = None
+                days = 0
+                for chunk in runs.merge(batch_rows):
+                    budget.observe(chunk)
+                    if plan is not None:
+                        counts = {}
+                        chunk, _ = plan.run(chunk, "before_reindex", counts)
+                        self._add_counts(audit_log, counts)
+                    start = previous_end + pd.Timedelta(1, unit='D') if previous_end is not None else chunk['fecha'].min()
+                    full_range = pd.date_range(start=start, end=chunk['fecha'].max(), freq='D')
+                    previous_end = full_range[-1]
+                    chunk = chunk.set_index('fecha').reindex(full_range).reset_index()
+                    chunk = chunk.rename(columns={'index': 'fecha'})
+                    stats.observe(chunk)
+                    days += len(chunk)
+                    stage_paths.append(os.path.join(spill_dir, f"stage-{len(stage_paths):06d}.parquet"))
+                    pq.write_table(pa.Table.from_pandas(chunk, preserve_index=False), stage_paths[-1])
+                trace.describe(node, rows=days)
+            audit_log["exact_duplicates_removed"] = runs.exact_duplicates
+            audit_log["removed_columns"] = list(removed_columns)
+            audit_log["duplicate_dates_removed"] = runs.duplicate_dates
+
+            # 3. after_reindex por trozo con modas globales y bordes de ffill/bfill
+            with trace.step("after_reindex") as node:
+                modes = stats.modes()
+                lookahead = stats.lookahead()
+                previous = None
+                output_paths = []
+                for i, path in enumerate(stage_paths):
+                    chunk = pq.read_table(path).to_pandas()
+                    if plan is not None:
+                        after = chunk.iloc[[-1]].reset_index(drop=True)
+                        for col, value in lookahead[i].items():
+                            if col in after.columns and pd.isna(after.at[0, col]):
+                                after[col] = [value]
+                        counts = {}
+                        chunk, _ = plan.run(chunk, "after_reindex", counts, modes=modes,
+                                            edges={"before": previous, "after": after})
+                        self._add_counts(audit_log, counts)
+                    previous = chunk.iloc[[-1]].reset_index(drop=True)
+                    output_paths.append(os.path.join(spill_dir, f"clean-{i:06d}.parquet"))
+                    pq.write_table(pa.Table.from_pandas(chunk, preserve_index=False), output_paths[-1])
+                trace.describe(node, rows=days)
+
+            # 4. Escritura lote a lote con el esquema unificado de todos los trozos
+            with trace.step("write_cleansed") as node:
+                unified = pa.unify_schemas([pq.read_schema(path).remove_metadata() for path in output_paths],
+                                           promote_options="permissive")
+                rows = nulls = 0
+                tmp_file = f"{output_file}.tmp"
+                with pq.ParquetWriter(tmp_file, unified) as writer:
+                    for path in output_paths:
+                        part = pq.read_table(path).replace_schema_metadata(None).cast(unified)
+                        writer.write_table(part)
+                        rows += part.num_rows
+                        nulls += sum(column.null_count for column in part.columns)
+                os.replace(tmp_file, output_file)
+                trace.describe(node, rows=rows)
+
+            # Conteos de moda del estado incremental: se descuentan las filas que la próxima ventana relee
+            incremental = self.config.get('preprocessing', {}).get('incremental', {})
+            if incremental.get('enabled', False):
+                settled = self._mode_stats(table, stats.counts)
+                since = self._window_start(previous_end)
+                names = pq.read_schema(stage_paths[0]).names
+                count_columns = ['fecha'] + [c for c in settled.counts if c in names]
+                for path in reversed(stage_paths):
+                    chunk = pq.read_table(path, columns=count_columns).to_pandas()
+                    settled.count(chunk[chunk['fecha'] >= since], weight=-1)
+                    if chunk['fecha'].iloc[0] < since:
+                        break
+
+        audit_log["gaps_filled"] = 0
+        audit_log["total_days_final"] = rows
+        audit_log["valores_nulos_finales"] = int(nulls)
+
+        if incremental.get('enabled', False):
+            state_path = PreprocessState.path(self.cleansed_path, table)
+            raw_rows = self.raw_store.row_count(table)
+            if raw_rows is None:
+                PreprocessState.discard(state_path)
+            else:
+                PreprocessState(self._prep_signature(table), previous_end, raw_rows, previous_end,
+                                modes, settled.counts).save(state_path)
+
+        logger.info(f"Tabla '{table}' preprocesada por lotes ({batches} lotes de hasta {batch_rows} filas, "
+                    f"{len(runs.paths)} corridas, {len(stage_paths)} trozos).")
+        report = {
+            "status": "success",
+            "mode": "streaming",
+            "initial_shape": (audit_log["initial_rows"], initial_columns),
+            "final_shape": (rows, len(unified.names)),
+            "audit_log": audit_log,
+            "streaming": {"batch_rows": batch_rows, "batches": batches, "runs": len(runs.paths),
+                          "chunks": len(stage_paths), **budget.report()}
+        }
+        return report, None
+
+    @staticmethod
+    def _add_counts(audit_log: Dict[str, Any], counts: Dict[str, int]) -> None:
+        """Suma los conteos del plan de un trozo a los de la tabla (modo por lotes)."""
+        for key, value in counts.items():
+            audit_log[key] = audit_log.get(key, 0) + value
+
+    def _save_prep_state(self, table: str, df_cleansed: pd.DataFrame, audit_log: Dict[str, Any],
+                         mode_input: Optional[List[pd.DataFrame]] = None) -> None:
+        """
+        Registra el estado de una limpieza completa para que la próxima corrida pueda ser incremental.
+        `mode_input` es la entrada de las imputaciones por moda que dejó `_clean_table`.
+        """
+        state_path = PreprocessState.path(self.cleansed_path, table)
+        raw_rows = self.raw_store.row_count(table)
+        if audit_log.get("status") != "success" or raw_rows is None or 'fecha' not in df_cleansed.columns \
+                or df_cleansed.empty:
+            PreprocessState.discard(state_path)
+            return
+        end = pd.Timestamp(df_cleansed['fecha'].max())
+        totals = self._mode_stats(table)
+        settled = self._mode_stats(table)
+        if mode_input:
+            totals.count(mode_input[0])
+            settled.count(mode_input[0][mode_input[0]['fecha'] < self._window_start(end)])
+        PreprocessState(self._prep_signature(table), end, raw_rows, end,
+                        totals.modes(), settled.counts).save(state_path)
+
+    def _prep_signature(self, table: str) -> Dict[str, Any]:
+        """Firma del estado incremental: todo lo que cambia la limpieza de filas ya procesadas."""
+        return {
+            "schema": self.schemas.get(table),
+            "sentinels": self.sentinels,
+            "columns": self.projection.columns(table),
+            "backfill_days": self._backfill_days()
+        }
+
+    def _backfill_days(self) -> int:
+        """Días que el upsert de la Fase 01 puede corregir hacia atrás (`extractions.backfill_days`)."""
+        return int(self.config['extractions'].get('backfill_days', 0) or 0)
+
+    def _window_start(self, end: pd.Timestamp) -> pd.Timestamp:
+        """Primera fecha que relee la corrida incremental tras limpiar hasta `end` (`extractions.backfill_days`)."""
+        return end + pd.Timedelta(1 - self._backfill_days(), unit="D")
+
+    def _mode_stats(self, table_name: str, counts: Optional[Dict[str, Dict[Any, int]]] = None) -> ChunkStats:
+        """
+        Conteos de las imputaciones por moda del plan de limpieza (ej. `tipo_lluvia` en clima), partiendo de
+        `counts` (los del estado incremental). Su moda es la de `Series.mode()` sobre las mismas filas.
+        """
+        plan = self.cleaning_plans.get(table_name)
+        stats = ChunkStats(plan.mode_columns if plan is not None else {})
+        for col, values in (counts or {}).items():
+            if col in stats.counts:
+                stats.counts[col] = dict(values)
+        return stats
+
+    def _run_parallel(self, tables: List[str], workers: int) -> Dict[str, Any]:
+        """
+        Limpia las tablas en un pool de procesos: cada `_clean_table` es independiente hasta el merge
+        maestro. Las tablas limpias vuelven como Arrow (buffers serializados sin pasar por object), así el
+        merge no relee el Parquet recién escrito.
+        """
+        results = {}
+        if not tables:
+            return results
+        # 'spawn' evita hacer fork de un proceso con hilos activos (igual que el pool de auditorías de la Fase 01)
+        with ProcessPoolExecutor(max_workers=max(1, min(workers, len(tables))),
+                                 mp_context=multiprocessing.get_context("spawn")) as pool:
+            futures = {pool.submit(_preprocess_worker, self, table): table for table in tables}
+            for future in as_completed(futures):
+                table = futures[future]
+                try:
+                    results[table] = future.result()
+                except Exception as e:
+                    # Caída del proceso o resultado no serializable: la tabla queda como error
+                    logger.error(f"Error preprocesando tabla '{table}': {str(e)}")
+                    results[table] = ({"status": "error", "error_message": str(e)}, None)
+        return results
+
+    def _merge_master(self, table_reports: Dict[str, Any], cleansed: Optional[Dict[str, pa.Table]] = None,
+                      trace: Optional[ExplainTrace] = None) -> Dict[str, Any]:
         """
         Une todas las tablas preprocesadas en un solo dataset maestro.
+        Las tablas presentes en `cleansed` (Arrow, ya en memoria) no se releen desde disco; la unión se
+        alinea sobre el calendario diario compartido (ver `CalendarJoiner`) en lugar de merges encadenados.
+        Con `trace` (modo explain) cada etapa del merge es un paso del plan.
         """
-        dfs = []
-        for table, report in table_reports.items():
-            if report.get("status") == "success":
-                file_path = os.path.join(self.cleansed_path, f"{table}.parquet")
-                dfs.append(pd.read_parquet(file_path))
+        trace = trace or ExplainTrace(enabled=False)
+        cleansed = cleansed or {}
+        tables = {}
+        with trace.step("collect_tables") as node:
+            for table, report in table_reports.items():
+                if report.get("status") == "success":
+                    if table in cleansed:
+                        tables[table] = cleansed[table]
+                        continue
+                    file_path = os.path.join(self.cleansed_path, f"{table}.parquet")
+                    tables[table] = pq.read_table(file_path)
+            trace.describe(node, rows=sum(arrow_table.num_rows for arrow_table in tables.values()))
         
-        if not dfs:
+        if not tables:
             raise ValueError("No hay tablas preprocesadas exitosamente para unir.")
         
-        # Merge secuencial por fecha
-        master_df = dfs[0]
-        for next_df in dfs[1:]:
-            # Usamos inner merge ya que todas fueron reindexadas al mismo rango
-            master_df = pd.merge(master_df, next_df, on='fecha', how='inner')
+        # Unión en una sola pasada sobre el calendario diario compartido (equivale al inner merge por fecha)
+        with trace.step("calendar_join") as node:
+            master_table, coverage = self.joiner.join(tables)
+            trace.describe(node, master_table, rows=master_table.num_rows)
+        with trace.step("to_pandas") as node:
+            master_df = master_table.to_pandas()
         
-        # Establecer la fecha como índice (Punto Crítico para Series de Tiempo)
-        master_df = master_df.set_index('fecha')
+            # Establecer la fecha como índice (Punto Crítico para Series de Tiempo)
+            master_df = master_df.set_index('fecha')
+            trace.describe(node, master_df, rows=len(master_df))
         
+        # Esquema compacto opcional (categóricas, enteros/banderas angostos, float32 en mediciones)
+        layout = self.config.get('preprocessing', {}).get('master_layout', {})
+        layout_report = None
+        if layout.get('compact', False):
+            with trace.step("compact_layout") as node:
+                compactor = CompactLayout(layout.get('category_max_ratio', 0.5), layout.get('float32', []))
+                master_df, layout_report = compactor.compact(master_df)
+                trace.describe(node, master_df, rows=len(master_df))
+
         # Guardar Master Data
-        master_output = os.path.join(self.cleansed_path, "master_data.parquet")
-        master_df.to_parquet(master_output, index=True) # index=True para conservar el índice de fecha
+        with trace.step("write_master") as node:
+            master_output = os.path.join(self.cleansed_path, "master_data.parquet")
+            master_df.to_parquet(master_output, index=True) # index=True para conservar el índice de fecha
+            if layout_report is not None:
+                layout_report["disk_bytes"]["after"] = os.path.getsize(master_output)
+            trace.describe(node, master_df, rows=len(master_df))
         
         # Auditoría del Master
-        audit = {
+        with trace.step("master_audit") as node:
+            audit = self._master_audit(master_df, coverage)
+            trace.describe(node, master_df, rows=len(master_df))
+        if layout_report is not None:
+            audit["memory_layout"] = layout_report
+        
+        return audit
+
+    @staticmethod
+    def _master_audit(master_df: pd.DataFrame, coverage: Dict[str, Any]) -> Dict[str, Any]:
+        """Auditoría del Master: dimensiones, tipos, nulos, duplicados, rango de fechas y cobertura del join."""
+        return {
             "total_rows": len(master_df),
             "total_columns": len(master_df.columns),
             "columns_info": {col: str(dtype) for col, dtype in master_df.dtypes.items()},
@@ -128,15 +614,23 @@ class DataPreprocessor:
             "date_range": {
                 "start": master_df.index.min().isoformat(),
                 "end": master_df.index.max().isoformat()
-            }
+            },
+            "join_coverage": coverage
         }
-        
-        return audit
 
-    def _clean_table(self, df: pd.DataFrame, table_name: str) -> (pd.DataFrame, Dict[str, Any]):
+    def _clean_table(self, df: pd.DataFrame, table_name: str,
+                     tail: Optional[Dict[str, Any]] = None,
+                     trace: Optional[ExplainTrace] = None,
+                     mode_input: Optional[List[pd.DataFrame]] = None) -> (pd.DataFrame, Dict[str, Any]):
         """
         Aplica los 6 puntos de limpieza definidos por el usuario.
+        `tail` (modo incremental): `seed`, la última fila ya limpia antes de la ventana, que se antepone
+        antes de reindexar para que los ffill continúen desde ella, y `modes`, las modas del histórico.
+        `trace` (modo explain): cada punto es un paso del plan con su tiempo, RSS, filas tocadas y forma de salida.
+        `mode_input` (estado incremental): recibe `fecha` y las columnas imputadas con la moda tal como entran
+        a la imputación (deduplicadas, reindexadas y sin la semilla), la base de la que sale la moda.
         """
+        trace = trace or ExplainTrace(enabled=False)
         schema = self.schemas.get(table_name)
         if schema is None:
             self.logger.warning(f"Table {table_name} not found in schemas config. Skipping cleaning.")
@@ -144,92 +638,55 @@ class DataPreprocessor:
             
         audit_log = {"status": "success"}
         valid_cols = list(schema.keys())
+        plan = self.cleaning_plans.get(table_name)
         
         try:
             # PANTALLAZO INICIAL
             audit_log["initial_rows"] = len(df)
 
             # 1. Manejo de Centinelas (Punto 6)
-            all_sentinels = []
-            for v in self.sentinels.values():
-                all_sentinels.extend([str(val) for val in v])
-                all_sentinels.extend([val for val in v if isinstance(val, (int, float))])
-            
-            # Reemplazar valores exactos
-            df = df.replace(all_sentinels, np.nan)
+            # Reemplazar valores exactos (máscara por dtype de columna; mismo resultado que df.replace)
+            with trace.step("sentinels") as node:
+                df, sentinel_counts = self.sentinel_replacer.replace(df)
+                audit_log["sentinels_replaced"] = sentinel_counts
+                trace.describe(node, df, rows=sum(sentinel_counts.values()))
             
             # 2. Eliminación de filas repetidas (deja el último registro) (Punto 2)
-            rows_before = len(df)
-            df = df.drop_duplicates(keep='last')
-            audit_log["exact_duplicates_removed"] = rows_before - len(df)
+            with trace.step("exact_duplicates") as node:
+                rows_before = len(df)
+                df = df.drop_duplicates(keep='last')
+                audit_log["exact_duplicates_removed"] = rows_before - len(df)
+                trace.describe(node, df, rows=rows_before)
 
             # 3. Eliminación de columnas fuera de contrato (Punto 3)
-            cols_before = set(df.columns)
-            actual_valid_cols = [c for c in valid_cols if c in df.columns]
-            df = df[actual_valid_cols]
-            audit_log["removed_columns"] = list(cols_before - set(actual_valid_cols))
+            with trace.step("contract_columns") as node:
+                cols_before = set(df.columns)
+                actual_valid_cols = [c for c in valid_cols if c in df.columns]
+                df = df[actual_valid_cols]
+                audit_log["removed_columns"] = list(cols_before - set(actual_valid_cols))
+                trace.describe(node, df, rows=len(df))
 
             # 4. Manejo de fechas duplicadas (deja el último registro oficial) (Punto 4)
             if 'fecha' in df.columns:
-                df['fecha'] = pd.to_datetime(df['fecha'])
-                df = df.sort_values('fecha')
-                rows_before = len(df)
-                df = df.groupby('fecha').tail(1)
-                audit_log["duplicate_dates_removed"] = rows_before - len(df)
-
-            # --- AJUSTES DE REGLAS DE NEGOCIO (Puntos 7 al 11) ---
-                if table_name == "ventas":
-                    # Punto 7 y 8: Unidades en Promoción (2x1)
-                    req_ventas = ["es_promocion", "unidades_pagas", "unidades_bonificadas"]
-                    if not all(c in df.columns for c in req_ventas):
-                        raise KeyError(f"Missing required columns for 'ventas' logic: {[c for c in req_ventas if c not in df.columns]}")
-
-                    # Solo aplicamos el ajuste de bonificadas = pagas en días de promoción
-                    promo_mask = df["es_promocion"] == 1
-                    diff_mask = df["unidades_pagas"] != df["unidades_bonificadas"]
-                    fix_mask = promo_mask & diff_mask
-                    
-                    df.loc[fix_mask, "unidades_bonificadas"] = df.loc[fix_mask, "unidades_pagas"]
-                    audit_log["ajustes_bonificadas_promocion"] = int(fix_mask.sum())
-                    
-                    # Punto 8: Recalcular totales para asegurar consistencia
-                    df["unidades_totales"] = df["unidades_pagas"] + df["unidades_bonificadas"]
-
-                if table_name == "inventario":
-                    # Punto 9, 10 y 11: Balance de Inventario y Ventas Reales
-                    cols_inv_needed = ["ventas_reales_pagas", "ventas_reales_bonificadas", "buñuelos_preparados", "unidades_agotadas"]
-                    if not all(c in df.columns for c in cols_inv_needed):
-                        raise KeyError(f"Missing required columns for 'inventario' logic: {[c for c in cols_inv_needed if c not in df.columns]}")
-                    
-                    # Flag de promo por fecha (Abr-May / Sep-Oct, >= 2022) según Regla de Oro
-                    m = df["fecha"].dt.month
-                    y = df["fecha"].dt.year
-                    is_promo = (y >= 2022) & (m.isin([4, 5, 9, 10]))
-                    
-                    diff_mask = df["ventas_reales_pagas"] != df["ventas_reales_bonificadas"]
-                    fix_mask = is_promo & diff_mask
-                    
-                    # Punto 9: Ajuste de bonificadas
-                    df.loc[fix_mask, "ventas_reales_bonificadas"] = df.loc[fix_mask, "ventas_reales_pagas"]
-                    audit_log["ajustes_ventas_bonificadas_promocion"] = int(fix_mask.sum())
-                    
-                    # Punto 10: Actualizar ventas reales totales
-                    df["ventas_reales_totales"] = df["ventas_reales_pagas"] + df["ventas_reales_bonificadas"]
-                    
-                    # Punto 11: Actualizar desperdicios
-                    df["buñuelos_desperdiciados"] = df["buñuelos_preparados"] - df["ventas_reales_totales"]
-
-                    # Punto 12: Recalcular demanda_teorica_total (Verdad Absoluta)
-                    # La demanda real es lo que se vendió más lo que faltó por vender (agotados)
-                    # Identificar inconsistencias antes de corregir (para el reporte)
-                    expected_demand = df["ventas_reales_totales"] + df["unidades_agotadas"]
-                    
-                    if "demanda_teorica_total" in df.columns:
-                        inconsistencies_mask = df["demanda_teorica_total"] != expected_demand
-                        audit_log["correccion_demanda_inconsistente"] = int(inconsistencies_mask.sum())
-                    
-                    # Aplicar el recálculo a toda la serie para asegurar uniformidad
-                    df["demanda_teorica_total"] = expected_demand
+                with trace.step("date_dedup") as node:
+                    df['fecha'] = pd.to_datetime(df['fecha'])
+                    df = df.sort_values('fecha', kind='stable')
+                    rows_before = len(df)
+                    df = df.groupby('fecha').tail(1)
+                    audit_log["duplicate_dates_removed"] = rows_before - len(df)
+                    trace.describe(node, df, rows=rows_before)
+
+            # --- AJUSTES DE REGLAS DE NEGOCIO (Puntos 7 al 12): plan de limpieza, etapa before_reindex ---
+                if plan is not None:
+                    with trace.step("before_reindex") as node:
+                        df, _ = plan.run(df, "before_reindex", audit_log, trace=trace)
+                        trace.describe(node, df, rows=len(df))
+
+            # Semilla incremental: ya limpia, se antepone después de los ajustes por fila
+            if tail is not None:
+                with trace.step("seed_concat") as node:
+                    df = pd.concat([tail["seed"], df], ignore_index=True)
+                    trace.describe(node, df, rows=len(tail["seed"]))
 
             # 5. Llenado de huecos / Continuidad Temporal (Punto 5)
             # Determinar rango completo
@@ -237,83 +694,30 @@ class DataPreprocessor:
             max_date = df['fecha'].max()
             
             if pd.notnull(min_date) and pd.notnull(max_date):
-                full_range = pd.date_range(start=min_date, end=max_date, freq='D')
-                df = df.set_index('fecha').reindex(full_range).reset_index()
-                df = df.rename(columns={'index': 'fecha'})
-                audit_log["gaps_filled"] = len(full_range) - len(full_range) # Esto es solo informativo
-                audit_log["total_days_final"] = len(df)
-
-            # --- IMPUTACIONES ESPECÍFICAS POR TABLA (Puntos 1 al 4 del clima) ---
-            if table_name == "clima":
-                # Punto 1: Imputación numérica (ffill -> bfill)
-                cols_weather = ["temperatura_media", "probabilidad_lluvia", "precipitacion_mm"]
-                for col in [c for c in cols_weather if c in df.columns]:
-                    df[col] = df[col].ffill().bfill()
-                
-                # Punto 2: Imputación categórica (Moda/Ninguna)
-                if "tipo_lluvia" in df.columns:
-                    # Intentamos calcular la moda, sino usamos 'Ninguna'
-                    mode_series = df["tipo_lluvia"].mode()
-                    mode_val = mode_series[0] if not mode_series.empty else "Ninguna"
-                    df["tipo_lluvia"] = df["tipo_lluvia"].fillna(mode_val)
-                
-                # Punto 3: Actualizar es_dia_lluvioso basado en tipo_lluvia
-                if "tipo_lluvia" in df.columns and "es_dia_lluvioso" in df.columns:
-                    df["es_dia_lluvioso"] = df["tipo_lluvia"].apply(lambda x: 0 if x == "Ninguna" else 1)
-                
-                # Punto 4: Imputación evento_macro (valor anterior)
-                if "evento_macro" in df.columns:
-                    df["evento_macro"] = df["evento_macro"].ffill()
-                    # Si el primer valor es nulo, bfill para evitar NaNs iniciales (opcional pero recomendado)
-                    df["evento_macro"] = df["evento_macro"].bfill()
-
-            if table_name == "finanzas":
-                # Punto 1: Imputación de precio y costo
-                fin_cols = ["precio_unitario", "costo_unitario"]
-                if all(c in df.columns for c in fin_cols):
-                    # Aplicamos ffill primero para que los 1 de enero (y otros) tomen el valor anterior
-                    # Luego bfill para cubrir el inicio de la serie
-                    df[fin_cols] = df[fin_cols].ffill().bfill()
-                
-                # Punto 2: Recálculo de márgenes
-                if all(c in df.columns for c in ["precio_unitario", "costo_unitario"]):
-                    df["margen_bruto"] = df["precio_unitario"] - df["costo_unitario"]
-                    # Evitar división por cero
-                    df["porcentaje_margen"] = np.where(df["precio_unitario"] != 0, 
-                                                     df["margen_bruto"] / df["precio_unitario"], 
-                                                     0)
-
-            if table_name == "macroeconomia":
-                # Punto 1: Imputación Forward Fill (prioridad) -> Backward Fill
-                df = df.ffill().bfill()
-
-            if table_name == "marketing":
-                # Punto 1: Imputación de costos (ffill -> bfill)
-                mkt_cols = ["ig_cost", "fb_cost"]
-                if all(c in df.columns for c in mkt_cols):
-                    df[mkt_cols] = df[mkt_cols].ffill().bfill()
-                
-                # Punto 2: Campaña activa (1 si hay inversión > 0)
-                if all(c in df.columns for c in ["ig_cost", "fb_cost", "campaña_activa"]):
-                    df["campaña_activa"] = ((df["ig_cost"] > 0) | (df["fb_cost"] > 0)).astype(int)
-                
-                # Punto 3: Inversión total
-                if all(c in df.columns for c in ["ig_cost", "fb_cost"]):
-                    df["inversion_total"] = df["ig_cost"] + df["fb_cost"]
-                
-                # Punto 4: Porcentajes de inversión (evitando división por cero)
-                if "inversion_total" in df.columns:
-                    if "ig_cost" in df.columns:
-                        df["ig_pct"] = np.where(df["inversion_total"] != 0, 
-                                               df["ig_cost"] / df["inversion_total"], 
-                                               0)
-                    if "fb_cost" in df.columns:
-                        df["fb_pct"] = np.where(df["inversion_total"] != 0, 
-                                               df["fb_cost"] / df["inversion_total"], 
-                                               0)
+                with trace.step("reindex") as node:
+                    rows_before = len(df)
+                    full_range = pd.date_range(start=min_date, end=max_date, freq='D')
+                    df = df.set_index('fecha').reindex(full_range).reset_index()
+                    df = df.rename(columns={'index': 'fecha'})
+                    audit_log["gaps_filled"] = len(full_range) - len(full_range) # Esto es solo informativo
+                    audit_log["total_days_final"] = len(df)
+                    trace.describe(node, df, rows=len(df) - rows_before)
+
+            if mode_input is not None and 'fecha' in df.columns:
+                columns = ['fecha'] + [c for c in (plan.mode_columns if plan is not None else {}) if c in df.columns]
+                mode_input.append(df.iloc[len(tail["seed"]) if tail is not None else 0:][columns])
+
+            # --- IMPUTACIONES Y RECÁLCULOS POR TABLA: plan de limpieza, etapa after_reindex ---
+            if plan is not None:
+                with trace.step("after_reindex") as node:
+                    df, _ = plan.run(df, "after_reindex", audit_log,
+                                     modes=tail["modes"] if tail is not None else None, trace=trace)
+                    trace.describe(node, df, rows=len(df))
 
             # VERIFICACIÓN FINAL DE CALIDAD
-            audit_log["valores_nulos_finales"] = int(df.isnull().sum().sum())
+            with trace.step("null_check") as node:
+                audit_log["valores_nulos_finales"] = int(df.isnull().sum().sum())
+                trace.describe(node, df, rows=len(df))
 
         except Exception as e:
             self.logger.error(f"Error limpiando tabla {table_name}: {str(e)}")
@@ -0,0 +1,65 @@
+import os
+import json
+import logging
+import datetime
+from typing import Any, Dict, Optional
+from src.utils.profiler import TableSummary
+
+logger = logging.getLogger(__name__)
+
+
+class AuditState:
+    """
+    Estado fusionable de la auditoría de una tabla, persistido junto al raw (`RawStore.audit_state_path`).
+
+    Guarda el resumen columnar de la tabla (conteos, nulos, centinelas, distribución de valores o
+    centroides con suma/suma de cuadrados/min/max, integridad de fechas) y, por regla de negocio, el
+    conteo de violaciones y sus primeras fechas. La firma (columnas y dtypes, contrato, centinelas, límite de valores distintos) invalida el
+    estado cuando cambia algo que alteraría el reporte.
+    """
+
+    VERSION = 2
+
+    def __init__(self, signature: Dict[str, Any], summary: TableSummary, rules: Dict[str, Dict[str, Any]]):
+        self.signature = signature
+        self.summary = summary
+        self.rules = rules
+
+    @classmethod
+    def load(cls, path: str, signature: Dict[str, Any]) -> Optional["AuditState"]:
+        """Estado persistido si existe, es legible y su firma coincide; None en otro caso."""
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                payload = json.load(f)
+            if payload.get("version") != cls.VERSION or payload.get("signature") != signature:
+                logger.info(f"Estado de auditoría en {path} con firma distinta. Se reconstruye.")
+                return None
+            return cls(signature, TableSummary.from_dict(payload["summary"]), payload["rules"])
+        except (OSError, ValueError, KeyError, TypeError):
+            return None
+
+    def save(self, path: str) -> None:
+        """Persiste el estado (archivo temporal + `os.replace`). Un fallo aquí solo fuerza una auditoría completa."""
+        payload = {
+            "version": self.VERSION,
+            "signature": self.signature,
+            "summary": self.summary.to_dict(),
+            "rules": self.rules,
+            "updated_at": datetime.datetime.now().isoformat()
+        }
+        tmp_path = f"{path}.tmp"
+        try:
+            # json.dumps usa el codificador en C (json.dump itera en Python: ~10x más lento en estados grandes)
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                f.write(json.dumps(payload, ensure_ascii=False))
+            os.replace(tmp_path, path)
+        except OSError as e:
+            logger.warning(f"No se pudo persistir el estado de auditoría en {path}: {str(e)}")
+
+    @staticmethod
+    def discard(path: str) -> None:
+        """Elimina un estado que ya no representa la tabla (la próxima auditoría será completa)."""
+        try:
+            os.remove(path)
+        except OSError:
+            pass
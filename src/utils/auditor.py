@@ -1,8 +1,13 @@
 import pandas as pd
 import numpy as np
 import logging
-from typing import Dict, Any, List
+from typing import Dict, Any, List, Optional
 from src.utils.config_loader import load_config
+from src.utils.projection import ProjectionPlanner
+from src.utils.profiler import ColumnarProfiler
+from src.utils.audit_state import AuditState
+from src.utils.drift import DriftMonitor
+from src.utils.rules import compile_business_rules, SAMPLE_SIZE
 
 logger = logging.getLogger(__name__)
 
@@ -12,25 +17,173 @@ class DataAuditor:
     Implementa las reglas de 'Abogado del Diablo' para detectar anomalías antes de la fase de preprocesamiento.
     """
 
-    def __init__(self):
-        self.config = load_config()
+    ENGINES = ("legacy", "columnar")
+    SKETCH_DEFAULTS = {"quantile_k": 200, "hll_precision": 12, "heavy_hitters": 64}
+
+    def __init__(self, config_path: str = "config.yaml"):
+        self.config = load_config(config_path)
         self.extraction_config = self.config.get("extractions", {})
         self.schemas = self.extraction_config.get("schemas", {})
         self.sentinels = self.extraction_config.get("sentinel_values", {})
+        self.projection = ProjectionPlanner(self.config)
+
+        # Motor de perfilamiento: legacy (una pasada de pandas por métrica) o columnar (una sola pasada)
+        audit_config = self.extraction_config.get("audit", {})
+        self.engine = audit_config.get("engine", "legacy")
+        if self.engine not in self.ENGINES:
+            raise ValueError(f"Motor de auditoría no soportado: '{self.engine}'. Opciones: {self.ENGINES}")
+        self.max_distinct = audit_config.get("max_distinct", 4096)
+        self.profiler = ColumnarProfiler(self.sentinels)
+        # Perfilamiento aproximado (sketches de memoria acotada) para las tablas listadas
+        sketch_config = dict(audit_config.get("sketches", {}))
+        self.sketch_tables = set(sketch_config.pop("tables", []))
+        self.sketch_options = {**self.SKETCH_DEFAULTS, **sketch_config}
+        self.sketch_profiler = ColumnarProfiler(self.sentinels, sketches=self.sketch_options)
+        # Drift de cada delta frente al perfil histórico persistido (desactivado si no se configura)
+        drift_config = dict(audit_config.get("drift", {}))
+        self.drift = DriftMonitor(self.sentinels, **drift_config) if drift_config.pop("enabled", False) else None
+        # Reglas de negocio declarativas (`extractions.business_rules`), compiladas una sola vez
+        self.business_rules = compile_business_rules(self.config)
 
-    def audit_dataframe(self, df: pd.DataFrame, table_name: str) -> Dict[str, Any]:
+    def audit_dataframe(self, df: pd.DataFrame, table_name: str, state_path: Optional[str] = None,
+                        merge_stats: Optional[Dict[str, int]] = None, drift_path: Optional[str] = None) -> Dict[str, Any]:
         """
         Realiza una auditoría completa de un DataFrame basado en su nombre de tabla y esquema configurado.
+        Con `state_path` (motor columnar) la auditoría es incremental: ver `_audit_with_state`. Las tablas
+        de `audit.sketches.tables` usan siempre el perfilador columnar con sketches aproximados.
+        Con `drift_path` (y `audit.drift.enabled`) el reporte agrega la sección `drift` (ver DriftMonitor).
         """
+        columnar = self.engine == "columnar" or table_name in self.sketch_tables
+        if state_path is not None and columnar:
+            report = self._audit_with_state(df, table_name, state_path, merge_stats or {})
+        else:
+            report = self._audit_full(df, table_name, columnar)
+
+        if drift_path is not None and self.drift is not None:
+            report["drift"] = self.drift.check(df, table_name, self.schemas.get(table_name, {}), drift_path)
+        return report
+
+    def _audit_full(self, df: pd.DataFrame, table_name: str, columnar: bool) -> Dict[str, Any]:
+        if columnar:
+            sections = self._profiler_for(table_name).profile(df, self.schemas.get(table_name, {}))
+        else:
+            sections = {
+                "integrity_checks": self._check_integrity(df),
+                "quality_metrics": self._analyze_quality(df),
+                "statistical_profile": self._generate_profile(df, table_name)
+            }
+        return self._build_report(df, table_name, sections, self._business_rule_counts(df, table_name))
+
+    def _build_report(self, df: pd.DataFrame, table_name: str, sections: Dict[str, Any],
+                      rule_counts: Dict[str, Dict[str, Any]]) -> Dict[str, Any]:
         report = {
             "table_name": table_name,
             "shape": {"rows": df.shape[0], "columns": df.shape[1]},
             "contract_validation": self._validate_contract(df, table_name),
-            "integrity_checks": self._check_integrity(df),
-            "quality_metrics": self._analyze_quality(df),
-            "statistical_profile": self._generate_profile(df, table_name),
-            "business_rules_validation": self._validate_business_rules(df, table_name)
+            "integrity_checks": sections["integrity_checks"],
+            "quality_metrics": sections["quality_metrics"],
+            "statistical_profile": sections["statistical_profile"],
+            "business_rules_validation": self._render_business_rules(table_name, rule_counts)
+        }
+        return report
+
+    def _audit_with_state(self, df: pd.DataFrame, table_name: str, state_path: str,
+                          merge_stats: Dict[str, int]) -> Dict[str, Any]:
+        """
+        Auditoría incremental sobre el estado fusionable persistido junto al raw (AuditState).
+
+        Si el merge solo agregó días posteriores al estado (`updated == 0` y todas las inserciones al
+        final), se resume únicamente ese delta y se fusiona con el estado: el costo depende del delta y no
+        del histórico. Ante correcciones, inserciones intermedias, firma distinta o estado ausente se
+        audita la tabla completa y el estado se reconstruye. El reporte tiene la misma estructura en
+        ambos casos.
+        """
+        schema = self.schemas.get(table_name, {})
+        profiler = self._profiler_for(table_name)
+        signature = self._state_signature(df, table_name)
+        state = AuditState.load(state_path, signature)
+        delta = self._state_delta(state, df, merge_stats) if state is not None else None
+
+        if delta is None:
+            summary = profiler.summarize(df, schema)
+            rule_counts = self._business_rule_counts(df, table_name)
+            logger.info(f"Auditoría completa de '{table_name}' ({len(df)} filas); estado reconstruido.")
+        else:
+            summary = state.summary.merge(profiler.summarize(delta, schema))
+            rule_counts = {
+                rule: {
+                    "count": state.rules[rule]["count"] + result["count"],
+                    # El delta empieza después del histórico: las primeras fechas del estado van primero
+                    "sample_dates": (state.rules[rule]["sample_dates"] + result["sample_dates"])[:SAMPLE_SIZE]
+                }
+                for rule, result in self._business_rule_counts(delta, table_name).items()
+            }
+            logger.info(f"Auditoría incremental de '{table_name}': {len(delta)} filas nuevas sobre el estado.")
+
+        report = self._build_report(df, table_name, profiler.render(summary, schema), rule_counts)
+        compact = summary.compress(self.max_distinct)
+        if compact is None:
+            AuditState.discard(state_path)
+        else:
+            AuditState(signature, compact, rule_counts).save(state_path)
+        return report
+
+    def _state_signature(self, df: pd.DataFrame, table_name: str) -> Dict[str, Any]:
+        """Todo lo que, si cambia, invalida el estado de auditoría persistido."""
+        rule_set = self.business_rules.get(table_name)
+        return {
+            "table": table_name,
+            "columns": [[str(col), str(dtype)] for col, dtype in df.dtypes.items()],
+            "schema": self.schemas.get(table_name, {}),
+            "contract_columns": self.projection.contract_columns(table_name),
+            "sentinels": self.sentinels,
+            "business_rules": [[rule.id, rule.check] for rule in rule_set.rules] if rule_set is not None else [],
+            "max_distinct": self.max_distinct,
+            "sketches": self.sketch_options if table_name in self.sketch_tables else None
         }
+
+    def _profiler_for(self, table_name: str) -> ColumnarProfiler:
+        return self.sketch_profiler if table_name in self.sketch_tables else self.profiler
+
+    def _state_delta(self, state: AuditState, df: pd.DataFrame,
+                     merge_stats: Dict[str, int]) -> Optional[pd.DataFrame]:
+        """Filas agregadas después del estado, o None si el merge no fue un append puro."""
+        integrity = state.summary.integrity
+        if not integrity.appendable or self.profiler.date_column not in df.columns:
+            return None
+        max_date = integrity.max_date
+        dates = df[self.profiler.date_column]
+        if not pd.api.types.is_datetime64_any_dtype(dates):
+            dates = pd.to_datetime(dates, errors="coerce")
+        is_new = (dates > max_date).to_numpy() if max_date is not None else np.ones(len(df), dtype=bool)
+        new_rows = int(is_new.sum())
+        if (merge_stats.get("updated", 0) > 0 or merge_stats.get("inserted", 0) != new_rows
+                or state.summary.rows + new_rows != len(df)):
+            return None
+        return df[is_new]
+
+    def _business_rule_counts(self, df: pd.DataFrame, table_name: str) -> Dict[str, Dict[str, Any]]:
+        """
+        Filas que violan cada regla de negocio de la tabla (`count`) y sus primeras fechas (`sample_dates`),
+        en el orden configurado. Solo aparecen las reglas evaluables (columnas presentes). Los conteos son
+        aditivos por filas, por lo que el estado incremental los acumula delta a delta.
+        """
+        rule_set = self.business_rules.get(table_name)
+        return rule_set.evaluate(df) if rule_set is not None else {}
+
+    def _render_business_rules(self, table_name: str, results: Dict[str, Dict[str, Any]]) -> Dict[str, Any]:
+        """
+        Sección `business_rules_validation`: una violación por regla con al menos una fila afectada,
+        con su mensaje en `details` y el conteo y muestra de fechas en `rules`.
+        """
+        report = {"violations_count": 0, "details": [], "rules": {}}
+        rules = {rule.id: rule for rule in self.business_rules[table_name].rules} if results else {}
+        for rule_id, result in results.items():
+            if result["count"] <= 0:
+                continue
+            report["violations_count"] += 1
+            report["details"].append(rules[rule_id].render(result["count"]))
+            report["rules"][rule_id] = {"violations": result["count"], "sample_dates": result["sample_dates"]}
         return report
 
     def _validate_business_rules(self, df: pd.DataFrame, table_name: str) -> Dict[str, Any]:
@@ -38,81 +191,13 @@ class DataAuditor:
         Valida reglas lógicas y matemáticas específicas del negocio (Tu Buñuelito).
         Detecta inconsistencias en balances de ventas e inventario.
         """
-        results = {"violations_count": 0, "details": []}
-
-        # 1. Regla de No Negatividad (Puntos 19 y 20)
-        if table_name in ["ventas", "inventario"]:
-            schema = self.schemas.get(table_name, {})
-            numeric_cols = [col for col, t in schema.items() if t in ["int", "float"]]
-            for col in numeric_cols:
-                if col in df.columns:
-                    neg_count = int((df[col] < 0).sum())
-                    if neg_count > 0:
-                        results["violations_count"] += 1
-                        results["details"].append(f"Columna '{col}': {neg_count} valores negativos detectados.")
-
-        # 2. Reglas específicas de VENTAS
-        if table_name == "ventas":
-            cols = ["unidades_totales", "unidades_pagas", "unidades_bonificadas", "es_promocion"]
-            if all(c in df.columns for c in cols):
-                # Punto 15: unidades_pagas == unidades_bonificadas (Solo si es promoción)
-                # Punto 17: Relación es_promocion y unidades_bonificadas
-                mask_promo = df["es_promocion"] == 1
-                mask_no_promo = df["es_promocion"] == 0
-                
-                # Inconsistencia Punto 15 (asumiendo que aplica en promo 2x1)
-                v15 = int((mask_promo & (df["unidades_pagas"] != df["unidades_bonificadas"])).sum())
-                if v15 > 0:
-                    results["violations_count"] += 1
-                    results["details"].append(f"Punto 15: {v15} filas donde pagas != bonificadas en promoción.")
-
-                # Inconsistencia Punto 17 (Bonificadas > 0 iff Promo == 1)
-                v17a = int((mask_promo & (df["unidades_bonificadas"] <= 0)).sum())
-                v17b = int((mask_no_promo & (df["unidades_bonificadas"] > 0)).sum())
-                if v17a + v17b > 0:
-                    results["violations_count"] += 1
-                    results["details"].append(f"Punto 17: {v17a+v17b} inconsistencias entre 'es_promocion' y 'unidades_bonificadas'.")
-
-                # Punto 16: Totales = Pagas + Bonificadas
-                v16 = int((df["unidades_totales"] != (df["unidades_pagas"] + df["unidades_bonificadas"])).sum())
-                if v16 > 0:
-                    results["violations_count"] += 1
-                    results["details"].append(f"Punto 16: {v16} filas donde la suma de unidades no coincide con el total.")
-
-        # 3. Reglas específicas de INVENTARIO
-        if table_name == "inventario":
-            # Usamos nombres con ñ tal cual están en el contrato
-            cols_inv = [
-                "ventas_reales_totales", "ventas_reales_pagas", "ventas_reales_bonificadas",
-                "buñuelos_preparados", "buñuelos_desperdiciados", "unidades_agotadas", 
-                "demanda_teorica_total"
-            ]
-            if all(c in df.columns for c in cols_inv):
-                # Punto 21: ventas_reales_totales = pagas + bonificadas
-                v21 = int((df["ventas_reales_totales"] != (df["ventas_reales_pagas"] + df["ventas_reales_bonificadas"])).sum())
-                if v21 > 0:
-                    results["violations_count"] += 1
-                    results["details"].append(f"Punto 21: {v21} inconsistencias en suma de ventas reales.")
-
-                # Punto 22: buñuelos_desperdiciados = preparados - ventas_totales
-                v22 = int((df["buñuelos_desperdiciados"] != (df["buñuelos_preparados"] - df["ventas_reales_totales"])).sum())
-                if v22 > 0:
-                    results["violations_count"] += 1
-                    results["details"].append(f"Punto 22: {v22} inconsistencias en cálculo de desperdicio.")
-
-                # Punto 23: unidades_agotadas = demanda_total - preparados
-                # Nota: Validamos solo si hay demanda insatisfecha (si preparados < demanda)
-                v23 = int((df["unidades_agotadas"] != (df["demanda_teorica_total"] - df["buñuelos_preparados"])).sum())
-                if v23 > 0:
-                    results["violations_count"] += 1
-                    results["details"].append(f"Punto 23: {v23} inconsistencias en cálculo de unidades agotadas.")
-
-        return results
+        return self._render_business_rules(table_name, self._business_rule_counts(df, table_name))
 
     def _validate_contract(self, df: pd.DataFrame, table_name: str) -> Dict[str, Any]:
         """Validación de columnas esperadas, tipos y presencia de columnas extra."""
         schema = self.schemas.get(table_name, {})
-        expected_cols = set(schema.keys())
+        # Las columnas podadas por la proyección no viajan desde la fuente: no cuentan como faltantes
+        expected_cols = set(self.projection.contract_columns(table_name))
         actual_cols = set(df.columns)
 
         missing_cols = list(expected_cols - actual_cols)
@@ -0,0 +1,368 @@
+import time
+import logging
+import numpy as np
+import pandas as pd
+from typing import Any, Dict, List, Optional, Tuple
+from src.utils.rules import parse_expression, parse_value, referenced_columns, evaluate, materialize
+from src.utils.explain import ExplainTrace
+
+logger = logging.getLogger(__name__)
+
+# Ajustes e imputaciones históricas de `_clean_table` (Puntos 7 al 12 y 1 al 4 por tabla). Se usan cuando
+# config.yaml no declara `preprocessing.cleaning_plan`; config.yaml las replica de forma explícita.
+DEFAULT_CLEANING_PLAN = {
+    "ventas": {
+        "required": ["es_promocion", "unidades_pagas", "unidades_bonificadas"],
+        "before_reindex": [
+            {"op": "fix_where", "when": "es_promocion == 1 and unidades_pagas != unidades_bonificadas",
+             "set": {"unidades_bonificadas": "unidades_pagas"}, "count": "ajustes_bonificadas_promocion"},
+            {"op": "derive", "column": "unidades_totales", "expr": "unidades_pagas + unidades_bonificadas"}
+        ]
+    },
+    "inventario": {
+        "required": ["ventas_reales_pagas", "ventas_reales_bonificadas", "buñuelos_preparados", "unidades_agotadas"],
+        "before_reindex": [
+            {"op": "fix_where",
+             "when": "year(fecha) >= 2022 and isin(month(fecha), [4, 5, 9, 10]) and ventas_reales_pagas != ventas_reales_bonificadas",
+             "set": {"ventas_reales_bonificadas": "ventas_reales_pagas"}, "count": "ajustes_ventas_bonificadas_promocion"},
+            {"op": "derive", "column": "ventas_reales_totales", "expr": "ventas_reales_pagas + ventas_reales_bonificadas"},
+            {"op": "derive", "column": "buñuelos_desperdiciados", "expr": "buñuelos_preparados - ventas_reales_totales"},
+            {"op": "recompute", "column": "demanda_teorica_total", "expr": "ventas_reales_totales + unidades_agotadas",
+             "count": "correccion_demanda_inconsistente"}
+        ]
+    },
+    "clima": {
+        "after_reindex": [
+            {"op": "impute", "columns": ["temperatura_media", "probabilidad_lluvia", "precipitacion_mm"], "method": "ffill_bfill"},
+            {"op": "impute", "columns": ["tipo_lluvia"], "method": "mode", "default": "Ninguna"},
+            {"op": "derive", "column": "es_dia_lluvioso", "expr": "where(tipo_lluvia == 'Ninguna', 0, 1)",
+             "only_if": ["es_dia_lluvioso"]},
+            {"op": "impute", "columns": ["evento_macro"], "method": "ffill_bfill"}
+        ]
+    },
+    "finanzas": {
+        "after_reindex": [
+            {"op": "impute", "columns": ["precio_unitario", "costo_unitario"], "method": "ffill_bfill",
+             "only_if": ["precio_unitario", "costo_unitario"]},
+            {"op": "derive", "column": "margen_bruto", "expr": "precio_unitario - costo_unitario"},
+            {"op": "derive", "column": "porcentaje_margen",
+             "expr": "where(precio_unitario != 0, margen_bruto / precio_unitario, 0)"}
+        ]
+    },
+    "macroeconomia": {
+        "after_reindex": [
+            {"op": "impute", "columns": "all", "method": "ffill_bfill"}
+        ]
+    },
+    "marketing": {
+        "after_reindex": [
+            {"op": "impute", "columns": ["ig_cost", "fb_cost"], "method": "ffill_bfill", "only_if": ["ig_cost", "fb_cost"]},
+            {"op": "derive", "column": "campaña_activa", "expr": "where(ig_cost > 0 or fb_cost > 0, 1, 0)",
+             "only_if": ["campaña_activa"]},
+            {"op": "derive", "column": "inversion_total", "expr": "ig_cost + fb_cost"},
+            {"op": "derive", "column": "ig_pct", "expr": "where(inversion_total != 0, ig_cost / inversion_total, 0)"},
+            {"op": "derive", "column": "fb_pct", "expr": "where(inversion_total != 0, fb_cost / inversion_total, 0)"}
+        ]
+    }
+}
+
+STAGES = ("before_reindex", "after_reindex")
+EXPRESSION_OPS = ("fix_where", "derive", "recompute")
+IMPUTE_METHODS = ("ffill_bfill", "ffill", "bfill", "mode", "value")
+
+
+class CleaningStep:
+    """
+    Paso compilado del plan de limpieza. Operaciones:
+
+    - `fix_where`: donde `when` se cumple, cada columna de `set` toma el valor de su expresión;
+    - `derive`: `column` = `expr` (crea o reemplaza la columna);
+    - `recompute`: como `derive`, contando en `count` las filas cuyo valor previo difería;
+    - `impute`: llena nulos de `columns` (lista o "all") con `method` (ffill_bfill, ffill, bfill, mode
+      con `default` si no hay moda, o value con `value`).
+
+    `only_if` omite el paso si falta alguna de esas columnas; los pasos de expresión también se omiten si
+    falta una columna que leen (como las ramas originales de `_clean_table`).
+    """
+
+    def __init__(self, spec: Dict[str, Any]):
+        self.op = spec.get("op")
+        self.only_if = list(spec.get("only_if", []))
+        self.count = spec.get("count")
+        self.assignments: List[Tuple[str, Tuple]] = []
+        self.when = None
+        if self.op == "fix_where":
+            self.when = parse_expression(spec["when"])
+            self.assignments = [(col, parse_value(expr)) for col, expr in spec["set"].items()]
+        elif self.op in ("derive", "recompute"):
+            self.assignments = [(spec["column"], parse_value(spec["expr"]))]
+        elif self.op == "impute":
+            self.columns = spec.get("columns", [])
+            self.method = spec.get("method", "ffill_bfill")
+            self.fill = spec.get("value", spec.get("default"))
+            if self.method not in IMPUTE_METHODS:
+                raise ValueError(f"Método de imputación no soportado: '{self.method}'. Opciones: {IMPUTE_METHODS}")
+        else:
+            raise ValueError(f"Operación de limpieza no soportada: '{self.op}'")
+
+        self.reads: List[str] = []
+        for ir in ([self.when] if self.when is not None else []) + [ir for _, ir in self.assignments]:
+            self.reads += [col for col in referenced_columns(ir) if col not in self.reads]
+
+    @property
+    def target(self) -> str:
+        if self.op == "impute":
+            return "*" if self.columns == "all" else ",".join(self.columns)
+        return ",".join(col for col, _ in self.assignments)
+
+    def fuses_with(self, other: "CleaningStep") -> bool:
+        """Pasos adyacentes que se ejecutan como un solo grupo: expresiones entre sí, imputaciones del mismo método."""
+        if self.op in EXPRESSION_OPS:
+            return other.op in EXPRESSION_OPS
+        return other.op == "impute" and other.method == self.method and self.method not in ("mode", "value") \
+            and self.columns != "all" and other.columns != "all"
+
+
+class CleaningPlan:
+    """
+    Plan de limpieza de una tabla compilado desde `preprocessing.cleaning_plan` (etapas `before_reindex`,
+    sobre las filas reales, y `after_reindex`, sobre el calendario diario completo).
+
+    Los pasos adyacentes compatibles se fusionan: las expresiones de un grupo se evalúan en una pasada
+    NumPy sobre columnas materializadas una sola vez (con subexpresiones compartidas en caché, ej. la
+    condición de promoción) y las columnas resultantes se escriben al DataFrame una sola vez al final del
+    grupo; las imputaciones con el mismo método se aplican sobre el bloque de columnas en una llamada.
+    Cada paso registra su tiempo y las filas afectadas.
+    """
+
+    def __init__(self, table: str, required: List[str], stages: Dict[str, List[CleaningStep]]):
+        self.table = table
+        self.required = required
+        self.stages = stages
+
+    @classmethod
+    def from_config(cls, table: str, spec: Dict[str, Any]) -> "CleaningPlan":
+        unknown = set(spec) - set(STAGES) - {"required"}
+        if unknown:
+            raise ValueError(f"Claves desconocidas en el plan de limpieza de '{table}': {sorted(unknown)}")
+        stages = {stage: [CleaningStep(step) for step in spec.get(stage, []) or []] for stage in STAGES}
+        return cls(table, list(spec.get("required", [])), stages)
+
+    @property
+    def input_columns(self) -> List[str]:
+        """
+        Columnas de la fuente que el plan necesita: las requeridas, las de `only_if` y las que un paso de
+        expresión lee (o reemplaza con conteo) antes de que otro paso las escriba. Las imputaciones no cuentan:
+        solo actúan sobre las columnas presentes, así que no obligan a extraer una columna que nada más usa.
+        """
+        inputs = list(self.required)
+        written = set()
+        for stage in STAGES:
+            for step in self.stages[stage]:
+                if step.op == "impute":
+                    continue
+                reads = step.only_if + step.reads
+                if step.op in ("fix_where", "recompute"):
+                    reads = reads + [col for col, _ in step.assignments]
+                inputs += [col for col in reads if col not in written and col not in inputs]
+                written.update(col for col, _ in step.assignments)
+        return inputs
+
+    @property
+    def mode_columns(self) -> Dict[str, Any]:
+        """Columnas imputadas con la moda (valor global del histórico) y su valor por defecto."""
+        return {col: step.fill for steps in self.stages.values() for step in steps
+                if step.op == "impute" and step.method == "mode" for col in step.columns}
+
+    def run(self, df: pd.DataFrame, stage: str, audit_log: Dict[str, Any],
+            modes: Optional[Dict[str, Any]] = None,
+            edges: Optional[Dict[str, pd.DataFrame]] = None,
+            trace: Optional[ExplainTrace] = None) -> Tuple[pd.DataFrame, List[Dict[str, Any]]]:
+        """
+        Ejecuta una etapa del plan. Los conteos declarados en `count` se escriben en `audit_log`; `modes`
+        fija el valor de las imputaciones por moda (modos incremental y por lotes). `edges` (modo por lotes)
+        da el contexto de los ffill/bfill fuera del lote: `before`, la última fila ya limpia del lote anterior,
+        y `after`, una fila con el siguiente valor no nulo de cada columna en los lotes posteriores. Con
+        `trace` (modo explain) cada grupo fusionado es un nodo del plan con sus filas afectadas.
+        Retorna el DataFrame y, por paso, su operación, columnas, filas afectadas y tiempo.
+        """
+        stats = []
+        if stage == "before_reindex" and self.required:
+            missing = [c for c in self.required if c not in df.columns]
+            if missing:
+                raise KeyError(f"Missing required columns for '{self.table}' logic: {missing}")
+
+        trace = trace or ExplainTrace(enabled=False)
+        for group in self._groups(self.stages.get(stage, [])):
+            name = " + ".join(f"{step.op}({step.target})" for step in group)
+            op = "expressions" if group[0].op in EXPRESSION_OPS else f"impute:{group[0].method}"
+            with trace.step(name, op=op) as node:
+                done = len(stats)
+                if group[0].op in EXPRESSION_OPS:
+                    df = self._run_expressions(df, group, audit_log, stats)
+                else:
+                    df = self._run_imputations(df, group, modes or {}, stats, edges)
+                trace.describe(node, df, rows=sum(entry["rows"] for entry in stats[done:]))
+        for entry in stats:
+            logger.info(f"[{self.table}] {stage} {entry['op']}({entry['target']}): "
+                        f"{entry['rows']} filas, {entry['ms']:.2f} ms")
+        return df, stats
+
+    @staticmethod
+    def _groups(steps: List[CleaningStep]) -> List[List[CleaningStep]]:
+        groups = []
+        for step in steps:
+            if groups and groups[-1][-1].fuses_with(step):
+                groups[-1].append(step)
+            else:
+                groups.append([step])
+        return groups
+
+    def _run_expressions(self, df: pd.DataFrame, group: List[CleaningStep],
+                         audit_log: Dict[str, Any], stats: List[Dict[str, Any]]) -> pd.DataFrame:
+        """Grupo de expresiones: columnas leídas una vez, resultados escritos una vez al final."""
+        columns: Dict[str, np.ndarray] = {}
+        written: Dict[str, np.ndarray] = {}
+        cache: Dict[Tuple, Any] = {}
+        size = len(df)
+        for step in group:
+            start = time.perf_counter()
+            available = set(df.columns) | set(written)
+            if any(c not in available for c in step.only_if + step.reads):
+                continue
+            for col in step.reads + [col for col, _ in step.assignments]:
+                if col not in columns and col in df.columns:
+                    columns[col] = materialize(df[col])
+
+            with np.errstate(invalid="ignore", divide="ignore"):
+                if step.op == "fix_where":
+                    mask = np.broadcast_to(evaluate(step.when, columns, cache), (size,))
+                    rows = int(np.count_nonzero(mask))
+                    if rows:
+                        for col, ir in step.assignments:
+                            values = np.broadcast_to(evaluate(ir, columns, cache), (size,))
+                            self._store(columns, written, cache, col, self._assign_masked(columns[col], values, mask))
+                else:
+                    col, ir = step.assignments[0]
+                    values = self._owned(evaluate(ir, columns, cache), columns, size)
+                    previous = columns.get(col)
+                    rows = size if previous is None else int(np.count_nonzero(np.not_equal(previous, values)))
+                    self._store(columns, written, cache, col, values)
+            if step.count:
+                audit_log[step.count] = rows
+            stats.append(self._stat(step, rows, start))
+
+        for col, values in written.items():
+            df[col] = values
+        return df
+
+    @staticmethod
+    def _store(columns: Dict[str, np.ndarray], written: Dict[str, np.ndarray], cache: Dict[Tuple, Any],
+               col: str, values: np.ndarray) -> None:
+        """Nuevo valor de una columna dentro del grupo; invalida las subexpresiones que la leían."""
+        columns[col] = values
+        written[col] = values
+        for key in [key for key in cache if col in referenced_columns(key)]:
+            del cache[key]
+
+    @staticmethod
+    def _owned(value: Any, columns: Dict[str, np.ndarray], size: int) -> np.ndarray:
+        """
+        Arreglo propio para una columna nueva: el resultado de una operación se usa tal cual; una constante
+        o una columna existente (ej. `derive: a = b`) se copia para que dos columnas no compartan memoria.
+        """
+        if isinstance(value, np.ndarray) and value.shape == (size,) and value.flags.writeable \
+                and not any(value is existing for existing in columns.values()):
+            return value
+        return np.array(np.broadcast_to(value, (size,)))
+
+    @staticmethod
+    def _assign_masked(original: np.ndarray, values: np.ndarray, mask: np.ndarray) -> np.ndarray:
+        """
+        Equivale a `df.loc[mask, col] = valores`: si la columna es entera y los valores asignados son enteros
+        exactos (aunque vengan de una columna float), la columna conserva su dtype, como en pandas.
+        """
+        result = np.where(mask, values, original)
+        if original.dtype.kind in "iu" and result.dtype.kind == "f":
+            assigned = result[mask]
+            if np.isfinite(assigned).all() and (assigned == np.round(assigned)).all():
+                result = result.astype(original.dtype)
+        return result
+
+    def _run_imputations(self, df: pd.DataFrame, group: List[CleaningStep], modes: Dict[str, Any],
+                         stats: List[Dict[str, Any]],
+                         edges: Optional[Dict[str, pd.DataFrame]] = None) -> pd.DataFrame:
+        """Grupo de imputaciones del mismo método sobre el bloque de columnas presentes."""
+        start = time.perf_counter()
+        method = group[0].method
+        if group[0].columns == "all":
+            nulls = int(df.isna().sum().sum())
+            df = self._fill(df, method, edges)
+            stats.append(self._stat(group[0], nulls - int(df.isna().sum().sum()), start))
+            return df
+
+        cols = []
+        for step in group:
+            if all(c in df.columns for c in step.only_if):
+                cols += [c for c in step.columns if c in df.columns and c not in cols]
+        if not cols:
+            return df
+
+        if method in ("mode", "value"):
+            step = group[0]
+            rows = 0
+            for col in cols:
+                if method == "mode" and col in modes:
+                    fill = modes[col]
+                elif method == "mode":
+                    mode_series = df[col].mode()
+                    fill = mode_series[0] if not mode_series.empty else step.fill
+                else:
+                    fill = step.fill
+                rows += int(df[col].isna().sum())
+                df[col] = df[col].fillna(fill)
+            stats.append(self._stat(step, rows, start))
+            return df
+
+        block = df[cols]
+        nulls = int(block.isna().sum().sum())
+        block = self._fill(block, method, edges)
+        if len(cols) == 1:
+            df[cols[0]] = block[cols[0]]
+        else:
+            df[cols] = block
+        stats.append(self._stat(group[0] if len(group) == 1 else group, nulls - int(block.isna().sum().sum()), start))
+        return df
+
+    @staticmethod
+    def _fill(frame: pd.DataFrame, method: str, edges: Optional[Dict[str, pd.DataFrame]] = None) -> pd.DataFrame:
+        if edges:
+            # Las filas de borde se anteponen/anexan solo para el llenado y se descartan después
+            before, after = edges.get("before"), edges.get("after")
+            parts = [edge.reindex(columns=frame.columns) for edge in (before,) if edge is not None] + [frame] + \
+                [edge.reindex(columns=frame.columns) for edge in (after,) if edge is not None]
+            offset = 0 if before is None else 1
+            filled = CleaningPlan._fill(pd.concat(parts, ignore_index=True), method).iloc[offset:offset + len(frame)]
+            filled.index = frame.index
+            return filled
+        if method == "ffill":
+            return frame.ffill()
+        if method == "bfill":
+            return frame.bfill()
+        return frame.ffill().bfill()
+
+    @staticmethod
+    def _stat(step, rows: int, start: float) -> Dict[str, Any]:
+        steps = step if isinstance(step, list) else [step]
+        return {
+            "op": steps[0].op if steps[0].op != "impute" else f"impute:{steps[0].method}",
+            "target": ",".join(s.target for s in steps),
+            "rows": rows,
+            "ms": (time.perf_counter() - start) * 1000
+        }
+
+
+def compile_cleaning_plans(config: Dict[str, Any]) -> Dict[str, CleaningPlan]:
+    """CleaningPlan por tabla desde `preprocessing.cleaning_plan` (o el plan histórico si no está declarado)."""
+    plans_config = config.get("preprocessing", {}).get("cleaning_plan", DEFAULT_CLEANING_PLAN)
+    return {table: CleaningPlan.from_config(table, spec or {}) for table, spec in plans_config.items()}
@@ -0,0 +1,253 @@
+import os
+import json
+import time
+import logging
+import datetime
+import numpy as np
+import pandas as pd
+from typing import Any, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class DriftProfile:
+    """
+    Perfil histórico de una tabla para detección de drift, persistido junto al raw
+    (`RawStore.drift_profile_path`).
+
+    Por columna guarda los bordes de bin fijados al crear el perfil (deciles del histórico en
+    numéricas, categorías más frecuentes en categóricas) y dos histogramas sobre esos bins: el del
+    histórico (`history`) y el de las filas nuevas aún no evaluadas (`pending`). El último bin de
+    cada histograma cuenta nulos y centinelas. `max_date` es el último día incorporado al perfil.
+    """
+
+    VERSION = 1
+
+    def __init__(self, signature: Dict[str, Any], max_date: Optional[str], columns: Dict[str, Dict[str, Any]],
+                 history_rows: int = 0, pending_rows: int = 0):
+        self.signature = signature
+        self.max_date = max_date
+        self.columns = columns
+        self.history_rows = history_rows
+        self.pending_rows = pending_rows
+
+    @classmethod
+    def load(cls, path: str, signature: Dict[str, Any]) -> Optional["DriftProfile"]:
+        """Perfil persistido si existe, es legible y su firma coincide; None en otro caso."""
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                payload = json.load(f)
+            if payload.get("version") != cls.VERSION or payload.get("signature") != signature:
+                logger.info(f"Perfil de drift en {path} con firma distinta. Se reconstruye.")
+                return None
+            return cls(signature, payload["max_date"], payload["columns"],
+                       payload["history_rows"], payload["pending_rows"])
+        except (OSError, ValueError, KeyError, TypeError):
+            return None
+
+    def save(self, path: str) -> None:
+        """Persiste el perfil (archivo temporal + `os.replace`). Un fallo aquí solo fuerza un nuevo baseline."""
+        payload = {
+            "version": self.VERSION,
+            "signature": self.signature,
+            "max_date": self.max_date,
+            "history_rows": int(self.history_rows),
+            "pending_rows": int(self.pending_rows),
+            "columns": self.columns,
+            "updated_at": datetime.datetime.now().isoformat()
+        }
+        tmp_path = f"{path}.tmp"
+        try:
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                f.write(json.dumps(payload, ensure_ascii=False))
+            os.replace(tmp_path, path)
+        except (OSError, TypeError, ValueError) as e:
+            # TypeError/ValueError: categorías no serializables (el perfil se recrea en la próxima corrida)
+            logger.warning(f"No se pudo persistir el perfil de drift en {path}: {str(e)}")
+
+
+class DriftMonitor:
+    """
+    Drift de cada delta frente al perfil histórico de la tabla (`extractions.audit.drift`).
+
+    Las filas posteriores a `max_date` del perfil se asignan a los bins precalculados
+    (`np.searchsorted` en numéricas, `Index.get_indexer` en categóricas) y se acumulan en `pending`.
+    Cuando hay al menos `min_rows` filas pendientes se comparan contra `history`:
+
+    - PSI (Population Stability Index) sobre todos los bins, nulos incluidos; se marca la columna
+      con PSI >= `psi_threshold` (0.25: cambio mayor según la convención habitual).
+    - KS sobre las CDF binned de los valores no nulos (solo numéricas); se marca si la distancia
+      supera el valor crítico de dos muestras para `ks_alpha`.
+
+    Tras evaluar, `pending` se incorpora al histórico. Solo se leen la fecha de la tabla y las filas
+    nuevas: el costo por corrida es de milisegundos. Las correcciones de días ya incorporados
+    (backfill) no modifican el perfil.
+    """
+
+    EPSILON = 1e-4
+
+    def __init__(self, sentinels: Dict[str, List[Any]], date_column: str = "fecha", bins: int = 10,
+                 max_categories: int = 20, min_rows: int = 30, psi_threshold: float = 0.25, ks_alpha: float = 0.05):
+        self.numeric_sentinels = np.asarray(sentinels.get("numeric", []), dtype="float64")
+        self.object_sentinels = list(sentinels.get("object", []))
+        self.date_column = date_column
+        self.bins = bins
+        self.max_categories = max_categories
+        self.min_rows = min_rows
+        self.psi_threshold = psi_threshold
+        self.ks_alpha = ks_alpha
+
+    def check(self, df: pd.DataFrame, table_name: str, schema: Dict[str, str], path: str) -> Dict[str, Any]:
+        """Sección `drift` del reporte de auditoría de la tabla; actualiza el perfil persistido en `path`."""
+        start = time.perf_counter()
+        if self.date_column not in df.columns:
+            return {"status": "no_date_column", "flagged_columns": []}
+
+        columns = self._monitored_columns(df, schema)
+        signature = {
+            "table": table_name,
+            "columns": columns,
+            "bins": self.bins,
+            "max_categories": self.max_categories,
+            "sentinels": [self.numeric_sentinels.tolist(), self.object_sentinels]
+        }
+        dates = df[self.date_column]
+        if not pd.api.types.is_datetime64_any_dtype(dates):
+            dates = pd.to_datetime(dates, errors="coerce")
+
+        profile = DriftProfile.load(path, signature)
+        if profile is None:
+            profile = self._baseline(df, columns, signature, dates)
+            section = {"status": "baseline", "new_rows": 0}
+        else:
+            section = self._accumulate(profile, df, dates)
+
+        section.update({
+            "history_rows": profile.history_rows,
+            "pending_rows": profile.pending_rows,
+            "elapsed_ms": round((time.perf_counter() - start) * 1000, 2)
+        })
+        section.setdefault("flagged_columns", [])
+        profile.save(path)
+        return section
+
+    def _monitored_columns(self, df: pd.DataFrame, schema: Dict[str, str]) -> Dict[str, str]:
+        """Columnas del contrato presentes en el delta: numéricas (int/float) y categóricas (object)."""
+        monitored = {}
+        for col, col_type in schema.items():
+            if col == self.date_column or col not in df.columns:
+                continue
+            if col_type in ["int", "float"] and pd.api.types.is_numeric_dtype(df[col]):
+                monitored[col] = "numeric"
+            elif col_type == "object":
+                monitored[col] = "categorical"
+        return monitored
+
+    def _baseline(self, df: pd.DataFrame, columns: Dict[str, str], signature: Dict[str, Any],
+                  dates: pd.Series) -> DriftProfile:
+        """Perfil nuevo con la tabla completa como histórico (bordes de bin fijados aquí)."""
+        profile_columns = {}
+        for col, kind in columns.items():
+            if kind == "numeric":
+                values = df[col].to_numpy(dtype="float64", na_value=np.nan)
+                valid = values[~self._numeric_missing(values)]
+                layout = {"kind": kind, "edges": self._numeric_edges(valid)}
+            else:
+                valid = df[col][~self._categorical_missing(df[col])]
+                layout = {"kind": kind, "categories": valid.value_counts().head(self.max_categories).index.tolist()}
+            counts = self._histogram(df[col], layout)
+            profile_columns[col] = {**layout, "history": counts.tolist(), "pending": np.zeros_like(counts).tolist()}
+
+        max_date = dates.max()
+        logger.info(f"Perfil de drift creado con {len(df)} filas históricas.")
+        return DriftProfile(signature, max_date.isoformat() if pd.notna(max_date) else None, profile_columns, len(df))
+
+    def _accumulate(self, profile: DriftProfile, df: pd.DataFrame, dates: pd.Series) -> Dict[str, Any]:
+        """Agrega las filas nuevas a `pending` y, si alcanzan `min_rows`, las evalúa y las pasa al histórico."""
+        is_new = (dates > pd.Timestamp(profile.max_date)).to_numpy() if profile.max_date else dates.notna().to_numpy()
+        delta = df[is_new]
+        if delta.empty:
+            return {"status": "no_new_rows", "new_rows": 0}
+
+        for col, column in profile.columns.items():
+            column["pending"] = (np.asarray(column["pending"]) + self._histogram(delta[col], column)).tolist()
+        profile.pending_rows += len(delta)
+        profile.max_date = dates[is_new].max().isoformat()
+        if profile.pending_rows < self.min_rows:
+            return {"status": "accumulating", "new_rows": len(delta), "min_rows": self.min_rows}
+
+        results = {col: self._compare(column) for col, column in profile.columns.items()}
+        for column in profile.columns.values():
+            column["history"] = (np.asarray(column["history"]) + np.asarray(column["pending"])).tolist()
+            column["pending"] = [0] * len(column["pending"])
+        evaluated_rows = profile.pending_rows
+        profile.history_rows += profile.pending_rows
+        profile.pending_rows = 0
+
+        flagged = [col for col, result in results.items() if result["flagged"]]
+        if flagged:
+            logger.warning(f"Drift detectado en {flagged} ({evaluated_rows} filas nuevas frente al histórico).")
+        return {
+            "status": "evaluated",
+            "new_rows": len(delta),
+            "evaluated_rows": evaluated_rows,
+            "flagged_columns": flagged,
+            "columns": results
+        }
+
+    def _compare(self, column: Dict[str, Any]) -> Dict[str, Any]:
+        expected = np.asarray(column["history"], dtype="float64")
+        actual = np.asarray(column["pending"], dtype="float64")
+        psi = _psi(expected, actual, self.EPSILON)
+        result = {"psi": round(psi, 4)}
+        flagged = psi >= self.psi_threshold
+
+        if column["kind"] == "numeric":
+            # KS sobre los bins de valores (sin el bin de nulos)
+            n, m = expected[:-1].sum(), actual[:-1].sum()
+            if n > 0 and m > 0:
+                distance = float(np.abs(np.cumsum(expected[:-1]) / n - np.cumsum(actual[:-1]) / m).max())
+                critical = float(np.sqrt(-np.log(self.ks_alpha / 2) / 2) * np.sqrt((n + m) / (n * m)))
+                result.update({"ks": round(distance, 4), "ks_critical": round(critical, 4)})
+                flagged = flagged or distance > critical
+
+        result["flagged"] = bool(flagged)
+        return result
+
+    def _histogram(self, series: pd.Series, layout: Dict[str, Any]) -> np.ndarray:
+        """Conteos por bin de la columna; el último bin son nulos y centinelas."""
+        if layout["kind"] == "numeric":
+            edges = np.asarray(layout["edges"], dtype="float64")
+            values = series.to_numpy(dtype="float64", na_value=np.nan)
+            codes = np.searchsorted(edges, values, side="right")
+            codes[self._numeric_missing(values)] = len(edges) + 1
+            return np.bincount(codes, minlength=len(edges) + 2)
+
+        categories = layout["categories"]
+        codes = pd.Index(categories).get_indexer(series)
+        # Categorías fuera del top del histórico: bin "otros"
+        codes[codes < 0] = len(categories)
+        codes[self._categorical_missing(series)] = len(categories) + 1
+        return np.bincount(codes, minlength=len(categories) + 2)
+
+    def _numeric_edges(self, values: np.ndarray) -> List[float]:
+        """Bordes interiores: deciles del histórico, o puntos medios si hay pocos valores distintos."""
+        uniques = np.unique(values)
+        if len(uniques) <= self.bins:
+            return ((uniques[1:] + uniques[:-1]) / 2).tolist()
+        return np.unique(np.quantile(values, np.linspace(0, 1, self.bins + 1)[1:-1])).tolist()
+
+    def _numeric_missing(self, values: np.ndarray) -> np.ndarray:
+        return np.isnan(values) | np.isin(values, self.numeric_sentinels)
+
+    def _categorical_missing(self, series: pd.Series) -> np.ndarray:
+        return (series.isna() | series.isin(self.object_sentinels)).to_numpy()
+
+
+def _psi(expected: np.ndarray, actual: np.ndarray, epsilon: float) -> float:
+    """Population Stability Index entre dos histogramas sobre los mismos bins (proporciones suavizadas)."""
+    if expected.sum() == 0 or actual.sum() == 0:
+        return 0.0
+    e = np.maximum(expected / expected.sum(), epsilon)
+    a = np.maximum(actual / actual.sum(), epsilon)
+    return float(np.sum((a - e) * np.log(a / e)))
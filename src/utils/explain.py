@@ -0,0 +1,156 @@
+import os
+import sys
+import time
+import logging
+import threading
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, List, Optional
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+logger = logging.getLogger(__name__)
+
+PAGE_SIZE = os.sysconf("SC_PAGE_SIZE") if hasattr(os, "sysconf") else 4096
+
+
+def current_rss() -> Optional[int]:
+    """
+    RSS actual del proceso en bytes (`/proc/self/statm`). Sin /proc se usa el pico histórico de
+    `getrusage` (el delta queda como cota inferior: solo crece si el paso supera el pico previo); None si
+    ninguna fuente está disponible.
+    """
+    try:
+        with open("/proc/self/statm", "r") as f:
+            return int(f.read().split()[1]) * PAGE_SIZE
+    except (OSError, ValueError, IndexError):
+        pass
+    if resource is not None:
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        # macOS reporta bytes; el resto, KB
+        return peak if sys.platform == "darwin" else peak * 1024
+    return None
+
+
+def rss_source() -> Optional[str]:
+    """Fuente de `current_rss` en esta plataforma (para interpretar los deltas del reporte)."""
+    if os.path.exists("/proc/self/statm"):
+        return "proc_statm"
+    return "getrusage_peak" if resource is not None else None
+
+
+class ExplainTrace:
+    """
+    Plan de ejecución instrumentado de la Fase 02 (`preprocessing.explain`).
+
+    Cada `step` abre un nodo del árbol y registra su tiempo de pared (`seconds`) y el delta de RSS pico
+    (`peak_rss_delta_bytes`: máximo RSS observado durante el paso menos el RSS al entrar). Mientras haya
+    un paso abierto, un hilo muestrea el RSS cada `sample_seconds`; como necesita el GIL, los picos dentro de
+    una operación larga en Python se observan con la granularidad del cambio de hilo (~5 ms). Quien abre el
+    paso completa las filas tocadas y la forma de salida con `describe`.
+
+    Deshabilitado, `step` no mide nada ni crea hilos: el costo es el de un context manager vacío.
+    """
+
+    def __init__(self, enabled: bool = True, sample_seconds: float = 0.001):
+        self.enabled = enabled
+        self.sample_seconds = sample_seconds
+        self.roots: List[Dict[str, Any]] = []
+        self._open: List[List[Any]] = []  # [nodo, rss al entrar, pico observado]
+        self._lock = threading.Lock()
+        self._stop: Optional[threading.Event] = None
+        self._sampler: Optional[threading.Thread] = None
+
+    @contextmanager
+    def step(self, name: str, **fields: Any) -> Iterator[Dict[str, Any]]:
+        """Nodo del paso `name` (hijo del paso abierto, si lo hay); `fields` se copian al nodo."""
+        if not self.enabled:
+            yield {}
+            return
+        node: Dict[str, Any] = {"step": name, **fields}
+        rss = current_rss()
+        with self._lock:
+            (self._open[-1][0].setdefault("children", []) if self._open else self.roots).append(node)
+            self._open.append([node, rss, rss])
+        if self._sampler is None:
+            self._start_sampler()
+        start = time.perf_counter()
+        try:
+            yield node
+        finally:
+            seconds = time.perf_counter() - start
+            rss = current_rss()
+            with self._lock:
+                _, start_rss, peak = self._open.pop()
+                last = not self._open
+            if rss is not None and peak is not None:
+                peak = max(peak, rss)
+            self._finish(node, seconds, None if start_rss is None else peak - start_rss)
+            if last:
+                self._stop_sampler()
+
+    @staticmethod
+    def describe(node: Dict[str, Any], df: Any = None, rows: Optional[int] = None) -> None:
+        """Completa un nodo con las filas tocadas por el paso y la forma del resultado (filas, columnas)."""
+        if rows is not None:
+            node["rows_touched"] = int(rows)
+        if df is not None and hasattr(df, "shape"):
+            node["output_shape"] = [int(n) for n in df.shape]
+
+    @staticmethod
+    def hotspots(roots: List[Dict[str, Any]], limit: int = 10) -> List[Dict[str, Any]]:
+        """
+        Tiempo por tipo de paso (`op`, o el nombre del paso) sumado sobre todas las hojas de los árboles `roots`
+        (ej. todos los `sentinels` de todas las tablas), ordenado de mayor a menor, con su fracción del tiempo
+        acumulado de las raíces.
+        """
+        totals: Dict[str, float] = {}
+
+        def visit(node: Dict[str, Any]) -> None:
+            if node.get("children"):
+                for child in node["children"]:
+                    visit(child)
+            elif "seconds" in node:
+                key = node.get("op", node["step"])
+                totals[key] = totals.get(key, 0.0) + node["seconds"]
+
+        for root in roots:
+            visit(root)
+        wall = sum(root.get("seconds", 0.0) for root in roots) or 1.0
+        ranked = sorted(totals.items(), key=lambda item: item[1], reverse=True)[:limit]
+        return [{"step": key, "seconds": round(seconds, 6), "share": round(seconds / wall, 4)}
+                for key, seconds in ranked]
+
+    @staticmethod
+    def _finish(node: Dict[str, Any], seconds: float, rss_delta: Optional[int]) -> None:
+        """Métricas al inicio del nodo (después de `step`), los hijos al final, para un reporte legible."""
+        extra = {key: node.pop(key) for key in list(node) if key != "step"}
+        children = extra.pop("children", None)
+        node["seconds"] = round(seconds, 6)
+        node["peak_rss_delta_bytes"] = rss_delta
+        node.update(extra)
+        if children:
+            node["children"] = children
+
+    def _start_sampler(self) -> None:
+        self._stop = threading.Event()
+        self._sampler = threading.Thread(target=self._sample, args=(self._stop,), daemon=True)
+        self._sampler.start()
+
+    def _stop_sampler(self) -> None:
+        if self._sampler is not None:
+            self._stop.set()
+            self._sampler.join()
+            self._sampler = None
+
+    def _sample(self, stop: threading.Event) -> None:
+        while not stop.wait(self.sample_seconds):
+            rss = current_rss()
+            if rss is None:
+                return
+            with self._lock:
+                for entry in self._open:
+                    if entry[2] is not None and rss > entry[2]:
+                        entry[2] = rss
@@ -0,0 +1,121 @@
+import logging
+import numpy as np
+import pyarrow as pa
+from typing import Any, Dict, List, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+class CalendarJoiner:
+    """
+    Unión de las tablas limpias de la Fase 02 sobre su calendario diario compartido (`fecha`).
+
+    Los `pd.merge(..., on='fecha', how='inner')` encadenados hashean la llave y copian el maestro
+    creciente en cada paso. Como todas las tablas salen reindexadas a un rango diario ordenado y sin
+    duplicados, la intersección de fechas es el rango común [max(inicios), min(fines)]: cada tabla se
+    recorta con dos `searchsorted` (slice de Arrow, sin copia) y las columnas se concatenan una sola vez.
+    Si alguna tabla tiene huecos dentro del rango común, las fechas compartidas se obtienen con
+    `np.intersect1d` sobre las llaves ordenadas y cada tabla se alinea con `take`.
+
+    Antes de unir se valida que ninguna columna (fuera de la llave) se repita entre tablas; el merge
+    original las renombraba en silencio con sufijos `_x`/`_y`.
+    """
+
+    def __init__(self, on: str = "fecha"):
+        self.on = on
+
+    def join(self, tables: Dict[str, pa.Table]) -> Tuple[pa.Table, Dict[str, Any]]:
+        """
+        Tabla Arrow con la llave y las columnas de cada tabla (en el orden de `tables`) sobre las fechas
+        comunes, y la cobertura por tabla (rango propio y filas que quedan fuera de la unión).
+        """
+        if not tables:
+            raise ValueError("No hay tablas para unir.")
+        self._check_collisions(tables)
+
+        keyed = {name: self._sorted_keys(name, table) for name, table in tables.items()}
+        if any(len(keys) == 0 for _, keys in keyed.values()):
+            raise ValueError("Hay tablas vacías: no comparten ningún rango de fechas.")
+        start = max(keys[0] for _, keys in keyed.values())
+        end = min(keys[-1] for _, keys in keyed.values())
+        if start > end:
+            raise ValueError("Las tablas no comparten ningún rango de fechas.")
+
+        bounds = {name: (int(np.searchsorted(keys, start, side="left")),
+                         int(np.searchsorted(keys, end, side="right")))
+                  for name, (_, keys) in keyed.items()}
+        reference = next(iter(keyed))
+        ref_lo, ref_hi = bounds[reference]
+        ref_keys = keyed[reference][1][ref_lo:ref_hi]
+        aligned = all(np.array_equal(keys[lo:hi], ref_keys)
+                      for (_, keys), (lo, hi) in zip(keyed.values(), bounds.values()))
+        if aligned:
+            common = ref_keys
+            parts = {name: table.slice(bounds[name][0], bounds[name][1] - bounds[name][0])
+                     for name, (table, _) in keyed.items()}
+        else:
+            # Huecos dentro del rango común: intersección de llaves ordenadas y únicas
+            common = ref_keys
+            for name, (_, keys) in keyed.items():
+                lo, hi = bounds[name]
+                common = np.intersect1d(common, keys[lo:hi], assume_unique=True)
+            if len(common) == 0:
+                raise ValueError("Las tablas no comparten ninguna fecha.")
+            parts = {name: table.take(pa.array(np.searchsorted(keys, common)))
+                     for name, (table, keys) in keyed.items()}
+            logger.warning(f"Tablas con huecos dentro del rango común: se unen {len(common)} fechas compartidas.")
+
+        names: List[str] = [self.on]
+        columns = [parts[reference].column(self.on)]
+        for part in parts.values():
+            for name in part.column_names:
+                if name != self.on:
+                    names.append(name)
+                    columns.append(part.column(name))
+        master = pa.Table.from_arrays(columns, names=names)
+
+        days = common.astype("datetime64[D]")
+        coverage = {
+            "start": str(common[0].astype("datetime64[D]")),
+            "end": str(common[-1].astype("datetime64[D]")),
+            "shared_dates": int(len(common)),
+            "calendar_gaps": int((days[-1] - days[0]).astype("int64") + 1 - len(common)),
+            "tables": {}
+        }
+        for name, (_, keys) in keyed.items():
+            lo, hi = bounds[name]
+            coverage["tables"][name] = {
+                "start": str(keys[0].astype("datetime64[D]")),
+                "end": str(keys[-1].astype("datetime64[D]")),
+                "rows": int(len(keys)),
+                "rows_outside_range": int(len(keys) - (hi - lo)),
+                "rows_not_shared": int((hi - lo) - len(common))
+            }
+        return master, coverage
+
+    def _check_collisions(self, tables: Dict[str, pa.Table]) -> None:
+        """Error si una columna distinta de la llave aparece en más de una tabla (o falta la llave)."""
+        owners: Dict[str, List[str]] = {}
+        for name, table in tables.items():
+            if self.on not in table.column_names:
+                raise KeyError(f"La tabla '{name}' no tiene la columna de unión '{self.on}'.")
+            for col in table.column_names:
+                if col != self.on:
+                    owners.setdefault(col, []).append(name)
+        collisions = {col: names for col, names in owners.items() if len(names) > 1}
+        if collisions:
+            raise ValueError(f"Columnas repetidas entre tablas: {collisions}")
+
+    def _sorted_keys(self, name: str, table: pa.Table) -> Tuple[pa.Table, np.ndarray]:
+        """Tabla ordenada por la llave y la llave como datetime64[ns]; error si hay nulos o fechas repetidas."""
+        column = table.column(self.on)
+        if column.null_count:
+            raise ValueError(f"La tabla '{name}' tiene {column.null_count} fechas nulas.")
+        keys = column.to_numpy().astype("datetime64[ns]")
+        if len(keys) > 1 and not np.all(keys[1:] > keys[:-1]):
+            order = np.argsort(keys, kind="stable")
+            keys = keys[order]
+            if np.any(keys[1:] == keys[:-1]):
+                raise ValueError(f"La tabla '{name}' tiene fechas repetidas; no está alineada al calendario diario.")
+            table = table.take(pa.array(order))
+        return table, keys
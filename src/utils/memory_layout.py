@@ -0,0 +1,87 @@
+import io
+import logging
+import numpy as np
+import pandas as pd
+from typing import Any, Dict, List, Tuple, Union
+
+logger = logging.getLogger(__name__)
+
+
+class CompactLayout:
+    """
+    Esquema compacto del master de la Fase 02 (`preprocessing.master_layout`).
+
+    El master guarda `tipo_lluvia`/`evento_macro` como strings de Python (object), todo entero como int64
+    y todo real como float64, y las Fases 03 y 04 lo cargan completo. Aquí:
+
+    - columnas de texto con pocos valores distintos (<= `category_max_ratio` de las filas) pasan a
+      `category`, que en Parquet se escribe como columna con diccionario y se relee como categórica;
+    - banderas (enteros con valores en {0, 1}) pasan a int8; el resto de enteros a la menor anchura entre
+      int32 e int64 que los contiene: se deja margen para las sumas y restas de las fases siguientes
+      (ej. ventas pagas + bonificadas), que en int8/int16 podrían desbordar en silencio;
+    - los reales listados en `float32` (o todos con "all") pasan a float32, pensado para las mediciones
+      (clima, costos) donde ~7 dígitos significativos sobran.
+
+    El reporte incluye la huella en memoria (`memory_usage(deep=True)`) y en disco (Parquet) antes y después.
+    """
+
+    def __init__(self, category_max_ratio: float = 0.5, float32: Union[str, List[str]] = None):
+        self.category_max_ratio = category_max_ratio
+        self.float32 = float32 or []
+
+    def compact(self, df: pd.DataFrame) -> Tuple[pd.DataFrame, Dict[str, Any]]:
+        """DataFrame con el esquema compacto y el reporte de cambios de dtype y huella antes/después."""
+        changes = {}
+        result = df.copy(deep=False)
+        for position, col in enumerate(df.columns):
+            series = df.iloc[:, position]
+            compacted = self._compact_series(series)
+            if compacted.dtype != series.dtype:
+                result.isetitem(position, compacted)
+                changes[str(col)] = f"{series.dtype} -> {compacted.dtype}"
+
+        report = {
+            "columns": changes,
+            "memory_bytes": {
+                "before": int(df.memory_usage(deep=True).sum()),
+                "after": int(result.memory_usage(deep=True).sum())
+            },
+            # El "after" en disco lo completa quien escribe el master (tamaño real del archivo)
+            "disk_bytes": {"before": self._parquet_size(df)}
+        }
+        logger.info(f"Esquema compacto del master: {report['memory_bytes']['before']} -> "
+                    f"{report['memory_bytes']['after']} bytes en memoria ({len(changes)} columnas).")
+        return result, report
+
+    def _compact_series(self, series: pd.Series) -> pd.Series:
+        """Columna con el dtype compacto que le corresponde (la misma si no aplica ninguno)."""
+        dtype = series.dtype
+        if pd.api.types.is_bool_dtype(dtype) or not isinstance(dtype, np.dtype):
+            return series
+        if dtype.kind == "O":
+            values = series.dropna()
+            # Solo texto: columnas object mixtas o con números se dejan tal cual
+            if len(values) and values.map(type).eq(str).all() \
+                    and values.nunique() <= self.category_max_ratio * len(series):
+                return series.astype("category")
+            return series
+        if dtype.kind in "iu":
+            if series.empty:
+                return series
+            low, high = series.min(), series.max()
+            if low >= 0 and high <= 1:
+                return series.astype(np.int8)
+            if np.iinfo(np.int32).min <= low and high <= np.iinfo(np.int32).max:
+                return series.astype(np.int32)
+            return series
+        if dtype.kind == "f" and dtype.itemsize > 4:
+            if self.float32 == "all" or series.name in self.float32:
+                return series.astype(np.float32)
+        return series
+
+    @staticmethod
+    def _parquet_size(df: pd.DataFrame) -> int:
+        """Bytes del Parquet (con índice, igual que el master) escrito en memoria."""
+        buffer = io.BytesIO()
+        df.to_parquet(buffer, index=True)
+        return buffer.getbuffer().nbytes
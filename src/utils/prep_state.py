@@ -0,0 +1,85 @@
+import os
+import json
+import logging
+import datetime
+import pandas as pd
+from typing import Any, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class PreprocessState:
+    """
+    Estado de la última limpieza de una tabla, persistido junto al cleansed (`{tabla}.prep.json`).
+
+    Permite que la Fase 02 limpie solo la cola de la tabla: registra la última fecha limpia (`end`), las
+    filas y la fecha máxima del raw que la produjo (`raw_rows`, `raw_end`) y los valores globales usados
+    en imputaciones que dependen de todo el histórico (`modes`, ej. la moda de `tipo_lluvia`). Las modas
+    se mantienen con `mode_counts`: conteos de cada valor (filas deduplicadas, antes de imputar) en las
+    fechas anteriores a la próxima ventana incremental, a los que cada corrida suma solo su cola. La firma
+    (contrato, centinelas, proyección y días de backfill) invalida el estado cuando cambia algo que
+    alteraría la limpieza de filas ya procesadas o la ventana de los conteos.
+    """
+
+    VERSION = 2
+
+    def __init__(self, signature: Dict[str, Any], end: pd.Timestamp, raw_rows: int,
+                 raw_end: pd.Timestamp, modes: Dict[str, Any], mode_counts: Dict[str, Dict[Any, int]]):
+        self.signature = signature
+        self.end = end
+        self.raw_rows = raw_rows
+        self.raw_end = raw_end
+        self.modes = modes
+        self.mode_counts = mode_counts
+
+    @staticmethod
+    def path(cleansed_path: str, table: str) -> str:
+        """Ruta del estado de la tabla, junto a su Parquet limpio."""
+        return os.path.join(cleansed_path, f"{table}.prep.json")
+
+    @classmethod
+    def load(cls, path: str, signature: Dict[str, Any]) -> Optional["PreprocessState"]:
+        """Estado persistido si existe, es legible y su firma coincide; None en otro caso."""
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                payload = json.load(f)
+            if payload.get("version") != cls.VERSION or payload.get("signature") != signature:
+                logger.info(f"Estado de preprocesamiento en {path} con firma distinta. Se reconstruye.")
+                return None
+            # Pares [valor, conteo]: las claves JSON serían texto y perderían el tipo del valor
+            mode_counts = {col: {value: int(count) for value, count in pairs}
+                           for col, pairs in payload["mode_counts"].items()}
+            return cls(signature, pd.Timestamp(payload["end"]), int(payload["raw_rows"]),
+                       pd.Timestamp(payload["raw_end"]), payload["modes"], mode_counts)
+        except (OSError, ValueError, KeyError, TypeError):
+            return None
+
+    def save(self, path: str) -> None:
+        """Persiste el estado (archivo temporal + `os.replace`). Un fallo aquí solo fuerza una limpieza completa."""
+        payload = {
+            "version": self.VERSION,
+            "signature": self.signature,
+            "end": self.end.isoformat(),
+            "raw_rows": int(self.raw_rows),
+            "raw_end": self.raw_end.isoformat(),
+            "modes": self.modes,
+            "mode_counts": {col: [[value.item() if hasattr(value, "item") else value, int(count)]
+                                  for value, count in counts.items()]
+                            for col, counts in self.mode_counts.items()},
+            "updated_at": datetime.datetime.now().isoformat()
+        }
+        tmp_path = f"{path}.tmp"
+        try:
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(payload, f, indent=4, ensure_ascii=False)
+            os.replace(tmp_path, path)
+        except OSError as e:
+            logger.warning(f"No se pudo persistir el estado de preprocesamiento en {path}: {str(e)}")
+
+    @staticmethod
+    def discard(path: str) -> None:
+        """Elimina un estado que ya no representa la tabla (la próxima corrida limpia el histórico completo)."""
+        try:
+            os.remove(path)
+        except OSError:
+            pass
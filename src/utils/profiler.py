@@ -0,0 +1,678 @@
+import logging
+import numpy as np
+import pandas as pd
+from typing import Any, Dict, List, Optional, Union
+from src.utils.sketches import CHUNK_ROWS, KLLSketch, HyperLogLog, HeavyHitters
+
+logger = logging.getLogger(__name__)
+
+QUANTILES = np.array([0.25, 0.5, 0.75])
+
+# Tipos que sobreviven sin pérdida a la serialización JSON del estado de auditoría
+JSON_SCALARS = (str, bool, int, float)
+
+
+class ColumnSummary:
+    """
+    Resumen de una columna obtenido en un único recorrido de sus buffers:
+    valores distintos (no nulos) con su frecuencia y los conteos de nulos y centinelas. Todas las
+    métricas del reporte (min/max/media/std, cuantiles, outliers, cardinalidad, top-k) se derivan de
+    este resumen sin volver a leer la columna.
+
+    Los resúmenes son fusionables (`merge`): el resumen de histórico + delta es el del delta sumado al
+    del histórico. `kind` es `numeric` (valores ordenados), `categorical` (orden de primera aparición,
+    el mismo que usa `value_counts` para desempatar) u `other` (solo nulos, ej. fechas).
+
+    Un resumen numérico con más de `max_distinct` valores se puede comprimir (`compress`) a centroides
+    de igual peso: conserva exactos el conteo, la suma, la suma de cuadrados, el mínimo y el máximo
+    (`moments`), y los cuantiles pasan a ser aproximados con error de rango <= 1 / max_distinct.
+    """
+
+    KINDS = ("numeric", "categorical", "other")
+
+    def __init__(self, kind: str, uniques: np.ndarray, counts: np.ndarray, nulls: int, rows: int,
+                 sentinels: int = 0, moments: Optional[List[float]] = None):
+        self.kind = kind
+        self.uniques = uniques
+        self.counts = counts
+        self.nulls = nulls
+        self.rows = rows
+        self.sentinels = sentinels
+        # [suma, suma de cuadrados, mínimo, máximo]: solo en resúmenes numéricos comprimidos
+        self.moments = moments
+
+    @property
+    def valid(self) -> int:
+        return self.rows - self.nulls
+
+    @property
+    def nunique(self) -> int:
+        return len(self.uniques)
+
+    @property
+    def exact(self) -> bool:
+        return self.moments is None
+
+    @property
+    def zero_variance(self) -> bool:
+        # Un resumen comprimido tiene más de max_distinct valores: nunca es de varianza cero
+        return self.exact and self.nunique <= 1
+
+    def persistable(self, max_distinct: int) -> bool:
+        """Las categóricas solo se persisten hasta `max_distinct` valores y con valores serializables."""
+        return self.kind != "categorical" or (
+            self.nunique <= max_distinct and all(isinstance(v, JSON_SCALARS) for v in self.uniques)
+        )
+
+    def count_in(self, values: List[Any]) -> int:
+        """Filas cuyo valor pertenece a `values` (conteo de centinelas)."""
+        if not values or self.nunique == 0:
+            return 0
+        if self.kind == "numeric":
+            mask = np.isin(self.uniques, np.asarray(values, dtype="float64"))
+        else:
+            mask = pd.Index(self.uniques).isin(values)
+        return int(self.counts[mask].sum())
+
+    def numeric_moments(self) -> List[float]:
+        """[suma, suma de cuadrados, mínimo, máximo] de los valores no nulos."""
+        if not self.exact:
+            return list(self.moments)
+        if self.nunique == 0:
+            return [0.0, 0.0, np.nan, np.nan]
+        return [
+            float(np.dot(self.uniques, self.counts)),
+            float(np.dot(self.uniques * self.uniques, self.counts)),
+            float(self.uniques[0]),
+            float(self.uniques[-1])
+        ]
+
+    def merge(self, other: "ColumnSummary") -> "ColumnSummary":
+        """Resumen de la concatenación (self seguido de other)."""
+        if self.kind != other.kind:
+            raise ValueError(f"No se pueden fusionar resúmenes '{self.kind}' y '{other.kind}'")
+        rows, nulls, sentinels = self.rows + other.rows, self.nulls + other.nulls, self.sentinels + other.sentinels
+
+        if self.kind == "numeric":
+            uniques, inverse = np.unique(np.concatenate([self.uniques, other.uniques]), return_inverse=True)
+            counts = np.bincount(inverse, weights=np.concatenate([self.counts, other.counts]), minlength=len(uniques))
+            moments = None
+            if not (self.exact and other.exact):
+                moments = _merge_moments(self.numeric_moments(), other.numeric_moments())
+            return ColumnSummary("numeric", uniques, counts.astype("int64"), nulls, rows, sentinels, moments)
+
+        if self.kind == "categorical":
+            # Orden de primera aparición: los valores nuevos del delta van después de los del histórico
+            positions = pd.Index(self.uniques).get_indexer(other.uniques) if self.nunique else np.full(other.nunique, -1)
+            counts = self.counts.copy()
+            np.add.at(counts, positions[positions >= 0], other.counts[positions >= 0])
+            new = positions < 0
+            uniques = np.concatenate([self.uniques, other.uniques[new]]).astype(object)
+            return ColumnSummary("categorical", uniques, np.concatenate([counts, other.counts[new]]), nulls, rows, sentinels)
+
+        return ColumnSummary("other", self.uniques, self.counts, nulls, rows, sentinels)
+
+    def compress(self, max_distinct: int) -> "ColumnSummary":
+        """Comprime un resumen numérico a `max_distinct` centroides de igual peso (no-op si ya cabe)."""
+        if self.kind != "numeric" or self.nunique <= max_distinct:
+            return self
+        moments = self.numeric_moments()
+        cumulative = np.cumsum(self.counts)
+        # Cada valor se asigna al bin que contiene el punto medio de su masa
+        bins = np.minimum(((cumulative - self.counts / 2) * max_distinct // cumulative[-1]).astype("int64"), max_distinct - 1)
+        starts = np.flatnonzero(np.concatenate(([True], bins[1:] != bins[:-1])))
+        weights = np.add.reduceat(self.counts, starts)
+        centroids = np.add.reduceat(self.uniques * self.counts, starts) / weights
+        return ColumnSummary("numeric", centroids, weights, self.nulls, self.rows, self.sentinels, moments)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "kind": self.kind,
+            "rows": int(self.rows),
+            "nulls": int(self.nulls),
+            "sentinels": int(self.sentinels),
+            "uniques": self.uniques.tolist(),
+            "counts": self.counts.tolist(),
+            "moments": self.moments
+        }
+
+    @classmethod
+    def from_dict(cls, payload: Dict[str, Any]) -> "ColumnSummary":
+        dtype = "float64" if payload["kind"] == "numeric" else object
+        uniques = np.array(payload["uniques"], dtype=dtype)
+        return cls(payload["kind"], uniques, np.array(payload["counts"], dtype="int64"), payload["nulls"],
+                   payload["rows"], payload["sentinels"], payload["moments"])
+
+
+class ColumnSketch:
+    """
+    Resumen aproximado de memoria acotada de una columna (`extractions.audit.sketches`), con la misma
+    interfaz que ColumnSummary para `ColumnarProfiler.render`:
+
+    - numeric: conteo, suma, suma de cuadrados, mínimo y máximo exactos (`moments`) y un sketch KLL
+      para cuantiles y outliers IQR (error de rango ≈ 1.65% con k=200).
+    - categorical: HyperLogLog para la cardinalidad (error relativo 1.04/sqrt(2^p)) y SpaceSaving para
+      el top-k (conteos sobreestimados en a lo sumo n/capacity; exactos sin desborde).
+
+    Nulos y centinelas se cuentan de forma exacta. La columna se consume en bloques de CHUNK_ROWS
+    filas: ni la memoria de trabajo ni el estado persistido crecen con el número de filas.
+    """
+
+    def __init__(self, kind: str, rows: int, nulls: int, sentinels: int = 0,
+                 moments: Optional[List[float]] = None, quantiles: Optional[KLLSketch] = None,
+                 distinct: Optional[HyperLogLog] = None, heavy: Optional[HeavyHitters] = None):
+        self.kind = kind
+        self.rows = rows
+        self.nulls = nulls
+        self.sentinels = sentinels
+        self.moments = moments
+        self.quantiles = quantiles
+        self.distinct = distinct
+        self.heavy = heavy
+        self._view = None
+
+    @classmethod
+    def numeric(cls, series: pd.Series, sentinels: List[Any], options: Dict[str, int]) -> "ColumnSketch":
+        sketch = cls("numeric", len(series), 0, moments=[0.0, 0.0, np.nan, np.nan],
+                     quantiles=KLLSketch(options["quantile_k"]), distinct=HyperLogLog(options["hll_precision"]))
+        numeric_sentinels = np.asarray(sentinels, dtype="float64")
+        for start in range(0, len(series), CHUNK_ROWS):
+            chunk = series.iloc[start:start + CHUNK_ROWS].to_numpy(dtype="float64", na_value=np.nan)
+            values = chunk[~np.isnan(chunk)]
+            sketch.nulls += len(chunk) - len(values)
+            if not len(values):
+                continue
+            sketch.sentinels += int(np.isin(values, numeric_sentinels).sum())
+            sketch.moments = _merge_moments(sketch.moments, [
+                float(values.sum()), float(np.dot(values, values)), float(values.min()), float(values.max())
+            ])
+            sketch.quantiles.update(values)
+            sketch.distinct.update(values)
+        return sketch
+
+    @classmethod
+    def categorical(cls, series: pd.Series, sentinels: List[Any], options: Dict[str, int]) -> "ColumnSketch":
+        sketch = cls("categorical", len(series), 0, distinct=HyperLogLog(options["hll_precision"]),
+                     heavy=HeavyHitters(options["heavy_hitters"]))
+        for start in range(0, len(series), CHUNK_ROWS):
+            codes, uniques = pd.factorize(series.iloc[start:start + CHUNK_ROWS])
+            valid_codes = codes[codes >= 0]
+            sketch.nulls += len(codes) - len(valid_codes)
+            if not len(uniques):
+                continue
+            uniques = np.asarray(uniques, dtype=object)
+            counts = np.bincount(valid_codes, minlength=len(uniques)).astype("int64")
+            if sentinels:
+                sketch.sentinels += int(counts[pd.Index(uniques).isin(sentinels)].sum())
+            sketch.distinct.update(uniques)
+            sketch.heavy.update(uniques, counts)
+        return sketch
+
+    @property
+    def valid(self) -> int:
+        return self.rows - self.nulls
+
+    @property
+    def exact(self) -> bool:
+        return False
+
+    @property
+    def nunique(self) -> int:
+        # Sin desborde el top-k contiene todos los valores distintos: el conteo es exacto
+        if self.heavy is not None and self.heavy.floor == 0:
+            return len(self.heavy.items)
+        return int(round(self.distinct.estimate())) if self.valid else 0
+
+    @property
+    def zero_variance(self) -> bool:
+        return self.valid == 0 or self.moments[2] == self.moments[3]
+
+    @property
+    def uniques(self) -> np.ndarray:
+        """Numéricas: ítems ordenados del KLL; categóricas: valores del top-k (orden de aparición)."""
+        return self._distribution()[0]
+
+    @property
+    def counts(self) -> np.ndarray:
+        return self._distribution()[1]
+
+    def _distribution(self):
+        if self._view is None:
+            self._view = self.quantiles.sorted_view() if self.kind == "numeric" else (self.heavy.items, self.heavy.counts)
+        return self._view
+
+    def numeric_moments(self) -> List[float]:
+        return list(self.moments)
+
+    def merge(self, other: "ColumnSketch") -> "ColumnSketch":
+        if self.kind != other.kind:
+            raise ValueError(f"No se pueden fusionar sketches '{self.kind}' y '{other.kind}'")
+        return ColumnSketch(
+            self.kind, self.rows + other.rows, self.nulls + other.nulls, self.sentinels + other.sentinels,
+            moments=_merge_moments(self.moments, other.moments) if self.kind == "numeric" else None,
+            quantiles=self.quantiles.merge(other.quantiles) if self.quantiles is not None else None,
+            distinct=self.distinct.merge(other.distinct),
+            heavy=self.heavy.merge(other.heavy) if self.heavy is not None else None
+        )
+
+    def compress(self, max_distinct: int) -> "ColumnSketch":
+        return self
+
+    def persistable(self, max_distinct: int) -> bool:
+        return self.heavy is None or all(isinstance(v, JSON_SCALARS) for v in self.heavy.items)
+
+    def error_bounds(self) -> Dict[str, Any]:
+        """Cotas de error de las métricas aproximadas de la columna (sección `approximation` del perfil)."""
+        bounds = {"distinct_relative_error": round(float(self.distinct.relative_error), 4)}
+        if self.kind == "numeric":
+            bounds["quantile_k"] = self.quantiles.k
+            bounds["quantiles_exact"] = len(self.quantiles.levels) == 1
+        else:
+            bounds["top_count_max_error"] = self.heavy.max_error
+        return bounds
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "kind": self.kind,
+            "sketch": True,
+            "rows": int(self.rows),
+            "nulls": int(self.nulls),
+            "sentinels": int(self.sentinels),
+            "moments": self.moments,
+            "quantiles": self.quantiles.to_dict() if self.quantiles is not None else None,
+            "distinct": self.distinct.to_dict(),
+            "heavy": self.heavy.to_dict() if self.heavy is not None else None
+        }
+
+    @classmethod
+    def from_dict(cls, payload: Dict[str, Any]) -> "ColumnSketch":
+        return cls(
+            payload["kind"], payload["rows"], payload["nulls"], payload["sentinels"], payload["moments"],
+            quantiles=KLLSketch.from_dict(payload["quantiles"]) if payload["quantiles"] is not None else None,
+            distinct=HyperLogLog.from_dict(payload["distinct"]),
+            heavy=HeavyHitters.from_dict(payload["heavy"]) if payload["heavy"] is not None else None
+        )
+
+
+AnyColumnSummary = Union[ColumnSummary, ColumnSketch]
+
+
+def _column_from_dict(payload: Dict[str, Any]) -> AnyColumnSummary:
+    return ColumnSketch.from_dict(payload) if payload.get("sketch") else ColumnSummary.from_dict(payload)
+
+
+def _merge_moments(left: List[float], right: List[float]) -> List[float]:
+    """[suma, suma de cuadrados, mínimo, máximo] de la unión (fmin/fmax ignoran el NaN de un lado vacío)."""
+    return [left[0] + right[0], left[1] + right[1], float(np.fmin(left[2], right[2])), float(np.fmax(left[3], right[3]))]
+
+
+class IntegritySummary:
+    """
+    Resumen fusionable de integridad: filas duplicadas y continuidad de la fecha (duplicadas, rango,
+    huecos y muestra de los primeros huecos). Dos resúmenes se fusionan cuando el segundo empieza
+    después del último día del primero (delta agregado al final del histórico).
+    """
+
+    SAMPLE_SIZE = 5
+
+    def __init__(self, duplicated_rows: int, date: Optional[Dict[str, Any]]):
+        self.duplicated_rows = duplicated_rows
+        # None si la tabla no tiene columna de fecha
+        self.date = date
+
+    @property
+    def appendable(self) -> bool:
+        """La fecha existe y no tiene nulos: un delta posterior se puede fusionar sin releer el histórico."""
+        return self.date is not None and not self.date["nulls"]
+
+    @property
+    def max_date(self) -> Optional[pd.Timestamp]:
+        if not self.appendable or self.date["max"] is None:
+            return None
+        return pd.Timestamp(self.date["max"])
+
+    def merge(self, other: "IntegritySummary") -> "IntegritySummary":
+        if not (self.appendable and other.appendable):
+            raise ValueError("Solo se fusionan resúmenes de integridad con fecha completa")
+        left, right = self.date, other.date
+        if left["max"] is None:
+            return other
+        if right["min"] is None:
+            return self
+        if pd.Timestamp(right["min"]) <= pd.Timestamp(left["max"]):
+            raise ValueError("El delta debe empezar después del último día del histórico")
+
+        # Días faltantes entre el final del histórico y el inicio del delta
+        between = (pd.Timestamp(right["min"]) - pd.Timestamp(left["max"])).days - 1
+        sample = list(left["gaps_sample"])
+        missing = self.SAMPLE_SIZE - len(sample)
+        if missing > 0 and between > 0:
+            start = pd.Timestamp(left["max"]) + pd.Timedelta(days=1)
+            sample += [d.strftime('%Y-%m-%d') for d in pd.date_range(start, periods=min(missing, between), freq='D')]
+        sample = (sample + list(right["gaps_sample"]))[:self.SAMPLE_SIZE]
+
+        return IntegritySummary(self.duplicated_rows + other.duplicated_rows, {
+            "nulls": False,
+            "duplicated": left["duplicated"] + right["duplicated"],
+            "min": left["min"],
+            "max": right["max"],
+            "gaps": left["gaps"] + between + right["gaps"],
+            "gaps_sample": sample
+        })
+
+    def render(self) -> Dict[str, Any]:
+        """Sección `integrity_checks` del reporte."""
+        checks = {"duplicated_rows_count": self.duplicated_rows}
+        if self.date is not None:
+            checks["duplicated_dates_count"] = self.date["duplicated"]
+            if self.date["nulls"]:
+                checks["date_gaps_count"] = "N/A (Existen nulos en fecha)"
+            else:
+                checks["date_gaps_count"] = self.date["gaps"]
+                checks["date_gaps_sample"] = list(self.date["gaps_sample"])
+        return checks
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {"duplicated_rows": self.duplicated_rows, "date": self.date}
+
+    @classmethod
+    def from_dict(cls, payload: Dict[str, Any]) -> "IntegritySummary":
+        return cls(payload["duplicated_rows"], payload["date"])
+
+
+class TableSummary:
+    """
+    Resumen fusionable de una tabla: un ColumnSummary (o ColumnSketch) por columna, en el orden del
+    DataFrame, vistas categóricas para columnas no-object declaradas `object` en el contrato y el
+    resumen de integridad.
+    """
+
+    def __init__(self, rows: int, columns: Dict[str, "AnyColumnSummary"], views: Dict[str, "AnyColumnSummary"],
+                 integrity: IntegritySummary):
+        self.rows = rows
+        self.columns = columns
+        self.views = views
+        self.integrity = integrity
+
+    def merge(self, other: "TableSummary") -> "TableSummary":
+        if list(self.columns) != list(other.columns) or list(self.views) != list(other.views):
+            raise ValueError("Los resúmenes a fusionar tienen columnas distintas")
+        return TableSummary(
+            self.rows + other.rows,
+            {col: summary.merge(other.columns[col]) for col, summary in self.columns.items()},
+            {col: summary.merge(other.views[col]) for col, summary in self.views.items()},
+            self.integrity.merge(other.integrity)
+        )
+
+    def compress(self, max_distinct: int) -> Optional["TableSummary"]:
+        """
+        Versión acotada para persistir: numéricas comprimidas a `max_distinct` centroides. None si una
+        columna categórica supera ese límite o tiene valores no serializables (no admite modo delta).
+        """
+        if not self.integrity.appendable:
+            return None
+        for summary in list(self.columns.values()) + list(self.views.values()):
+            if not summary.persistable(max_distinct):
+                return None
+        return TableSummary(
+            self.rows,
+            {col: summary.compress(max_distinct) for col, summary in self.columns.items()},
+            dict(self.views),
+            self.integrity
+        )
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "rows": int(self.rows),
+            "columns": {col: summary.to_dict() for col, summary in self.columns.items()},
+            "views": {col: summary.to_dict() for col, summary in self.views.items()},
+            "integrity": self.integrity.to_dict()
+        }
+
+    @classmethod
+    def from_dict(cls, payload: Dict[str, Any]) -> "TableSummary":
+        return cls(
+            payload["rows"],
+            {col: _column_from_dict(summary) for col, summary in payload["columns"].items()},
+            {col: _column_from_dict(summary) for col, summary in payload["views"].items()},
+            IntegritySummary.from_dict(payload["integrity"])
+        )
+
+
+class ColumnarProfiler:
+    """
+    Perfilador columnar de una sola pasada para DataAuditor (`extractions.audit.engine: columnar`).
+
+    El auditor legacy recorre cada columna una vez por métrica (`isna`, `isin`, `nunique`, `describe`,
+    dos comparaciones de outliers, `value_counts`). Aquí cada columna se reduce una sola vez sobre su
+    buffer NumPy (`np.unique` en numéricas, `pd.factorize` en categóricas) y el reporte se calcula
+    sobre el resumen, cuyo tamaño es la cardinalidad y no el número de filas.
+
+    `summarize` produce el resumen (fusionable, ver TableSummary) y `render` las secciones
+    `integrity_checks`, `quality_metrics` y `statistical_profile` del auditor legacy (mismas claves y
+    semántica; la media y la desviación pueden diferir en el último dígito por el orden de suma).
+
+    Con `sketches` las columnas numéricas y categóricas se resumen con ColumnSketch (memoria acotada,
+    métricas aproximadas): el perfil agrega `approximation` con las cotas de error por columna.
+    """
+
+    HIGH_CARDINALITY_RATIO = 0.5
+    HIGH_CARDINALITY_MIN_ROWS = 50
+    TOP_K = 5
+
+    def __init__(self, sentinels: Dict[str, List[Any]], date_column: str = "fecha",
+                 sketches: Optional[Dict[str, int]] = None):
+        self.numeric_sentinels = list(sentinels.get("numeric", []))
+        self.object_sentinels = list(sentinels.get("object", []))
+        self.date_column = date_column
+        # Parámetros de ColumnSketch (quantile_k, hll_precision, heavy_hitters); None: resúmenes exactos
+        self.sketches = sketches
+
+    def profile(self, df: pd.DataFrame, schema: Dict[str, str]) -> Dict[str, Dict[str, Any]]:
+        """Integridad, calidad y perfil estadístico de `df` con la estructura del reporte de auditoría."""
+        return self.render(self.summarize(df, schema), schema)
+
+    def summarize(self, df: pd.DataFrame, schema: Dict[str, str]) -> TableSummary:
+        """Resumen de la tabla en una pasada por columna."""
+        columns, views = {}, {}
+        for position, col in enumerate(df.columns):
+            series = df.iloc[:, position]
+            expected_type = schema.get(col, "unknown")
+
+            if pd.api.types.is_numeric_dtype(series) and self.sketches:
+                summary = ColumnSketch.numeric(series, self.numeric_sentinels, self.sketches)
+            elif pd.api.types.is_object_dtype(series) and self.sketches:
+                summary = ColumnSketch.categorical(series, self.object_sentinels, self.sketches)
+            elif pd.api.types.is_numeric_dtype(series):
+                summary = self._numeric_summary(series)
+                summary.sentinels = summary.count_in(self.numeric_sentinels)
+            elif pd.api.types.is_object_dtype(series):
+                summary = self._categorical_summary(series)
+                summary.sentinels = summary.count_in(self.object_sentinels)
+            else:
+                # Fechas y otros tipos: solo nulos
+                summary = ColumnSummary("other", np.array([], dtype=object), np.array([], dtype="int64"),
+                                        int(series.isna().sum()), len(series))
+
+            if summary.kind != "categorical" and expected_type == "object" and col != self.date_column:
+                views[col] = (ColumnSketch.categorical(series, [], self.sketches) if self.sketches
+                              else self._categorical_summary(series))
+            columns[col] = summary
+
+        return TableSummary(len(df), columns, views, self._integrity_summary(df))
+
+    def render(self, summary: TableSummary, schema: Dict[str, str]) -> Dict[str, Dict[str, Any]]:
+        """Secciones del reporte de auditoría a partir de un resumen (completo o fusionado)."""
+        rows = summary.rows
+        quality = {"null_counts": {}, "sentinel_counts": {}, "zero_variance_cols": [], "high_cardinality_cols": []}
+        profile = {"numeric": {}, "categorical": {}}
+
+        for col, column in summary.columns.items():
+            expected_type = schema.get(col, "unknown")
+            quality["null_counts"][col] = column.nulls
+            if column.sentinels > 0:
+                quality["sentinel_counts"][col] = column.sentinels
+
+            if column.kind == "numeric":
+                if column.zero_variance:
+                    quality["zero_variance_cols"].append(col)
+                if expected_type in ["int", "float"]:
+                    profile["numeric"][col] = self._numeric_profile(column)
+            elif column.kind == "categorical":
+                unique_pct = column.nunique / rows if rows > 0 else 0
+                if unique_pct > self.HIGH_CARDINALITY_RATIO and rows > self.HIGH_CARDINALITY_MIN_ROWS:
+                    quality["high_cardinality_cols"].append(col)
+                if col != self.date_column:
+                    profile["categorical"][col] = self._categorical_profile(column)
+            if col in summary.views:
+                profile["categorical"][col] = self._categorical_profile(summary.views[col])
+
+        sketched = {
+            col: column.error_bounds()
+            for col, column in list(summary.columns.items()) + list(summary.views.items())
+            if isinstance(column, ColumnSketch)
+        }
+        if sketched:
+            profile["approximation"] = sketched
+
+        return {
+            "integrity_checks": summary.integrity.render(),
+            "quality_metrics": quality,
+            "statistical_profile": profile
+        }
+
+    @staticmethod
+    def _numeric_summary(series: pd.Series) -> ColumnSummary:
+        values = series.to_numpy(dtype="float64", na_value=np.nan)
+        null_mask = np.isnan(values)
+        nulls = int(null_mask.sum())
+        if nulls:
+            values = values[~null_mask]
+        uniques, counts = np.unique(values, return_counts=True)
+        return ColumnSummary("numeric", uniques, counts.astype("int64"), nulls, len(series))
+
+    @staticmethod
+    def _categorical_summary(series: pd.Series) -> ColumnSummary:
+        codes, uniques = pd.factorize(series)
+        valid_codes = codes[codes >= 0]
+        counts = np.bincount(valid_codes, minlength=len(uniques)).astype("int64")
+        return ColumnSummary("categorical", np.asarray(uniques, dtype=object), counts,
+                             len(codes) - len(valid_codes), len(series))
+
+    @staticmethod
+    def _numeric_profile(summary: AnyColumnSummary) -> Dict[str, Any]:
+        """Equivalente a `describe()` + IQR del auditor legacy, calculado sobre (valor, frecuencia)."""
+        uniques, counts, n = summary.uniques, summary.counts, summary.valid
+        if n == 0:
+            mean = std = minimum = maximum = np.nan
+            p25 = p50 = p75 = np.nan
+        elif summary.exact:
+            mean = float(np.dot(uniques, counts) / n)
+            std = float(np.sqrt(np.dot(counts, (uniques - mean) ** 2) / (n - 1))) if n > 1 else np.nan
+            minimum, maximum = float(uniques[0]), float(uniques[-1])
+            p25, p50, p75 = _weighted_quantiles(uniques, np.cumsum(counts), QUANTILES)
+        else:
+            total, total_sq, minimum, maximum = summary.moments
+            mean = total / n
+            std = float(np.sqrt(max(total_sq - total * mean, 0.0) / (n - 1))) if n > 1 else np.nan
+            p25, p50, p75 = np.clip(_weighted_quantiles(uniques, np.cumsum(counts), QUANTILES), minimum, maximum).tolist()
+
+        iqr = p75 - p25
+        lower_bound = p25 - 1.5 * iqr
+        upper_bound = p75 + 1.5 * iqr
+        # Acumulado con 0 inicial: filas con valor < u[i] == cumulative[i]
+        cumulative = np.concatenate(([0], np.cumsum(counts)))
+        outliers_below = int(cumulative[np.searchsorted(uniques, lower_bound, side="left")]) if n else 0
+        outliers_above = int(n - cumulative[np.searchsorted(uniques, upper_bound, side="right")]) if n else 0
+
+        return {
+            "mean": mean,
+            "std": std,
+            "min": minimum,
+            "max": maximum,
+            "p25": p25,
+            "p50": p50,
+            "p75": p75,
+            "range": float(maximum - minimum),
+            "iqr_stats": {
+                "iqr": float(iqr),
+                "lower_bound": float(lower_bound),
+                "upper_bound": float(upper_bound),
+                "outliers_below": outliers_below,
+                "outliers_above": outliers_above,
+                "total_outliers": outliers_below + outliers_above
+            }
+        }
+
+    def _categorical_profile(self, summary: AnyColumnSummary) -> Dict[str, Any]:
+        # Mismo orden que value_counts(): frecuencias en orden de aparición, ordenadas de mayor a menor
+        vc = pd.Series(summary.counts, index=pd.Index(summary.uniques)).sort_values(ascending=False)
+        return {
+            "top_values": vc.head(self.TOP_K).to_dict(),
+            "unique_count": summary.nunique,
+            "mode": str(vc.index[0]) if not vc.empty else None,
+            "top_weight": float(vc.iloc[0] / summary.rows) if not vc.empty and summary.rows > 0 else 0
+        }
+
+    def _integrity_summary(self, df: pd.DataFrame) -> IntegritySummary:
+        """Duplicados y continuidad temporal con una sola conversión y un solo ordenamiento de la fecha."""
+        date = None
+        if self.date_column in df.columns:
+            temp_date = pd.to_datetime(df[self.date_column], errors="coerce")
+            if temp_date.isna().any():
+                date = {"nulls": True, "duplicated": int(temp_date.duplicated().sum())}
+            else:
+                unique_dates = _sorted_unique(temp_date.to_numpy())
+                missing_dates = self._missing_dates(unique_dates)
+                date = {
+                    "nulls": False,
+                    "duplicated": int(len(temp_date) - len(unique_dates)),
+                    "min": pd.Timestamp(unique_dates[0]).isoformat() if len(unique_dates) else None,
+                    "max": pd.Timestamp(unique_dates[-1]).isoformat() if len(unique_dates) else None,
+                    "gaps": len(missing_dates),
+                    "gaps_sample": [d.strftime('%Y-%m-%d') for d in missing_dates[:IntegritySummary.SAMPLE_SIZE]]
+                }
+        return IntegritySummary(self._duplicated_rows(df), date)
+
+    @staticmethod
+    def _duplicated_rows(df: pd.DataFrame) -> int:
+        """
+        Filas repetidas vía un hash de 64 bits por fila. Sin colisiones entre hashes no hay duplicados;
+        si el hash señala alguno se confirma con `df.duplicated()` (el conteo siempre es exacto).
+        """
+        if df.empty or df.shape[1] == 0:
+            return int(df.duplicated().sum())
+        row_hashes = np.sort(pd.util.hash_pandas_object(df, index=False).to_numpy())
+        if not (row_hashes[1:] == row_hashes[:-1]).any():
+            return 0
+        return int(df.duplicated().sum())
+
+    @staticmethod
+    def _missing_dates(unique_dates: np.ndarray) -> pd.DatetimeIndex:
+        if len(unique_dates) == 0:
+            return pd.DatetimeIndex([])
+        all_dates = pd.date_range(start=unique_dates[0], end=unique_dates[-1], freq='D')
+        return all_dates.difference(pd.DatetimeIndex(unique_dates))
+
+
+def _sorted_unique(values: np.ndarray) -> np.ndarray:
+    """Valores distintos ordenados vía sort (np.unique sin conteos usa una tabla hash, más lenta aquí)."""
+    ordered = np.sort(values)
+    if len(ordered) == 0:
+        return ordered
+    return ordered[np.concatenate(([True], ordered[1:] != ordered[:-1]))]
+
+
+def _weighted_quantiles(uniques: np.ndarray, cumulative: np.ndarray, quantiles: np.ndarray) -> List[float]:
+    """
+    Cuantiles con interpolación lineal (método por defecto de pandas) a partir de valores ordenados
+    y frecuencias acumuladas: el elemento i-ésimo de la columna ordenada es el primer valor único cuyo
+    acumulado supera i.
+    """
+    n = int(cumulative[-1])
+    positions = (n - 1) * quantiles
+    lower = np.floor(positions).astype("int64")
+    upper = np.minimum(lower + 1, n - 1)
+    below = uniques[np.searchsorted(cumulative, lower, side="right")]
+    above = uniques[np.searchsorted(cumulative, upper, side="right")]
+    return [float(v) for v in below + (positions - lower) * (above - below)]
@@ -0,0 +1,122 @@
+import re
+import logging
+from typing import Any, Dict, List, Optional, Set
+from src.utils.rules import compile_business_rules
+from src.utils.cleaning_plan import compile_cleaning_plans
+
+logger = logging.getLogger(__name__)
+
+# FeatureEngineer: columnas referenciadas directamente en el código de transformaciones
+FEATURE_DEPENDENCIES = [
+    "inflacion_mensual_ipc", "es_dia_lluvioso", "tipo_lluvia",
+    "precio_unitario", "smlv", "costo_unitario"
+]
+
+
+class ProjectionPlanner:
+    """
+    Planificador de proyección de columnas para la extracción y las lecturas Parquet.
+
+    Modos (`extractions.projection.mode`):
+    * `all`: comportamiento histórico, `select("*")` y lectura de todas las columnas.
+    * `contract`: solo las columnas declaradas en `extractions.schemas`.
+    * `consumed`: columnas del contrato que alguna fase posterior realmente lee. Una columna se poda
+      únicamente si FeatureEngineer la elimina (`features.drop_columns`) y ninguna regla de auditoría,
+      limpieza, EDA o ingeniería de variables la referencia antes.
+
+    `extractions.projection.exclude` permite podar columnas adicionales por tabla; se valida que no
+    sean consumidas aguas abajo.
+    """
+
+    MODES = ("all", "contract", "consumed")
+
+    def __init__(self, config: Dict[str, Any]):
+        extraction_config = config.get("extractions", {})
+        projection = extraction_config.get("projection", {})
+
+        self.mode = projection.get("mode", "all")
+        if self.mode not in self.MODES:
+            raise ValueError(f"Modo de proyección no soportado: '{self.mode}'. Opciones: {self.MODES}")
+
+        self.schemas = extraction_config.get("schemas", {})
+        self.date_column = config.get("preprocessing", {}).get("date_column", "fecha")
+        self.drop_columns = set(config.get("features", {}).get("drop_columns", []))
+        self.referenced = self._referenced_columns(config)
+        # Columnas leídas por las reglas de negocio de DataAuditor (`extractions.business_rules`)
+        self.audit_dependencies = {
+            table: rule_set.expression_columns for table, rule_set in compile_business_rules(config).items()
+        }
+        # Columnas leídas por los ajustes e imputaciones de DataPreprocessor (`preprocessing.cleaning_plan`).
+        # Si una de ellas no viaja desde la fuente, el paso se omite en silencio: nunca se podan.
+        self.preprocessing_dependencies = {
+            table: plan.input_columns for table, plan in compile_cleaning_plans(config).items()
+        }
+        self.exclude = {table: list(cols) for table, cols in projection.get("exclude", {}).items()}
+        self._validate_exclusions()
+
+    def columns(self, table: str) -> Optional[List[str]]:
+        """Columnas a solicitar/leer para la tabla, en orden de contrato. None significa todas."""
+        if self.mode == "all" or table not in self.schemas:
+            return None
+        return self.contract_columns(table)
+
+    def contract_columns(self, table: str) -> List[str]:
+        """Columnas del contrato que se esperan tras aplicar la proyección (base de la validación de contrato)."""
+        schema = self.schemas.get(table, {})
+        if self.mode == "all":
+            return list(schema.keys())
+        pruned = set(self.exclude.get(table, []))
+        if self.mode == "consumed":
+            pruned |= set(self.prunable_columns(table))
+        return [col for col in schema if col not in pruned]
+
+    def select_clause(self, table: str) -> str:
+        """Cláusula `select` de PostgREST para la tabla (`*` sin proyección)."""
+        columns = self.columns(table)
+        return ",".join(columns) if columns else "*"
+
+    def prunable_columns(self, table: str) -> List[str]:
+        """Columnas del contrato que FeatureEngineer descarta y que nada lee antes de ese punto."""
+        needed = self.referenced | set(self.audit_dependencies.get(table, [])) | set(self.preprocessing_dependencies.get(table, []))
+        return [
+            col for col in self.schemas.get(table, {})
+            if col in self.drop_columns and col not in needed and col != self.date_column
+        ]
+
+    def _validate_exclusions(self) -> None:
+        """Una exclusión manual no puede eliminar la fecha ni una columna consumida aguas abajo."""
+        for table, cols in self.exclude.items():
+            needed = (
+                self.referenced
+                | set(self.audit_dependencies.get(table, []))
+                | set(self.preprocessing_dependencies.get(table, []))
+                | (set(self.schemas.get(table, {})) - self.drop_columns)
+            )
+            conflicts = [col for col in cols if col in needed or col == self.date_column]
+            if conflicts:
+                raise ValueError(
+                    f"Proyección inválida para '{table}': las columnas {conflicts} son consumidas por fases posteriores."
+                )
+
+    def _referenced_columns(self, config: Dict[str, Any]) -> Set[str]:
+        """Columnas referenciadas en config.yaml por EDA, preprocesamiento e ingeniería de variables."""
+        features = config.get("features", {})
+        eda = config.get("eda", {})
+        transformations = features.get("transformations", {})
+
+        referenced = {self.date_column}
+        referenced.update(FEATURE_DEPENDENCIES)
+        referenced.update(c for c in [
+            features.get("target_variable"),
+            eda.get("target_variable"),
+            config.get("preprocessing", {}).get("target_column")
+        ] if c)
+        referenced.update(features.get("id_columns", []))
+        referenced.update(features.get("base_columns", []))
+        referenced.update(transformations.get("exogenous_lags", {}).keys())
+        referenced.update(eda.get("statistics", {}).get("vif_columns", []))
+        for pair in features.get("interactions", []):
+            referenced.update(pair)
+        for ratio in features.get("simulation_ratios", {}).values():
+            referenced.update(re.findall(r"[^\W\d]\w*", ratio.get("formula", "")))
+        return referenced
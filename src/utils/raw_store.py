@@ -0,0 +1,527 @@
+import os
+import glob
+import json
+import uuid
+import logging
+import datetime
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.dataset as ds
+import pyarrow.parquet as pq
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+def _rows_equal(left: pd.DataFrame, right: pd.DataFrame) -> np.ndarray:
+    """Igualdad fila a fila entre dos frames alineados por posición (NaN == NaN)."""
+    equal = np.ones(len(left), dtype=bool)
+    for col in right.columns:
+        if col not in left.columns:
+            equal &= right[col].isna().to_numpy()
+            continue
+        a = left[col].to_numpy()
+        b = right[col].to_numpy()
+        both_null = pd.isna(a) & pd.isna(b)
+        with np.errstate(invalid="ignore"):
+            equal &= (a == b) | both_null
+    return equal
+
+
+def sorted_merge(existing: pd.DataFrame, delta: pd.DataFrame, key: str = "fecha") -> Tuple[pd.DataFrame, Dict[str, int]]:
+    """
+    Upsert por clave de fecha sobre datos ordenados, sin re-hashear la tabla completa.
+
+    Las fechas del delta se ubican en la tabla existente con `np.searchsorted` (O(d log n)); las filas
+    coincidentes se comparan valor a valor para distinguir correcciones (`updated`) de re-envíos idénticos
+    (`unchanged`), y las fechas nuevas se insertan (`inserted`). El resultado se reordena con un sort
+    estable, que sobre dos corridas ya ordenadas (tabla + delta) es prácticamente lineal.
+    Las columnas de la tabla que el delta no trae (podadas por la proyección) se conservan: quedan nulas en
+    las filas nuevas y con su valor persistido en las corregidas. Si nada cambió se retorna la tabla tal cual.
+    """
+    delta = delta.copy()
+    delta[key] = pd.to_datetime(delta[key])
+    delta = delta.sort_values(key, kind="stable").drop_duplicates(subset=[key], keep="last")
+
+    if existing.empty or key not in existing.columns:
+        stats = {"inserted": len(delta), "updated": 0, "unchanged": 0}
+        return delta.reset_index(drop=True), stats
+
+    existing = existing.copy()
+    existing[key] = pd.to_datetime(existing[key])
+    if not existing[key].is_monotonic_increasing or existing[key].duplicated().any():
+        # Tablas persistidas antes del merge ordenado: se normalizan una única vez
+        existing = existing.sort_values(key, kind="stable").drop_duplicates(subset=[key], keep="last")
+    existing = existing.reset_index(drop=True)
+
+    existing_keys = existing[key].to_numpy(dtype="datetime64[ns]")
+    delta_keys = delta[key].to_numpy(dtype="datetime64[ns]")
+    positions = np.searchsorted(existing_keys, delta_keys)
+    clipped = np.minimum(positions, len(existing_keys) - 1)
+    matched = (positions < len(existing_keys)) & (existing_keys[clipped] == delta_keys)
+
+    same = np.zeros(len(delta), dtype=bool)
+    if matched.any():
+        same[matched] = _rows_equal(
+            existing.iloc[positions[matched]].reset_index(drop=True),
+            delta[matched].reset_index(drop=True)
+        )
+    updated = matched & ~same
+    inserted = ~matched
+    stats = {"inserted": int(inserted.sum()), "updated": int(updated.sum()), "unchanged": int((matched & same).sum())}
+
+    if not updated.any() and not inserted.any():
+        return existing, stats
+
+    keep = np.ones(len(existing), dtype=bool)
+    keep[positions[updated]] = False
+    incoming = delta[updated | inserted].reset_index(drop=True)
+    carried = [col for col in existing.columns if col not in delta.columns]
+    if carried and updated.any():
+        # Columnas que el delta no trae (proyección): una fila corregida conserva sus valores persistidos
+        replaced = updated[updated | inserted]
+        previous = existing[carried].iloc[clipped[updated | inserted]].reset_index(drop=True)
+        incoming = pd.concat([incoming, previous.where(np.broadcast_to(replaced[:, None], previous.shape))], axis=1)
+    merged = pd.concat([existing[keep], incoming], ignore_index=True)
+    if not merged[key].is_monotonic_increasing:
+        merged = merged.sort_values(key, kind="stable").reset_index(drop=True)
+    return merged, stats
+
+
+class RawStore:
+    """
+    Capa de persistencia de la zona raw (`data/01_raw`).
+
+    Soporta dos layouts configurables en `extractions.raw_store.layout`:
+    * `file`: un Parquet por tabla (`{table}.parquet`) que se reescribe completo en cada actualización.
+    * `partitioned`: dataset Parquet append-only particionado por año/mes
+      (`{table}/year=YYYY/month=MM/part-*.parquet`). Cada delta se escribe como fragmentos nuevos y solo
+      se compactan las particiones cuyas fechas se solapan con el delta, de modo que el costo de escritura
+      diario depende del tamaño del delta y no del histórico.
+    """
+
+    LAYOUTS = ("file", "partitioned")
+
+    def __init__(self, base_path: str, layout: str = "file", date_column: str = "fecha",
+                 max_fragments_per_partition: int = 8):
+        if layout not in self.LAYOUTS:
+            raise ValueError(f"Layout de raw store no soportado: '{layout}'. Opciones: {self.LAYOUTS}")
+        self.base_path = base_path
+        self.layout = layout
+        self.date_column = date_column
+        self.max_fragments_per_partition = max_fragments_per_partition
+
+    def table_path(self, table: str) -> str:
+        """Ruta física de la tabla: archivo (`file`) o directorio del dataset (`partitioned`)."""
+        if self.layout == "file":
+            return os.path.join(self.base_path, f"{table}.parquet")
+        return os.path.join(self.base_path, table)
+
+    def exists(self, table: str) -> bool:
+        """Indica si la tabla tiene datos persistidos en el layout activo."""
+        if self.layout == "file":
+            return os.path.exists(self.table_path(table))
+        return len(self._fragments(self.table_path(table))) > 0
+
+    def read(self, table: str, columns: Optional[List[str]] = None,
+             since: Optional[pd.Timestamp] = None) -> pd.DataFrame:
+        """
+        Lee la tabla completa como DataFrame (vacío si no existe).
+        Con `columns` solo se decodifican esas columnas (las ausentes en el archivo se ignoran).
+        Con `since` solo se leen las filas con fecha >= since (filtro empujado a los row groups / particiones).
+        """
+        if self.layout == "file":
+            path = self.table_path(table)
+            schema = pq.read_schema(path) if columns is not None or since is not None else None
+            if columns is not None:
+                columns = self._present_columns(schema, columns)
+            filters = self._since_filter(schema, since) if since is not None else None
+            df = pd.read_parquet(path, columns=columns, filters=filters)
+            if since is not None and filters is None and self.date_column in df.columns:
+                # Fecha no almacenada como timestamp: el filtro se aplica después de decodificar
+                df = df[pd.to_datetime(df[self.date_column]) >= since].reset_index(drop=True)
+            return df
+
+        table_dir = self.table_path(table)
+        if not self._fragments(table_dir):
+            return pd.DataFrame()
+
+        dataset = self._dataset(table_dir)
+        if columns is not None:
+            columns = self._present_columns(dataset.schema, columns)
+        filters = self._since_filter(dataset.schema, since)
+        df = dataset.to_table(columns=columns, filter=pq.filters_to_expression(filters) if filters else None).to_pandas()
+        if since is not None and filters is None and self.date_column in df.columns:
+            df = df[pd.to_datetime(df[self.date_column]) >= since]
+        if self.date_column in df.columns:
+            # Un fallo entre la compactación y el borrado de fragmentos viejos puede dejar fechas repetidas:
+            # los fragmentos se leen en orden de escritura, así que gana la versión más reciente.
+            df = df.drop_duplicates(subset=[self.date_column], keep="last")
+            df = df.sort_values(self.date_column, kind="stable").reset_index(drop=True)
+        return df
+
+    def iter_batches(self, table: str, columns: Optional[List[str]] = None,
+                     batch_rows: int = 65536) -> Iterator[pa.RecordBatch]:
+        """
+        Record batches de la tabla (de a lo sumo `batch_rows` filas, en orden de archivo / escritura) sin
+        materializarla completa. Sin deduplicar: el consumidor decide qué versión de cada fecha conserva.
+        En el layout `file` se lee con `ParquetFile.iter_batches` (sin pre-buffer ni lectura anticipada del
+        scanner de datasets, que retiene varios row groups decodificados); la memoria mínima sigue siendo
+        la de un row group por columna.
+        """
+        dataset = self._table_dataset(table)
+        if dataset is None:
+            return
+        if columns is not None:
+            columns = self._present_columns(dataset.schema, columns)
+        if self.layout == "file":
+            batches = pq.ParquetFile(self.table_path(table), pre_buffer=False,
+                                     buffer_size=1 << 20).iter_batches(batch_size=batch_rows, columns=columns)
+        else:
+            batches = dataset.to_batches(columns=columns, batch_size=batch_rows,
+                                         batch_readahead=0, fragment_readahead=0)
+        for batch in batches:
+            if batch.num_rows:
+                yield batch
+
+    def sample(self, table: str, columns: Optional[List[str]] = None, rows: int = 1024) -> pd.DataFrame:
+        """Primeras `rows` filas de la tabla (vacío si no existe), para estimar el tamaño de lote."""
+        dataset = self._table_dataset(table)
+        if dataset is None:
+            return pd.DataFrame()
+        if columns is not None:
+            columns = self._present_columns(dataset.schema, columns)
+        return dataset.head(rows, columns=columns).to_pandas()
+
+    def row_count(self, table: str) -> Optional[int]:
+        """
+        Filas persistidas sin leer datos: sidecar de watermark válido o, en el layout `file`, el footer Parquet.
+        None si no se puede determinar (dataset particionado sin sidecar: puede tener fechas repetidas).
+        """
+        sidecar = self._read_sidecar(table)
+        if sidecar is not None and "rows" in sidecar:
+            return int(sidecar["rows"])
+        if self.layout == "file" and self.exists(table):
+            try:
+                return pq.ParquetFile(self.table_path(table)).metadata.num_rows
+            except (OSError, pa.ArrowException):
+                return None
+        return None
+
+    def upsert(self, table: str, df_new: pd.DataFrame, df_existing: Optional[pd.DataFrame] = None) -> pd.DataFrame:
+        """
+        Incorpora un delta a la tabla (la última versión de cada fecha prevalece) y retorna la vista final.
+        En el layout `file` se requiere `df_existing` (la tabla actual) para reescribir el archivo completo.
+        """
+        df_final, _ = self.merge(table, df_new, df_existing)
+        return df_final if df_final is not None else self.read(table)
+
+    def merge(self, table: str, df_new: pd.DataFrame,
+              df_existing: Optional[pd.DataFrame] = None) -> Tuple[Optional[pd.DataFrame], Dict[str, int]]:
+        """
+        Igual que `upsert`, pero retorna además el conteo de filas `inserted`, `updated` y `unchanged`
+        del merge ordenado por fecha. Si el delta no cambia nada, no se reescribe ningún archivo.
+        En el layout `partitioned` solo se leen las particiones que toca el delta y la vista final no se
+        materializa (se retorna None; el consumidor la lee con `read` si la necesita): el watermark se
+        actualiza desde el sidecar previo y los conteos del merge.
+        """
+        stats = {"inserted": 0, "updated": 0, "unchanged": 0}
+        if self.layout == "file":
+            df_existing = df_existing if df_existing is not None else pd.DataFrame()
+            if self.date_column in df_new.columns:
+                df_final, stats = sorted_merge(df_existing, df_new, self.date_column)
+            else:
+                # Sin columna de fecha no hay clave de merge: se concatena (comportamiento histórico)
+                df_final = pd.concat([df_existing, df_new], ignore_index=True)
+                stats["inserted"] = len(df_new)
+            if stats["inserted"] + stats["updated"] == 0:
+                return df_final, stats
+            self._write_table_file(table, df_final)
+        else:
+            previous = self._read_sidecar(table)
+            stats = self._append_partitioned(table, df_new)
+            if not df_new.empty:
+                self._update_partitioned_watermark(table, previous, df_new, stats["inserted"])
+            return None, stats
+
+        if self.date_column in df_final.columns and not df_final.empty:
+            self._write_watermark(table, pd.to_datetime(df_final[self.date_column]).max(), len(df_final))
+        return df_final, stats
+
+    def _update_partitioned_watermark(self, table: str, previous: Optional[Dict[str, Any]],
+                                      df_new: pd.DataFrame, inserted: int) -> None:
+        """
+        Watermark tras un append particionado sin leer el histórico: filas y fecha máxima del sidecar previo
+        más las fechas insertadas por el delta. Sin sidecar válido se escanea solo la columna de fecha.
+        """
+        delta_max = pd.to_datetime(df_new[self.date_column]).max()
+        if previous is not None and "rows" in previous and "max_date" in previous:
+            max_date = max(pd.Timestamp(previous["max_date"]), delta_max)
+            rows = int(previous["rows"]) + inserted
+        else:
+            dates = pd.to_datetime(self._dataset(self.table_path(table)).to_table(
+                columns=[self.date_column]).column(self.date_column).to_pandas())
+            max_date, rows = dates.max(), int(dates.nunique())
+        self._write_watermark(table, max_date, rows)
+
+    def high_water_mark(self, table: str) -> Optional[pd.Timestamp]:
+        """
+        Fecha máxima persistida de una tabla sin leer páginas de datos. Orden de resolución:
+        1. Sidecar `watermark` escrito en cada `upsert` (validado contra la huella de los archivos).
+        2. Estadísticas min/max de los row groups en el footer Parquet.
+        3. Escaneo completo, pero solo de la columna de fecha (último recurso).
+        """
+        watermark = self._read_watermark(table)
+        if watermark is not None:
+            return watermark
+
+        paths = self._watermark_candidates(table)
+        try:
+            max_date = self._max_from_statistics(paths)
+            if max_date is not None:
+                return max_date
+        except (OSError, ValueError, pa.ArrowException) as e:
+            logger.warning(f"No se pudieron leer estadísticas Parquet de '{table}': {str(e)}")
+
+        logger.info(f"Sin estadísticas de '{self.date_column}' para '{table}'. Escaneando la columna completa.")
+        if self.layout == "file":
+            df = pd.read_parquet(self.table_path(table), columns=[self.date_column])
+        else:
+            df = self._dataset(self.table_path(table)).to_table(columns=[self.date_column]).to_pandas()
+        if df.empty or self.date_column not in df.columns:
+            return None
+        return pd.to_datetime(df[self.date_column]).max()
+
+    def watermark_path(self, table: str) -> str:
+        """Ruta del sidecar de watermark (junto al archivo o dentro del directorio del dataset)."""
+        if self.layout == "file":
+            return os.path.join(self.base_path, f"{table}.watermark.json")
+        return os.path.join(self.table_path(table), "_watermark.json")
+
+    def audit_state_path(self, table: str) -> str:
+        """Ruta del estado incremental de auditoría (AuditState), junto al watermark de la tabla."""
+        if self.layout == "file":
+            return os.path.join(self.base_path, f"{table}.audit.json")
+        return os.path.join(self.table_path(table), "_audit.json")
+
+    def drift_profile_path(self, table: str) -> str:
+        """Ruta del perfil histórico de drift (DriftProfile), junto al estado de auditoría."""
+        if self.layout == "file":
+            return os.path.join(self.base_path, f"{table}.drift.json")
+        return os.path.join(self.table_path(table), "_drift.json")
+
+    def source_state(self, table: str) -> Optional[Dict[str, Any]]:
+        """Estado de la fuente (`rows`, `max_date`) registrado en la última extracción, si el sidecar es válido."""
+        sidecar = self._read_sidecar(table)
+        return sidecar.get("source") if sidecar is not None else None
+
+    def record_source_state(self, table: str, state: Dict[str, Any]) -> None:
+        """
+        Registra en el sidecar el conteo y la fecha máxima que reportó la fuente antes de extraer.
+        Si el sidecar no existe o está desactualizado no se registra nada (la próxima corrida extrae).
+        """
+        sidecar = self._read_sidecar(table)
+        if sidecar is None:
+            return
+        sidecar["source"] = state
+        try:
+            with open(self.watermark_path(table), "w", encoding="utf-8") as f:
+                json.dump(sidecar, f, indent=4, ensure_ascii=False)
+        except OSError as e:
+            logger.warning(f"No se pudo registrar el estado de la fuente de '{table}': {str(e)}")
+
+    def _read_watermark(self, table: str) -> Optional[pd.Timestamp]:
+        """Fecha máxima del sidecar si existe y su huella coincide con los archivos actuales; None en otro caso."""
+        sidecar = self._read_sidecar(table)
+        try:
+            return pd.Timestamp(sidecar["max_date"]) if sidecar is not None else None
+        except (ValueError, KeyError):
+            return None
+
+    def _read_sidecar(self, table: str) -> Optional[Dict[str, Any]]:
+        """Contenido del sidecar validado contra la huella de los archivos; None si falta o está desactualizado."""
+        try:
+            with open(self.watermark_path(table), "r", encoding="utf-8") as f:
+                watermark = json.load(f)
+            if watermark.get("fingerprint") != self._fingerprint(table):
+                logger.info(f"Watermark de '{table}' desactualizado respecto a los archivos. Se ignora.")
+                return None
+            return watermark
+        except (OSError, ValueError):
+            return None
+
+    def _write_watermark(self, table: str, max_date: pd.Timestamp, rows: int) -> None:
+        """Persiste el sidecar de watermark. Un fallo aquí no invalida la escritura de datos."""
+        watermark = {
+            "table": table,
+            "max_date": max_date.isoformat(),
+            "rows": int(rows),
+            "fingerprint": None,
+            "updated_at": datetime.datetime.now().isoformat()
+        }
+        try:
+            watermark["fingerprint"] = self._fingerprint(table)
+            with open(self.watermark_path(table), "w", encoding="utf-8") as f:
+                json.dump(watermark, f, indent=4, ensure_ascii=False)
+        except OSError as e:
+            logger.warning(f"No se pudo escribir el watermark de '{table}': {str(e)}")
+
+    def _fingerprint(self, table: str) -> List[Any]:
+        """
+        Huella barata (solo metadatos del sistema de archivos) de los datos de los que depende el watermark:
+        tamaño y mtime del archivo (`file`) o nombres de los fragmentos de la última partición (`partitioned`).
+        """
+        if self.layout == "file":
+            stat = os.stat(self.table_path(table))
+            return [stat.st_size, stat.st_mtime_ns]
+        return [os.path.relpath(p, self.base_path).replace(os.sep, "/") for p in self._watermark_candidates(table)]
+
+    def _watermark_candidates(self, table: str) -> List[str]:
+        """Archivos que contienen la fecha máxima: el archivo único o los fragmentos de la última partición."""
+        if self.layout == "file":
+            return [self.table_path(table)]
+        table_dir = self.table_path(table)
+        partitions = sorted(glob.glob(os.path.join(table_dir, "year=*", "month=*")))
+        for partition in reversed(partitions):
+            fragments = self._fragments(partition)
+            if fragments:
+                return fragments
+        return []
+
+    def _max_from_statistics(self, paths: List[str]) -> Optional[pd.Timestamp]:
+        """Máximo de la columna de fecha según el footer Parquet; None si algún row group no tiene estadísticas."""
+        max_date = None
+        for path in paths:
+            metadata = pq.ParquetFile(path).metadata
+            for rg in range(metadata.num_row_groups):
+                row_group = metadata.row_group(rg)
+                column = next(
+                    (row_group.column(i) for i in range(row_group.num_columns)
+                     if row_group.column(i).path_in_schema == self.date_column),
+                    None
+                )
+                if column is None or column.statistics is None or not column.statistics.has_min_max:
+                    return None
+                candidate = pd.Timestamp(column.statistics.max)
+                max_date = candidate if max_date is None or candidate > max_date else max_date
+        return max_date
+
+    def _append_partitioned(self, table: str, df_new: pd.DataFrame) -> Dict[str, int]:
+        """Escribe el delta como fragmentos nuevos y compacta solo las particiones solapadas."""
+        if self.date_column not in df_new.columns:
+            raise KeyError(f"El layout particionado requiere la columna '{self.date_column}' en '{table}'.")
+
+        df_new = df_new.copy()
+        df_new[self.date_column] = pd.to_datetime(df_new[self.date_column])
+        # Fechas repetidas dentro del delta: prevalece la última, como en el merge ordenado
+        df_new = df_new.sort_values(self.date_column, kind="stable").drop_duplicates(
+            subset=[self.date_column], keep="last")
+        dates = df_new[self.date_column]
+        table_dir = self.table_path(table)
+        stats = {"inserted": 0, "updated": 0, "unchanged": 0}
+
+        for (year, month), part in df_new.groupby([dates.dt.year, dates.dt.month], sort=True):
+            part_dir = os.path.join(table_dir, f"year={int(year):04d}", f"month={int(month):02d}")
+            os.makedirs(part_dir, exist_ok=True)
+            fragments = self._fragments(part_dir)
+
+            overlaps = False
+            if fragments:
+                existing_dates = pd.concat(
+                    [pd.read_parquet(f, columns=[self.date_column])[self.date_column] for f in fragments]
+                )
+                overlaps = bool(pd.to_datetime(existing_dates).isin(part[self.date_column]).any())
+
+            if overlaps or len(fragments) + 1 > self.max_fragments_per_partition:
+                part_stats = self._compact_partition(part_dir, fragments, part)
+            else:
+                self._write_fragment(part_dir, part)
+                part_stats = {"inserted": len(part), "updated": 0, "unchanged": 0}
+            for name, count in part_stats.items():
+                stats[name] += count
+        return stats
+
+    def _compact_partition(self, part_dir: str, fragments: List[str], part: pd.DataFrame) -> Dict[str, int]:
+        """Reescribe una partición como un único fragmento ordenado y sin fechas repetidas."""
+        existing = pd.concat([pd.read_parquet(f) for f in fragments], ignore_index=True) if fragments else pd.DataFrame()
+        merged, stats = sorted_merge(existing, part, self.date_column)
+        if stats["inserted"] + stats["updated"] == 0 and len(fragments) <= self.max_fragments_per_partition:
+            # Re-envío idéntico (ej. ventana de backfill sin correcciones): la partición queda intacta
+            return stats
+
+        self._write_fragment(part_dir, merged)
+        for fragment in fragments:
+            os.remove(fragment)
+        logger.info(f"Partición compactada: {part_dir} ({len(fragments)} fragmentos -> 1, {len(merged)} filas).")
+        return stats
+
+    def _write_table_file(self, table: str, df: pd.DataFrame) -> None:
+        """
+        Reescribe el Parquet de la tabla (layout `file`) de forma atómica: archivo temporal oculto en el mismo
+        directorio + `os.replace`. Un fallo a mitad de escritura deja intacta la versión anterior (y el staging,
+        que solo se descarta después del merge); el sidecar de watermark se escribe después del reemplazo.
+        """
+        path = self.table_path(table)
+        tmp_path = os.path.join(os.path.dirname(path), f".{os.path.basename(path)}.tmp")
+        try:
+            df.to_parquet(tmp_path, index=False, engine="pyarrow")
+            os.replace(tmp_path, path)
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+
+    def _write_fragment(self, part_dir: str, df: pd.DataFrame) -> str:
+        """
+        Escribe un fragmento de forma atómica: archivo temporal oculto (ignorado por pyarrow) + `os.replace`.
+        El nombre incluye un timestamp para que el orden lexicográfico sea el orden de escritura.
+        """
+        stamp = datetime.datetime.now().strftime("%Y%m%dT%H%M%S%f")
+        name = f"part-{stamp}-{uuid.uuid4().hex[:8]}.parquet"
+        tmp_path = os.path.join(part_dir, f".{name}.tmp")
+        final_path = os.path.join(part_dir, name)
+        pq.write_table(pa.Table.from_pandas(df, preserve_index=False), tmp_path)
+        os.replace(tmp_path, final_path)
+        return final_path
+
+    def _dataset(self, table_dir: str) -> ds.Dataset:
+        """
+        Dataset pyarrow de la tabla sobre la lista explícita de fragmentos (orden de escritura).
+        El esquema se unifica entre fragmentos (ej. int64 -> double cuando un delta trae nulos); las
+        columnas de partición year/month no se materializan porque ya viven en la columna de fecha.
+        """
+        fragments = self._fragments(table_dir)
+        schemas = [pq.read_schema(f) for f in fragments]
+        schema = pa.unify_schemas(schemas, promote_options="permissive")
+        return ds.dataset(fragments, format="parquet", schema=schema)
+
+    def _table_dataset(self, table: str) -> Optional[ds.Dataset]:
+        """Dataset pyarrow de la tabla en el layout activo; None si no hay datos."""
+        if self.layout == "file":
+            path = self.table_path(table)
+            return ds.dataset(path, format="parquet") if os.path.exists(path) else None
+        table_dir = self.table_path(table)
+        return self._dataset(table_dir) if self._fragments(table_dir) else None
+
+    def _present_columns(self, schema: pa.Schema, columns: List[str]) -> List[str]:
+        """Intersección de la proyección con el esquema físico; la fecha se conserva para deduplicar."""
+        wanted = list(columns)
+        if self.date_column not in wanted:
+            wanted.insert(0, self.date_column)
+        return [col for col in wanted if col in schema.names]
+
+    def _since_filter(self, schema: pa.Schema, since: Optional[pd.Timestamp]) -> Optional[List[Tuple[str, str, Any]]]:
+        """Filtro `fecha >= since` para pyarrow si la columna de fecha es timestamp; None si no aplica."""
+        if since is None or self.date_column not in schema.names:
+            return None
+        if not pa.types.is_timestamp(schema.field(self.date_column).type):
+            return None
+        return [(self.date_column, ">=", pd.Timestamp(since))]
+
+    @staticmethod
+    def _fragments(directory: str) -> List[str]:
+        """Fragmentos Parquet visibles bajo un directorio, ordenados por partición y luego por escritura."""
+        if not os.path.isdir(directory):
+            return []
+        pattern = os.path.join(directory, "**", "part-*.parquet")
+        return sorted(glob.glob(pattern, recursive=True))
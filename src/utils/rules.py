@@ -0,0 +1,355 @@
+import ast
+import logging
+import numpy as np
+import pandas as pd
+from typing import Any, Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Reglas de negocio históricas de DataAuditor (Puntos 15 al 23). Se usan cuando config.yaml no
+# declara `extractions.business_rules`; config.yaml las replica de forma explícita.
+DEFAULT_BUSINESS_RULES = {
+    "ventas": {
+        "non_negative": "numeric",
+        "rules": [
+            {
+                "id": "punto_15",
+                "check": "implies(es_promocion == 1, unidades_pagas == unidades_bonificadas)",
+                "message": "Punto 15: {count} filas donde pagas != bonificadas en promoción."
+            },
+            {
+                "id": "punto_17",
+                "check": "implies(es_promocion == 1, unidades_bonificadas > 0) and implies(es_promocion == 0, unidades_bonificadas <= 0)",
+                "message": "Punto 17: {count} inconsistencias entre 'es_promocion' y 'unidades_bonificadas'."
+            },
+            {
+                "id": "punto_16",
+                "check": "unidades_totales == unidades_pagas + unidades_bonificadas",
+                "message": "Punto 16: {count} filas donde la suma de unidades no coincide con el total."
+            }
+        ]
+    },
+    "inventario": {
+        "non_negative": "numeric",
+        "rules": [
+            {
+                "id": "punto_21",
+                "check": "ventas_reales_totales == ventas_reales_pagas + ventas_reales_bonificadas",
+                "message": "Punto 21: {count} inconsistencias en suma de ventas reales."
+            },
+            {
+                "id": "punto_22",
+                "check": "buñuelos_desperdiciados == buñuelos_preparados - ventas_reales_totales",
+                "message": "Punto 22: {count} inconsistencias en cálculo de desperdicio."
+            },
+            {
+                "id": "punto_23",
+                "check": "unidades_agotadas == demanda_teorica_total - buñuelos_preparados",
+                "message": "Punto 23: {count} inconsistencias en cálculo de unidades agotadas."
+            }
+        ]
+    }
+}
+
+NON_NEGATIVE_MESSAGE = "Columna '{column}': {count} valores negativos detectados."
+SAMPLE_SIZE = 5
+
+# Representación intermedia (tuplas hashables): ("col", nombre), ("const", valor), ("arith", op, a, b),
+# ("neg", a), ("abs", a), ("cmp", op, a, b), ("and", (..)), ("or", (..)), ("not", a), ("implies", a, b),
+# ("isin", a, ("const", valores), negado), ("where", condición, a, b), ("month", a), ("year", a)
+ARITHMETIC = {ast.Add: "+", ast.Sub: "-", ast.Mult: "*", ast.Div: "/"}
+COMPARISONS = {ast.Eq: "==", ast.NotEq: "!=", ast.Lt: "<", ast.LtE: "<=", ast.Gt: ">", ast.GtE: ">="}
+NEGATED = {"==": "!=", "!=": "==", "<": ">=", "<=": ">", ">": "<=", ">=": "<"}
+BOOLEAN_NODES = ("cmp", "and", "or", "not", "implies", "isin")
+
+
+def parse_expression(expression: str) -> Tuple:
+    """
+    Compila una expresión de regla a la representación intermedia. Gramática (subconjunto de Python):
+    columnas del contrato, constantes, `+ - * /`, `abs()`, comparaciones, `and`/`or`/`not`,
+    `implies(condición, consecuencia)` e `isin(columna, [valores])`. Cualquier otra construcción (atributos, llamadas, índices...)
+    se rechaza: la expresión nunca se ejecuta con eval.
+    """
+    try:
+        tree = ast.parse(expression, mode="eval")
+    except SyntaxError as e:
+        raise ValueError(f"Expresión de regla inválida '{expression}': {e.msg}") from None
+    ir = _to_ir(tree.body, expression)
+    if ir[0] not in BOOLEAN_NODES:
+        raise ValueError(f"La regla '{expression}' debe ser una condición (comparación u operador lógico)")
+    return ir
+
+
+def parse_value(expression: str) -> Tuple:
+    """
+    Compila una expresión de valor (columna derivada) a la representación intermedia. Misma gramática que
+    `parse_expression` más `where(condición, a, b)`, `month(fecha)` y `year(fecha)`; el resultado puede
+    ser numérico o una condición.
+    """
+    try:
+        tree = ast.parse(str(expression), mode="eval")
+    except SyntaxError as e:
+        raise ValueError(f"Expresión inválida '{expression}': {e.msg}") from None
+    return _to_ir(tree.body, str(expression))
+
+
+def _to_ir(node: ast.AST, expression: str) -> Tuple:
+    if isinstance(node, ast.Name):
+        return ("col", node.id)
+    if isinstance(node, ast.Constant) and isinstance(node.value, (int, float, str, bool)):
+        return ("const", node.value)
+    if isinstance(node, ast.BinOp) and type(node.op) in ARITHMETIC:
+        return ("arith", ARITHMETIC[type(node.op)], _to_ir(node.left, expression), _to_ir(node.right, expression))
+    if isinstance(node, ast.UnaryOp) and isinstance(node.op, ast.USub):
+        return ("neg", _to_ir(node.operand, expression))
+    if isinstance(node, ast.UnaryOp) and isinstance(node.op, ast.Not):
+        return ("not", _boolean(node.operand, expression))
+    if isinstance(node, ast.Compare):
+        # a < b <= c equivale a (a < b) and (b <= c)
+        operands = [node.left] + node.comparators
+        pairs = []
+        for op, left, right in zip(node.ops, operands[:-1], operands[1:]):
+            if type(op) not in COMPARISONS:
+                raise ValueError(f"Comparador no soportado en '{expression}'")
+            pairs.append(("cmp", COMPARISONS[type(op)], _to_ir(left, expression), _to_ir(right, expression)))
+        return pairs[0] if len(pairs) == 1 else ("and", tuple(pairs))
+    if isinstance(node, ast.BoolOp):
+        kind = "and" if isinstance(node.op, ast.And) else "or"
+        return (kind, tuple(_boolean(value, expression) for value in node.values))
+    if isinstance(node, ast.Call) and isinstance(node.func, ast.Name) and not node.keywords:
+        if node.func.id == "implies" and len(node.args) == 2:
+            return ("implies", _boolean(node.args[0], expression), _boolean(node.args[1], expression))
+        if node.func.id == "abs" and len(node.args) == 1:
+            return ("abs", _to_ir(node.args[0], expression))
+        if node.func.id == "isin" and len(node.args) == 2 and isinstance(node.args[1], (ast.List, ast.Tuple)) \
+                and all(isinstance(v, ast.Constant) for v in node.args[1].elts):
+            return ("isin", _to_ir(node.args[0], expression), ("const", tuple(v.value for v in node.args[1].elts)), False)
+        if node.func.id == "where" and len(node.args) == 3:
+            return ("where", _boolean(node.args[0], expression),
+                    _to_ir(node.args[1], expression), _to_ir(node.args[2], expression))
+        if node.func.id in ("month", "year") and len(node.args) == 1:
+            return (node.func.id, _to_ir(node.args[0], expression))
+    raise ValueError(f"Construcción no soportada en la regla '{expression}': {ast.dump(node)}")
+
+
+def _boolean(node: ast.AST, expression: str) -> Tuple:
+    ir = _to_ir(node, expression)
+    if ir[0] not in BOOLEAN_NODES:
+        raise ValueError(f"Se esperaba una condición en '{expression}'")
+    return ir
+
+
+def negate(ir: Tuple) -> Tuple:
+    """
+    Negación empujada hasta las comparaciones (De Morgan). `not (a > 0)` se evalúa como `a <= 0`, así
+    un NaN nunca cuenta como violación de una desigualdad, igual que las máscaras de pandas originales.
+    """
+    kind = ir[0]
+    if kind == "cmp":
+        return ("cmp", NEGATED[ir[1]], ir[2], ir[3])
+    if kind == "and":
+        return ("or", tuple(negate(part) for part in ir[1]))
+    if kind == "or":
+        return ("and", tuple(negate(part) for part in ir[1]))
+    if kind == "not":
+        return ir[1]
+    if kind == "implies":
+        return ("and", (ir[1], negate(ir[2])))
+    if kind == "isin":
+        return ("isin", ir[1], ir[2], not ir[3])
+    raise ValueError(f"No se puede negar el nodo '{kind}'")
+
+
+def referenced_columns(ir: Tuple) -> List[str]:
+    """Columnas que lee la expresión, en orden de aparición."""
+    kind = ir[0]
+    if kind == "col":
+        return [ir[1]]
+    if kind == "const":
+        return []
+    children = ir[1] if kind in ("and", "or") else [part for part in ir[1:] if isinstance(part, tuple)]
+    columns = []
+    for child in children:
+        columns += [col for col in referenced_columns(child) if col not in columns]
+    return columns
+
+
+class BusinessRule:
+    """Regla compilada: la máscara de violación es la negación de `check` sobre las columnas de la tabla."""
+
+    def __init__(self, rule_id: str, check: str, message: Optional[str] = None):
+        self.id = rule_id
+        self.check = check
+        self.message = message or f"Regla '{rule_id}': {{count}} filas incumplen '{check}'."
+        self.violation = negate(parse_expression(check))
+        self.columns = referenced_columns(self.violation)
+
+    def render(self, count: int) -> str:
+        return self.message.format(count=count)
+
+
+class RuleSet:
+    """
+    Reglas de negocio de una tabla compiladas una sola vez (`extractions.business_rules`).
+
+    `evaluate` materializa cada columna referenciada una sola vez y evalúa todas las máscaras de
+    violación en una pasada vectorizada con NumPy; las subexpresiones compartidas entre reglas
+    (ej. `es_promocion == 1`) se calculan una vez por tabla. Una regla cuyas columnas no están en el
+    DataFrame se omite (como las validaciones originales).
+    """
+
+    def __init__(self, rules: List[BusinessRule], date_column: str = "fecha"):
+        self.rules = rules
+        self.date_column = date_column
+
+    @classmethod
+    def from_config(cls, table_config: Dict[str, Any], schema: Dict[str, str],
+                    date_column: str = "fecha") -> "RuleSet":
+        rules = []
+        non_negative = table_config.get("non_negative", [])
+        if non_negative == "numeric":
+            non_negative = [col for col, col_type in schema.items() if col_type in ["int", "float"]]
+        for col in non_negative:
+            rule = BusinessRule(f"negativos:{col}", f"{col} >= 0")
+            rule.message = NON_NEGATIVE_MESSAGE.format(column=col, count="{count}")
+            rules.append(rule)
+
+        seen = {rule.id for rule in rules}
+        for spec in table_config.get("rules", []):
+            if spec["id"] in seen:
+                raise ValueError(f"Regla de negocio duplicada: '{spec['id']}'")
+            seen.add(spec["id"])
+            rules.append(BusinessRule(spec["id"], spec["check"], spec.get("message")))
+        return cls(rules, date_column)
+
+    @property
+    def expression_columns(self) -> List[str]:
+        """Columnas leídas por las reglas explícitas (la no-negatividad se omite si la columna no viaja)."""
+        columns = []
+        for rule in self.rules:
+            if not rule.id.startswith("negativos:"):
+                columns += [col for col in rule.columns if col not in columns]
+        return columns
+
+    def evaluate(self, df: pd.DataFrame) -> Dict[str, Dict[str, Any]]:
+        """Filas que violan cada regla evaluable y una muestra de sus fechas, en el orden configurado."""
+        applicable = [rule for rule in self.rules if all(col in df.columns for col in rule.columns)]
+        if not applicable:
+            return {}
+
+        columns = {}
+        for rule in applicable:
+            for col in rule.columns:
+                if col not in columns:
+                    columns[col] = self._materialize(df[col])
+
+        cache = {}
+        results = {}
+        with np.errstate(invalid="ignore", divide="ignore"):
+            for rule in applicable:
+                mask = np.broadcast_to(self._eval(rule.violation, columns, cache), (len(df),))
+                count = int(np.count_nonzero(mask))
+                results[rule.id] = {
+                    "count": count,
+                    "sample_dates": self._sample_dates(df, _first_positions(mask, SAMPLE_SIZE)) if count else []
+                }
+        return results
+
+    @staticmethod
+    def _materialize(series: pd.Series) -> np.ndarray:
+        """Arreglo NumPy de la columna; los dtypes nullable de pandas pasan a float64 con NaN."""
+        if isinstance(series.dtype, np.dtype):
+            return series.to_numpy()
+        if pd.api.types.is_numeric_dtype(series):
+            return series.to_numpy(dtype="float64", na_value=np.nan)
+        return series.to_numpy()
+
+    def _sample_dates(self, df: pd.DataFrame, positions: np.ndarray) -> List[str]:
+        """Fechas de las primeras filas infractoras; solo se convierten esas filas, no la columna entera."""
+        if self.date_column not in df.columns or not len(positions):
+            return []
+        dates = pd.to_datetime(df[self.date_column].iloc[positions], errors="coerce")
+        return [d.strftime('%Y-%m-%d') for d in dates.dropna()]
+
+    def _eval(self, ir: Tuple, columns: Dict[str, np.ndarray], cache: Dict[Tuple, Any]) -> Any:
+        return evaluate(ir, columns, cache)
+
+
+def materialize(series: pd.Series) -> np.ndarray:
+    """Arreglo NumPy de la columna; los dtypes nullable de pandas pasan a float64 con NaN."""
+    return RuleSet._materialize(series)
+
+
+def evaluate(ir: Tuple, columns: Dict[str, np.ndarray], cache: Dict[Tuple, Any]) -> Any:
+    """
+    Evalúa la representación intermedia sobre columnas NumPy ya materializadas. `cache` guarda cada
+    subexpresión evaluada, así las compartidas entre reglas o pasos se calculan una sola vez.
+    """
+    if ir in cache:
+        return cache[ir]
+    kind = ir[0]
+    if kind == "col":
+        value = columns[ir[1]]
+    elif kind == "const":
+        value = ir[1]
+    elif kind == "arith":
+        left, right = evaluate(ir[2], columns, cache), evaluate(ir[3], columns, cache)
+        value = {"+": np.add, "-": np.subtract, "*": np.multiply, "/": np.true_divide}[ir[1]](left, right)
+    elif kind == "neg":
+        value = np.negative(evaluate(ir[1], columns, cache))
+    elif kind == "abs":
+        value = np.abs(evaluate(ir[1], columns, cache))
+    elif kind == "cmp":
+        left, right = evaluate(ir[2], columns, cache), evaluate(ir[3], columns, cache)
+        value = {
+            "==": np.equal, "!=": np.not_equal, "<": np.less,
+            "<=": np.less_equal, ">": np.greater, ">=": np.greater_equal
+        }[ir[1]](left, right)
+    elif kind == "and":
+        value = np.logical_and.reduce([evaluate(part, columns, cache) for part in ir[1]])
+    elif kind == "or":
+        value = np.logical_or.reduce([evaluate(part, columns, cache) for part in ir[1]])
+    elif kind == "not":
+        value = evaluate(negate(ir[1]), columns, cache)
+    elif kind == "isin":
+        value = np.isin(evaluate(ir[1], columns, cache), list(ir[2][1]), invert=ir[3])
+    elif kind == "where":
+        value = np.where(evaluate(ir[1], columns, cache),
+                         evaluate(ir[2], columns, cache), evaluate(ir[3], columns, cache))
+    elif kind in ("month", "year"):
+        dates = np.asarray(evaluate(ir[1], columns, cache)).astype("datetime64[ns]")
+        if kind == "month":
+            parts = dates.astype("datetime64[M]").astype("int64") % 12 + 1
+        else:
+            parts = dates.astype("datetime64[Y]").astype("int64") + 1970
+        # NaT -> NaN, igual que .dt.month / .dt.year
+        value = np.where(np.isnat(dates), np.nan, parts) if np.isnat(dates).any() else parts
+    else:
+        # implies(a, b) como condición afirmativa: not a or b
+        value = evaluate(("or", (negate(ir[1]), ir[2])), columns, cache)
+    cache[ir] = value
+    return value
+
+
+def _first_positions(mask: np.ndarray, size: int, block: int = 65536) -> np.ndarray:
+    """Posiciones de las primeras `size` filas en True, recorriendo por bloques en vez de la máscara entera."""
+    for start in range(0, len(mask), block):
+        positions = np.flatnonzero(mask[start:start + block])
+        if len(positions):
+            found = positions[:size] + start
+            if len(found) == size or start + block >= len(mask):
+                return found
+            return np.flatnonzero(mask[start:])[:size] + start
+    return np.array([], dtype=np.intp)
+
+
+def compile_business_rules(config: Dict[str, Any]) -> Dict[str, RuleSet]:
+    """RuleSet por tabla desde `extractions.business_rules` (o las reglas históricas si no está declarado)."""
+    extraction_config = config.get("extractions", {})
+    schemas = extraction_config.get("schemas", {})
+    date_column = config.get("preprocessing", {}).get("date_column", "fecha")
+    rules_config = extraction_config.get("business_rules", DEFAULT_BUSINESS_RULES)
+    return {
+        table: RuleSet.from_config(table_config or {}, schemas.get(table, {}), date_column)
+        for table, table_config in rules_config.items()
+    }
@@ -0,0 +1,231 @@
+import base64
+import numpy as np
+import pandas as pd
+from typing import Any, Dict, Tuple
+
+# Filas por bloque al alimentar un sketch: la memoria de trabajo no depende del tamaño de la columna
+CHUNK_ROWS = 65536
+
+
+class KLLSketch:
+    """
+    Sketch de cuantiles KLL (Karnin, Lang y Liberty, 2016) sobre NumPy.
+
+    Los valores viven en niveles; un ítem del nivel h representa 2^h filas. Cuando el sketch supera su
+    capacidad total (k en el nivel superior, decreciendo en factor 2/3 hacia abajo, mínimo 8), el
+    nivel más bajo desbordado se ordena y la mitad de sus ítems (pares o impares, al azar) sube al
+    nivel siguiente.
+
+    - Memoria: O(k) ítems (≈ 3k + 8·niveles), independiente del número de filas.
+    - Error: rango normalizado ≈ 1.65% con k=200 (99% de confianza, decrece como 1/k). Mientras
+      n no supera la capacidad del nivel 0 no hay compactaciones y los cuantiles son exactos.
+    - Fusionable: la unión de dos sketches conserva la misma cota.
+
+    La moneda de cada compactación se deriva de (n, nivel), así el sketch es determinista para
+    los mismos datos.
+    """
+
+    MIN_CAPACITY = 8
+
+    def __init__(self, k: int = 200):
+        self.k = k
+        self.n = 0
+        self.levels = [np.array([], dtype="float64")]
+
+    def update(self, values: np.ndarray) -> None:
+        for start in range(0, len(values), CHUNK_ROWS):
+            chunk = np.asarray(values[start:start + CHUNK_ROWS], dtype="float64")
+            self.levels[0] = np.concatenate([self.levels[0], chunk])
+            self.n += len(chunk)
+            self._compress()
+
+    def merge(self, other: "KLLSketch") -> "KLLSketch":
+        if self.k != other.k:
+            raise ValueError(f"No se pueden fusionar sketches KLL con k distinto ({self.k} y {other.k})")
+        merged = KLLSketch(self.k)
+        depth = max(len(self.levels), len(other.levels))
+        merged.levels = [
+            np.concatenate([
+                self.levels[h] if h < len(self.levels) else np.array([]),
+                other.levels[h] if h < len(other.levels) else np.array([])
+            ])
+            for h in range(depth)
+        ]
+        merged.n = self.n + other.n
+        merged._compress()
+        return merged
+
+    def sorted_view(self) -> Tuple[np.ndarray, np.ndarray]:
+        """Ítems ordenados y su peso (filas que representa cada uno): una distribución aproximada."""
+        items = np.concatenate(self.levels)
+        weights = np.concatenate([np.full(len(level), 2 ** h, dtype="int64") for h, level in enumerate(self.levels)])
+        order = np.argsort(items, kind="stable")
+        return items[order], weights[order]
+
+    def _capacity(self, level: int) -> int:
+        depth = len(self.levels)
+        return max(self.MIN_CAPACITY, int(np.ceil(self.k * (2 / 3) ** (depth - level - 1))))
+
+    def _compress(self) -> None:
+        # Compactación perezosa: solo mientras el total supere la capacidad total, y siempre el nivel
+        # más bajo desbordado (así se retienen ~3k ítems y el error efectivo es menor)
+        while sum(len(level) for level in self.levels) > sum(self._capacity(h) for h in range(len(self.levels))):
+            level = next(h for h in range(len(self.levels)) if len(self.levels[h]) > self._capacity(h))
+            if level + 1 == len(self.levels):
+                self.levels.append(np.array([], dtype="float64"))
+            items = np.sort(self.levels[level])
+            # Con un número impar de ítems el primero se queda en el nivel
+            keep = items[:len(items) % 2]
+            pairs = items[len(keep):]
+            offset = int(np.random.default_rng([self.n, level]).integers(2))
+            self.levels[level + 1] = np.concatenate([self.levels[level + 1], pairs[offset::2]])
+            self.levels[level] = keep
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {"k": self.k, "n": int(self.n), "levels": [level.tolist() for level in self.levels]}
+
+    @classmethod
+    def from_dict(cls, payload: Dict[str, Any]) -> "KLLSketch":
+        sketch = cls(payload["k"])
+        sketch.n = payload["n"]
+        sketch.levels = [np.array(level, dtype="float64") for level in payload["levels"]]
+        return sketch
+
+
+class HyperLogLog:
+    """
+    Conteo aproximado de valores distintos (Flajolet et al., 2007) con hash de 64 bits de pandas.
+
+    - Memoria: 2^p registros de un byte (p=12: 4 KB).
+    - Error relativo estándar: 1.04 / sqrt(2^p) (p=12: ≈1.6%). Para cardinalidades bajas se usa
+      linear counting, prácticamente exacto.
+    - Fusionable: máximo registro a registro.
+    """
+
+    def __init__(self, precision: int = 12):
+        if not 4 <= precision <= 16:
+            raise ValueError(f"Precisión de HyperLogLog fuera de rango [4, 16]: {precision}")
+        self.precision = precision
+        self.registers = np.zeros(1 << precision, dtype="uint8")
+
+    @property
+    def relative_error(self) -> float:
+        return 1.04 / np.sqrt(len(self.registers))
+
+    def update(self, values: np.ndarray) -> None:
+        """Agrega valores (no nulos). Repetidos no cambian los registros: basta con pasar los distintos."""
+        if len(values) == 0:
+            return
+        hashes = pd.util.hash_array(np.asarray(values))
+        p = self.precision
+        buckets = (hashes >> np.uint64(64 - p)).astype("int64")
+        remainder = hashes & np.uint64((1 << (64 - p)) - 1)
+        ranks = (64 - p) - _bit_length(remainder) + 1
+        np.maximum.at(self.registers, buckets, ranks.astype("uint8"))
+
+    def estimate(self) -> float:
+        m = len(self.registers)
+        alpha = 0.7213 / (1 + 1.079 / m)
+        raw = alpha * m * m / float(np.sum(np.ldexp(1.0, -self.registers.astype("int64"))))
+        zeros = int(np.count_nonzero(self.registers == 0))
+        if raw <= 2.5 * m and zeros:
+            return m * np.log(m / zeros)
+        return raw
+
+    def merge(self, other: "HyperLogLog") -> "HyperLogLog":
+        if self.precision != other.precision:
+            raise ValueError("No se pueden fusionar HyperLogLog con precisión distinta")
+        merged = HyperLogLog(self.precision)
+        merged.registers = np.maximum(self.registers, other.registers)
+        return merged
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {"precision": self.precision, "registers": base64.b64encode(self.registers.tobytes()).decode("ascii")}
+
+    @classmethod
+    def from_dict(cls, payload: Dict[str, Any]) -> "HyperLogLog":
+        sketch = cls(payload["precision"])
+        sketch.registers = np.frombuffer(base64.b64decode(payload["registers"]), dtype="uint8").copy()
+        return sketch
+
+
+class HeavyHitters:
+    """
+    Valores más frecuentes con un resumen SpaceSaving fusionable (Metwally et al., 2005; Agarwal
+    et al., 2012).
+
+    Guarda a lo sumo `capacity` valores con un conteo estimado y su sobreestimación máxima. Un valor
+    ausente del resumen tiene a lo sumo `floor` filas; al fusionar, el conteo de un valor ausente en
+    un lado se toma como el `floor` de ese lado y se conservan los `capacity` mayores.
+
+    - Memoria: O(capacity) valores.
+    - Error: real ∈ [estimado - error, estimado] por valor; `max_error` (<= n/capacity) acota todo el
+      top-k. Mientras no se descarta ningún valor (`floor == 0`) los conteos son exactos.
+
+    Los valores conservan el orden de primera aparición (el mismo desempate de `value_counts`).
+    """
+
+    def __init__(self, capacity: int = 64):
+        self.capacity = capacity
+        self.items = np.array([], dtype=object)
+        self.counts = np.array([], dtype="int64")
+        self.errors = np.array([], dtype="int64")
+        self.floor = 0
+
+    @property
+    def max_error(self) -> int:
+        return int(self.errors.max()) if len(self.errors) else 0
+
+    def update(self, items: np.ndarray, counts: np.ndarray) -> None:
+        """Agrega frecuencias exactas ya agregadas por valor (ej. `pd.factorize` + `np.bincount` de un bloque)."""
+        other = HeavyHitters(self.capacity)
+        other.items, other.counts = np.asarray(items, dtype=object), np.asarray(counts, dtype="int64")
+        other.errors = np.zeros(len(other.items), dtype="int64")
+        merged = self.merge(other)
+        self.items, self.counts, self.errors, self.floor = merged.items, merged.counts, merged.errors, merged.floor
+
+    def merge(self, other: "HeavyHitters") -> "HeavyHitters":
+        positions = pd.Index(self.items).get_indexer(other.items) if len(self.items) else np.full(len(other.items), -1)
+        found, new = positions >= 0, positions < 0
+        # Valores del lado izquierdo: su conteo más el de `other` (o su floor si no lo tiene)
+        counts = self.counts + other.floor
+        errors = self.errors + other.floor
+        counts[positions[found]] += other.counts[found] - other.floor
+        errors[positions[found]] += other.errors[found] - other.floor
+        merged = HeavyHitters(self.capacity)
+        merged.items = np.concatenate([self.items, other.items[new]]).astype(object)
+        merged.counts = np.concatenate([counts, other.counts[new] + self.floor]).astype("int64")
+        merged.errors = np.concatenate([errors, other.errors[new] + self.floor]).astype("int64")
+        merged.floor = self.floor + other.floor
+        if len(merged.items) > self.capacity:
+            # Los `capacity` mayores; a igual conteo gana el de primera aparición
+            order = np.argsort(-merged.counts, kind="stable")
+            keep = np.sort(order[:self.capacity])
+            merged.floor = max(merged.floor, int(merged.counts[order[self.capacity]]))
+            merged.items, merged.counts, merged.errors = merged.items[keep], merged.counts[keep], merged.errors[keep]
+        return merged
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "capacity": self.capacity,
+            "items": self.items.tolist(),
+            "counts": self.counts.tolist(),
+            "errors": self.errors.tolist(),
+            "floor": int(self.floor)
+        }
+
+    @classmethod
+    def from_dict(cls, payload: Dict[str, Any]) -> "HeavyHitters":
+        sketch = cls(payload["capacity"])
+        sketch.items = np.array(payload["items"], dtype=object)
+        sketch.counts = np.array(payload["counts"], dtype="int64")
+        sketch.errors = np.array(payload["errors"], dtype="int64")
+        sketch.floor = payload["floor"]
+        return sketch
+
+
+def _bit_length(values: np.ndarray) -> np.ndarray:
+    """Bits significativos de enteros sin signo de 64 bits (frexp sobre mitades de 32 bits, exactas en float64)."""
+    high = (values >> np.uint64(32)).astype("float64")
+    low = (values & np.uint64(0xFFFFFFFF)).astype("float64")
+    return np.where(high > 0, np.frexp(high)[1] + 32, np.frexp(low)[1])
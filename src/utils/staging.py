@@ -0,0 +1,127 @@
+import os
+import json
+import shutil
+import logging
+import datetime
+import pyarrow as pa
+import pyarrow.parquet as pq
+from typing import Any, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+CHECKPOINT_FILE = "_checkpoint.json"
+
+
+def _write_json_atomic(path: str, payload: Dict[str, Any]) -> None:
+    """Escribe un JSON mediante archivo temporal + `os.replace` (nunca queda un checkpoint a medias)."""
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(payload, f, indent=4, ensure_ascii=False)
+    os.replace(tmp_path, path)
+
+
+def _read_json(path: str) -> Optional[Dict[str, Any]]:
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+class StagedRange:
+    """
+    Checkpoint de un rango de descarga (la tabla completa o un shard): páginas ya decodificadas
+    persistidas como `page-NNNNNN.parquet` y el cursor de paginación confirmado tras la última página.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        os.makedirs(self.path, exist_ok=True)
+        self.state = _read_json(os.path.join(self.path, CHECKPOINT_FILE)) or {"pages": 0, "rows": 0, "done": False}
+
+    @property
+    def resumed(self) -> bool:
+        return self.state["pages"] > 0 or self.state["done"]
+
+    def load_pages(self) -> List[pa.Table]:
+        """Páginas confirmadas en orden de descarga (solo las registradas en el checkpoint)."""
+        return [pq.read_table(self._page_path(i)) for i in range(self.state["pages"])]
+
+    def commit(self, page: Optional[pa.Table], **cursor: Any) -> None:
+        """
+        Confirma una página: primero se escribe el Parquet (atómico) y después el checkpoint con el
+        nuevo cursor. Una caída entre ambos pasos deja a lo sumo una página huérfana que se sobrescribe.
+        """
+        if page is not None and page.num_rows > 0:
+            page_path = self._page_path(self.state["pages"])
+            pq.write_table(page, f"{page_path}.tmp")
+            os.replace(f"{page_path}.tmp", page_path)
+            self.state["pages"] += 1
+            self.state["rows"] += page.num_rows
+        self.state.update(cursor)
+        self.state["updated_at"] = datetime.datetime.now().isoformat()
+        _write_json_atomic(os.path.join(self.path, CHECKPOINT_FILE), self.state)
+
+    def complete(self) -> None:
+        """Marca el rango como descargado por completo (un reintento no vuelve a consultarlo)."""
+        self.commit(None, done=True)
+
+    def _page_path(self, index: int) -> str:
+        return os.path.join(self.path, f"page-{index:06d}.parquet")
+
+
+class TableStaging:
+    """
+    Staging de la extracción en curso de una tabla (`{raw}/_staging/{table}/`).
+
+    El checkpoint de la tabla guarda la firma de la extracción (watermark de partida, modo y tamaño de
+    página, proyección) y, en extracciones por shards, el plan de rangos. Si al reintentar la firma no
+    coincide (ej. el watermark avanzó), el staging anterior se descarta y la extracción empieza de cero.
+    """
+
+    def __init__(self, path: str, signature: Dict[str, Any]):
+        self.path = path
+        self.checkpoint_path = os.path.join(self.path, CHECKPOINT_FILE)
+        previous = _read_json(self.checkpoint_path)
+        if previous is not None and previous.get("signature") != signature:
+            logger.info(f"Staging de '{os.path.basename(path)}' con firma distinta. Se descarta.")
+            shutil.rmtree(self.path, ignore_errors=True)
+            previous = None
+
+        os.makedirs(self.path, exist_ok=True)
+        self.manifest = previous or {"signature": signature, "shards": None}
+        self.resumed = previous is not None
+        if not self.resumed:
+            self._save()
+
+    def range(self, key: str) -> StagedRange:
+        """Checkpoint del rango `key` ("full" o "shard-NNN")."""
+        return StagedRange(os.path.join(self.path, key))
+
+    @property
+    def shards(self) -> Optional[List[List[Optional[str]]]]:
+        return self.manifest.get("shards")
+
+    @shards.setter
+    def shards(self, plan: List[List[Optional[str]]]) -> None:
+        # El plan se fija la primera vez: si la fuente crece entre reintentos, el último shard (abierto) lo cubre
+        self.manifest["shards"] = [list(shard) for shard in plan]
+        self._save()
+
+    def _save(self) -> None:
+        self.manifest["updated_at"] = datetime.datetime.now().isoformat()
+        _write_json_atomic(self.checkpoint_path, self.manifest)
+
+
+class StagingArea:
+    """Zona de staging de extracciones reanudables bajo la ruta raw (`{raw}/_staging`)."""
+
+    def __init__(self, base_path: str, staging_dir: str = "_staging"):
+        self.root = os.path.join(base_path, staging_dir)
+
+    def open(self, table: str, signature: Dict[str, Any]) -> TableStaging:
+        return TableStaging(os.path.join(self.root, table), signature)
+
+    def clear(self, table: str) -> None:
+        """Elimina el staging de una tabla una vez promovida al raw store."""
+        shutil.rmtree(os.path.join(self.root, table), ignore_errors=True)
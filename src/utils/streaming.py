@@ -0,0 +1,253 @@
+import os
+import logging
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+class MemoryBudget:
+    """
+    Techo de memoria de la limpieza por lotes (`preprocessing.streaming.memory_limit_mb`).
+
+    El tamaño de lote se deriva de una muestra de la tabla: bytes por fila en pandas (`memory_usage(deep=True)`,
+    que cuenta los strings de Python) multiplicados por `working_copies`, las copias que conviven durante la
+    limpieza de un lote (batch Arrow, DataFrame tras centinelas, corrida en Arrow, buffers del escritor Parquet). Cada lote procesado se
+    registra con `observe` para reportar el pico real frente al techo.
+    """
+
+    MIN_BATCH_ROWS = 1024
+
+    def __init__(self, limit_mb: float = 256, working_copies: int = 6, batch_rows: Optional[int] = None):
+        self.limit_bytes = int(limit_mb * 1024 * 1024)
+        self.working_copies = working_copies
+        self.fixed_rows = batch_rows
+        self.row_bytes = None
+        self.peak_bytes = 0
+
+    def batch_rows(self, sample: pd.DataFrame) -> int:
+        """Filas por lote que caben en el techo según la muestra (o `batch_rows` si está fijado en el config)."""
+        if len(sample):
+            self.row_bytes = float(sample.memory_usage(deep=True, index=False).sum()) / len(sample) + 8
+        if self.fixed_rows:
+            return int(self.fixed_rows)
+        if not self.row_bytes:
+            return self.MIN_BATCH_ROWS
+        return max(self.MIN_BATCH_ROWS, int(self.limit_bytes / (self.row_bytes * self.working_copies)))
+
+    def observe(self, df: pd.DataFrame) -> None:
+        """Registra la huella de un lote en curso; advierte (una vez) si supera el techo configurado."""
+        size = int(df.memory_usage(deep=True, index=False).sum())
+        if size > self.limit_bytes >= self.peak_bytes:
+            logger.warning(f"Lote de {len(df)} filas ({size} bytes) por encima del techo de memoria "
+                           f"({self.limit_bytes} bytes). Reduzca `batch_rows`.")
+        self.peak_bytes = max(self.peak_bytes, size)
+
+    def report(self) -> Dict[str, Any]:
+        return {
+            "memory_limit_bytes": self.limit_bytes,
+            "estimated_row_bytes": round(self.row_bytes, 1) if self.row_bytes else None,
+            "peak_batch_bytes": self.peak_bytes
+        }
+
+
+class SortedRuns:
+    """
+    Deduplicación por fecha fuera de memoria con corridas ordenadas y merge k-vías.
+
+    Cada lote se ordena por la llave (sort estable) y se escribe como una corrida en el directorio de spill,
+    con el hash de la fila completa (`ROW_HASH`). `merge` recorre las corridas en trozos y emite, en orden de
+    fecha, solo las fechas que ya no pueden aparecer en ninguna corrida pendiente (menores que el último valor
+    leído de cada corrida abierta y que la primera fecha de las que aún no se abren). Dentro de una fecha gana la última versión en orden de
+    lectura (corrida y posición), igual que `drop_duplicates(keep='last')` + `groupby(fecha).tail(1)`.
+
+    Los conteos replican los del modo en memoria: `exact_duplicates` (filas idénticas a una posterior, por
+    hash) y `duplicate_dates` (versiones distintas de una misma fecha y filas sin fecha, que el groupby descarta).
+    """
+
+    ROW_HASH = "__row_hash"
+    NULL_HASH = np.uint64(0x9E3779B97F4A7C15)  # Hash común de los nulos (el hash de 0 es 0)
+
+    def __init__(self, spill_dir: str, key: str = "fecha"):
+        self.spill_dir = spill_dir
+        self.key = key
+        self.paths: List[str] = []
+        self.bounds: List[Tuple[pd.Timestamp, pd.Timestamp]] = []
+        self.null_key_hashes: List[np.ndarray] = []
+        self.exact_duplicates = 0
+        self.duplicate_dates = 0
+
+    @staticmethod
+    def row_hashes(df: pd.DataFrame) -> np.ndarray:
+        """
+        Hash de cada fila completa, estable entre lotes: un lote con centinelas deja una columna entera en float
+        (o una de texto sin valores en float), así que las numéricas se hashean como float64 y todo nulo con el
+        mismo valor, para que filas iguales coincidan como en `drop_duplicates`.
+        """
+        combined = np.zeros(len(df), dtype=np.uint64)
+        for position in range(df.shape[1]):
+            series = df.iloc[:, position]
+            if pd.api.types.is_numeric_dtype(series.dtype) and not pd.api.types.is_bool_dtype(series.dtype):
+                series = series.astype(np.float64)
+            hashes = pd.util.hash_pandas_object(series, index=False).to_numpy()
+            hashes[series.isna().to_numpy()] = SortedRuns.NULL_HASH
+            combined = combined * np.uint64(1000003) ^ hashes
+        return combined
+
+    def add(self, df: pd.DataFrame, hashes: np.ndarray) -> None:
+        """Escribe el lote como una corrida ordenada por la llave (las filas sin fecha solo se cuentan)."""
+        valid = df[self.key].notna().to_numpy()
+        if not valid.all():
+            self.null_key_hashes.append(hashes[~valid])
+            df, hashes = df[valid], hashes[valid]
+        if df.empty:
+            return
+        # Directo a Arrow (sin copias intermedias en pandas); el sort solo si el lote no viene ordenado
+        run = pa.Table.from_pandas(df, preserve_index=False).append_column(self.ROW_HASH, pa.array(hashes))
+        keys = df[self.key]
+        if not keys.is_monotonic_increasing:
+            run = run.take(pa.array(np.argsort(keys.to_numpy(), kind="stable")))
+        path = os.path.join(self.spill_dir, f"run-{len(self.paths):06d}.parquet")
+        pq.write_table(run, path)
+        self.paths.append(path)
+        self.bounds.append((keys.min(), keys.max()))
+
+    def merge(self, chunk_rows: int) -> Iterator[pd.DataFrame]:
+        """
+        Trozos ordenados y sin fechas repetidas (última versión de cada fecha), en orden de fecha.
+        Una corrida solo se abre cuando la frontera alcanza su primera fecha, y `chunk_rows` se reparte entre
+        las corridas que se solapan a la vez: con un raw ya ordenado hay una sola abierta y cada trozo usa
+        el lote completo.
+        """
+        if self.null_key_hashes:
+            hashes = np.concatenate(self.null_key_hashes)
+            distinct = len(np.unique(hashes))
+            self.exact_duplicates += len(hashes) - distinct
+            self.duplicate_dates += distinct
+
+        chunk_rows = max(1, chunk_rows // max(1, self._max_overlap()))
+        readers = [None] * len(self.paths)
+        buffers: List[Optional[pd.DataFrame]] = [None] * len(self.paths)
+        live = [True] * len(self.paths)
+
+        def pull(i: int) -> None:
+            # Abre la corrida i si hace falta y anexa su siguiente trozo (o la marca como agotada)
+            if readers[i] is None:
+                readers[i] = pq.ParquetFile(self.paths[i]).iter_batches(batch_size=chunk_rows)
+            for batch in readers[i]:
+                if batch.num_rows:
+                    part = batch.to_pandas()
+                    buffers[i] = part if buffers[i] is None or buffers[i].empty \
+                        else pd.concat([buffers[i], part], ignore_index=True)
+                    return
+            live[i] = False
+
+        def bound(i: int) -> pd.Timestamp:
+            # Menor fecha que la corrida i todavía puede aportar más allá de lo ya leído
+            return buffers[i][self.key].iloc[-1] if readers[i] is not None else self.bounds[i][0]
+
+        while any(live) or any(buffer is not None and not buffer.empty for buffer in buffers):
+            pending = [i for i in range(len(self.paths)) if live[i]]
+            frontier = min(bound(i) for i in pending) if pending else None
+            taken = []
+            for i, buffer in enumerate(buffers):
+                if buffer is None or buffer.empty:
+                    continue
+                cut = len(buffer) if frontier is None else int(np.searchsorted(
+                    buffer[self.key].to_numpy(dtype="datetime64[ns]"), np.datetime64(frontier, "ns"), side="left"))
+                if cut:
+                    taken.append(buffer.iloc[:cut])
+                    buffers[i] = buffer.iloc[cut:].reset_index(drop=True)
+            if not taken:
+                # La fecha de la frontera puede continuar en el siguiente trozo de esas corridas (o abrir una)
+                for i in pending:
+                    if bound(i) == frontier:
+                        pull(i)
+                continue
+            for i in pending:
+                if readers[i] is not None and buffers[i].empty:
+                    pull(i)
+            yield self._dedup(pd.concat(taken, ignore_index=True))
+
+    def _max_overlap(self) -> int:
+        """Máximo de corridas cuyos rangos de fechas se solapan en un mismo punto."""
+        events = sorted([(low, 0) for low, _ in self.bounds] + [(high, 1) for _, high in self.bounds])
+        depth = overlap = 0
+        for _, is_end in events:
+            depth += -1 if is_end else 1
+            overlap = max(overlap, depth)
+        return overlap
+
+    def _dedup(self, chunk: pd.DataFrame) -> pd.DataFrame:
+        """Última versión de cada fecha de un trozo cerrado, contando duplicados exactos y de fecha."""
+        chunk = chunk.sort_values(self.key, kind="stable")
+        keys = chunk[self.key].to_numpy(dtype="datetime64[ns]").view("int64")
+        hashes = chunk[self.ROW_HASH].to_numpy()
+        last = np.ones(len(chunk), dtype=bool)
+        last[:-1] = keys[1:] != keys[:-1]
+        order = np.lexsort((hashes, keys))
+        pairs = np.ones(len(chunk), dtype=bool)
+        pairs[1:] = (keys[order][1:] != keys[order][:-1]) | (hashes[order][1:] != hashes[order][:-1])
+        self.exact_duplicates += int(len(chunk) - pairs.sum())
+        self.duplicate_dates += int(pairs.sum() - last.sum())
+        return chunk[last].drop(columns=[self.ROW_HASH]).reset_index(drop=True)
+
+
+class ChunkStats:
+    """
+    Valores de imputación que dependen de toda la tabla, acumulados trozo a trozo en la limpieza por lotes:
+    conteos de las columnas imputadas con la moda y el primer valor no nulo de cada columna en cada trozo
+    (el contexto de los bfill que cruzan trozos).
+    """
+
+    def __init__(self, mode_columns: Dict[str, Any]):
+        self.mode_defaults = dict(mode_columns)
+        self.counts: Dict[str, Dict[Any, int]] = {col: {} for col in mode_columns}
+        self.firsts: List[Dict[str, Any]] = []
+
+    def observe(self, chunk: pd.DataFrame) -> None:
+        self.count(chunk)
+        valid = chunk.notna().to_numpy()
+        present = valid.any(axis=0)
+        positions = valid.argmax(axis=0)
+        self.firsts.append({col: chunk.iat[int(positions[j]), j]
+                            for j, col in enumerate(chunk.columns) if present[j]})
+
+    def count(self, chunk: pd.DataFrame, weight: int = 1) -> None:
+        """Suma (o resta, con `weight=-1`) los valores no nulos de las columnas imputadas con la moda."""
+        for col, counts in self.counts.items():
+            if col in chunk.columns:
+                for value, count in chunk[col].value_counts().items():
+                    total = counts.get(value, 0) + weight * int(count)
+                    if total:
+                        counts[value] = total
+                    else:
+                        counts.pop(value, None)
+
+    def modes(self) -> Dict[str, Any]:
+        """Moda global por columna como `Series.mode()[0]` (el menor valor entre empates) o su valor por defecto."""
+        modes = {}
+        for col, counts in self.counts.items():
+            if not counts:
+                modes[col] = self.mode_defaults[col]
+                continue
+            top = max(counts.values())
+            candidates = [value for value, count in counts.items() if count == top]
+            try:
+                value = sorted(candidates)[0]
+            except TypeError:
+                value = candidates[0]
+            modes[col] = value.item() if hasattr(value, "item") else value
+        return modes
+
+    def lookahead(self) -> List[Dict[str, Any]]:
+        """Por trozo, el siguiente valor no nulo de cada columna en los trozos posteriores."""
+        ahead: Dict[str, Any] = {}
+        result: List[Dict[str, Any]] = [{} for _ in self.firsts]
+        for i in range(len(self.firsts) - 1, -1, -1):
+            result[i] = dict(ahead)
+            ahead.update(self.firsts[i])
+        return result
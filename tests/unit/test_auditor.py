@@ -0,0 +1,275 @@
+import pytest
+import numpy as np
+import pandas as pd
+from unittest.mock import patch
+from src.utils.auditor import DataAuditor
+
+def assert_reports_match(left, right, path="report"):
+    """Igualdad estructural de reportes; los flotantes se comparan con tolerancia (orden de suma)."""
+    if isinstance(left, dict):
+        assert isinstance(right, dict) and list(left.keys()) == list(right.keys()), path
+        for key in left:
+            assert_reports_match(left[key], right[key], f"{path}.{key}")
+    elif isinstance(left, list):
+        assert left == right, path
+    elif isinstance(left, float):
+        assert right == pytest.approx(left, rel=1e-9, nan_ok=True), path
+    else:
+        assert type(left) is type(right) and left == right, path
+
+class TestDataAuditor:
+    """
+    Suite de pruebas unitarias para DataAuditor (motores legacy y columnar).
+    """
+
+    @pytest.fixture
+    def mock_config(self):
+        return {
+            "extractions": {
+                "schemas": {
+                    "clima": {
+                        "fecha": "datetime",
+                        "temperatura_media": "float",
+                        "precipitacion_mm": "float",
+                        "tipo_lluvia": "object",
+                        "evento_macro": "object",
+                        "es_dia_lluvioso": "int",
+                        "codigo": "object"
+                    }
+                },
+                "sentinel_values": {"numeric": [-999, 9999, -1], "object": ["N/A", "NULL", ""]}
+            }
+        }
+
+    @pytest.fixture
+    def df_clima(self):
+        rng = np.random.default_rng(7)
+        n = 120
+        dates = pd.date_range("2023-01-01", periods=n, freq="D").delete([10, 11, 50])
+        df = pd.DataFrame({
+            "fecha": dates,
+            "temperatura_media": rng.normal(24, 3, len(dates)).round(1),
+            "precipitacion_mm": rng.exponential(4, len(dates)).round(2),
+            "tipo_lluvia": rng.choice(["Ninguna", "Ligera", "Fuerte", "N/A"], len(dates)),
+            "evento_macro": "Ninguno",
+            "es_dia_lluvioso": rng.integers(0, 2, len(dates)),
+            "codigo": [f"C{i}" for i in range(len(dates))],
+            "extra": rng.integers(0, 3, len(dates))
+        })
+        df.loc[[3, 7], "temperatura_media"] = np.nan
+        df.loc[[5, 9, 20], "precipitacion_mm"] = [-999.0, 9999.0, 250.0]
+        df.loc[[4, 8], "tipo_lluvia"] = None
+        # Fila repetida completa y una fecha duplicada con valores distintos
+        df = pd.concat([df, df.iloc[[30]], df.iloc[[40]].assign(temperatura_media=99.0)], ignore_index=True)
+        return df
+
+    def _auditor(self, config, engine, **audit_options):
+        config = {"extractions": {**config["extractions"], "audit": {"engine": engine, **audit_options}}}
+        with patch("src.utils.auditor.load_config", return_value=config):
+            return DataAuditor()
+
+    def test_columnar_engine_matches_legacy_report(self, mock_config, df_clima):
+        """El perfilador de una pasada reproduce integridad, calidad y perfil del auditor legacy."""
+        legacy = self._auditor(mock_config, "legacy").audit_dataframe(df_clima, "clima")
+        columnar = self._auditor(mock_config, "columnar").audit_dataframe(df_clima, "clima")
+
+        assert_reports_match(legacy, columnar)
+        assert columnar["integrity_checks"]["duplicated_rows_count"] == 1
+        assert columnar["integrity_checks"]["date_gaps_count"] == 3
+        assert set(columnar["quality_metrics"]["sentinel_counts"]) == {"precipitacion_mm", "tipo_lluvia"}
+        assert columnar["quality_metrics"]["sentinel_counts"]["precipitacion_mm"] == 2
+        assert "codigo" in columnar["quality_metrics"]["high_cardinality_cols"]
+        assert "evento_macro" not in columnar["quality_metrics"]["zero_variance_cols"]
+
+    @pytest.mark.parametrize("df", [
+        pd.DataFrame({"fecha": pd.to_datetime(["2023-01-01", None, "2023-01-01"]), "temperatura_media": [1.0, 1.0, 1.0]}),
+        pd.DataFrame({"fecha": pd.to_datetime(["2023-01-02"]), "temperatura_media": [np.nan], "tipo_lluvia": [None]}),
+        pd.DataFrame({"fecha": ["2023-01-01", "2023-01-03"], "es_dia_lluvioso": [-1, -1], "tipo_lluvia": ["b", "a"]}),
+    ], ids=["null_dates", "all_null_columns", "string_dates"])
+    def test_columnar_engine_matches_legacy_edge_cases(self, mock_config, df):
+        """Fechas nulas, columnas completamente nulas, fechas como texto y empates en el top-k."""
+        legacy = self._auditor(mock_config, "legacy").audit_dataframe(df, "clima")
+        columnar = self._auditor(mock_config, "columnar").audit_dataframe(df, "clima")
+
+        assert_reports_match(legacy, columnar)
+
+    def test_incremental_audit_matches_full_audit(self, mock_config, df_clima, tmp_path):
+        """El estado fusionable + el delta producen el mismo reporte que auditar la tabla completa."""
+        df = df_clima.iloc[:117]
+        history, full = df.iloc[:80], df.copy()
+        full.loc[100, "tipo_lluvia"] = "Granizo"  # categoría que solo aparece en el delta
+        state_path = str(tmp_path / "clima.audit.json")
+        auditor = self._auditor(mock_config, "columnar")
+        auditor.audit_dataframe(history, "clima", state_path=state_path, merge_stats={"inserted": 80, "updated": 0})
+
+        with patch.object(auditor.profiler, "summarize", wraps=auditor.profiler.summarize) as summarize:
+            incremental = auditor.audit_dataframe(full, "clima", state_path=state_path,
+                                                  merge_stats={"inserted": 37, "updated": 0})
+
+        assert len(summarize.call_args.args[0]) == 37
+        assert_reports_match(self._auditor(mock_config, "columnar").audit_dataframe(full, "clima"), incremental)
+        assert_reports_match(self._auditor(mock_config, "legacy").audit_dataframe(full, "clima"), incremental)
+
+    def test_incremental_audit_rebuilds_after_corrections(self, mock_config, df_clima, tmp_path):
+        """Filas actualizadas por el merge invalidan el estado: se audita la tabla completa."""
+        df = df_clima.iloc[:117]
+        state_path = str(tmp_path / "clima.audit.json")
+        auditor = self._auditor(mock_config, "columnar")
+        auditor.audit_dataframe(df.iloc[:80], "clima", state_path=state_path, merge_stats={"inserted": 80})
+        corrected = df.copy()
+        corrected.loc[5, "precipitacion_mm"] = 1.5
+
+        with patch.object(auditor.profiler, "summarize", wraps=auditor.profiler.summarize) as summarize:
+            report = auditor.audit_dataframe(corrected, "clima", state_path=state_path,
+                                             merge_stats={"inserted": 37, "updated": 1})
+
+        assert len(summarize.call_args.args[0]) == 117
+        assert report["quality_metrics"]["sentinel_counts"]["precipitacion_mm"] == 1
+
+    def test_compressed_state_keeps_moments_and_bounds_quantiles(self, mock_config, tmp_path):
+        """Por encima de max_distinct las numéricas se comprimen: media/min/max exactos, cuantiles aproximados."""
+        rng = np.random.default_rng(3)
+        df = pd.DataFrame({
+            "fecha": pd.date_range("2020-01-01", periods=2000, freq="D"),
+            "temperatura_media": rng.normal(24, 3, 2000)
+        })
+        state_path = str(tmp_path / "clima.audit.json")
+        auditor = self._auditor(mock_config, "columnar", max_distinct=64)
+        auditor.audit_dataframe(df.iloc[:1500], "clima", state_path=state_path, merge_stats={"inserted": 1500})
+
+        approx = auditor.audit_dataframe(df, "clima", state_path=state_path, merge_stats={"inserted": 500})
+        exact = self._auditor(mock_config, "columnar").audit_dataframe(df, "clima")
+
+        approx_stats = approx["statistical_profile"]["numeric"]["temperatura_media"]
+        exact_stats = exact["statistical_profile"]["numeric"]["temperatura_media"]
+        for stat in ["mean", "std", "min", "max"]:
+            assert approx_stats[stat] == pytest.approx(exact_stats[stat], rel=1e-9)
+        # Error de rango <= 1/max_distinct: el cuantil aproximado cae entre los cuantiles exactos vecinos
+        values = df["temperatura_media"]
+        for stat, q in [("p25", 0.25), ("p50", 0.5), ("p75", 0.75)]:
+            assert values.quantile(q - 1 / 64) <= approx_stats[stat] <= values.quantile(q + 1 / 64)
+
+    def test_sketched_table_matches_exact_profile_below_capacity(self, mock_config, df_clima):
+        """Con menos filas/valores que la capacidad de los sketches el perfil aproximado coincide con el exacto."""
+        sketches = {"tables": ["clima"], "heavy_hitters": 256}
+        exact = self._auditor(mock_config, "legacy").audit_dataframe(df_clima, "clima")
+        approx = self._auditor(mock_config, "legacy", sketches=sketches).audit_dataframe(df_clima, "clima")
+
+        approximation = approx["statistical_profile"].pop("approximation")
+        assert_reports_match(exact, approx)
+        assert approximation["temperatura_media"]["quantiles_exact"] is True
+        assert approximation["codigo"]["top_count_max_error"] == 0
+
+    def test_sketched_incremental_audit_stays_within_error_bounds(self, mock_config, tmp_path):
+        """Los sketches se fusionan delta a delta con memoria acotada y cotas de error documentadas."""
+        rng = np.random.default_rng(3)
+        n = 20000
+        df = pd.DataFrame({
+            "fecha": np.repeat(pd.date_range("2020-01-01", periods=n // 20, freq="D"), 20),
+            "temperatura_media": rng.normal(24, 3, n),
+            "codigo": [f"C{i}" for i in rng.zipf(1.3, n)]
+        })
+        state_path = str(tmp_path / "clima.audit.json")
+        auditor = self._auditor(mock_config, "columnar", sketches={"tables": ["clima"], "quantile_k": 100})
+        auditor.audit_dataframe(df.iloc[:12000], "clima", state_path=state_path, merge_stats={"inserted": 12000})
+        report = auditor.audit_dataframe(df, "clima", state_path=state_path, merge_stats={"inserted": 8000, "updated": 0})
+
+        stats = report["statistical_profile"]["numeric"]["temperatura_media"]
+        values = np.sort(df["temperatura_media"].to_numpy())
+        for q in ["p25", "p50", "p75"]:
+            rank = np.searchsorted(values, stats[q]) / n
+            assert rank == pytest.approx(int(q[1:]) / 100, abs=0.033)
+        assert stats["mean"] == pytest.approx(df["temperatura_media"].mean())
+        assert stats["min"] == df["temperatura_media"].min()
+
+        categorical = report["statistical_profile"]["categorical"]["codigo"]
+        error = report["statistical_profile"]["approximation"]["codigo"]["top_count_max_error"]
+        exact_counts = df["codigo"].value_counts()
+        assert categorical["mode"] == exact_counts.index[0]
+        for value, count in categorical["top_values"].items():
+            assert exact_counts[value] <= count <= exact_counts[value] + error
+        assert categorical["unique_count"] == pytest.approx(df["codigo"].nunique(), rel=3 * 0.0163)
+
+    def test_drift_accumulates_deltas_and_flags_shifted_columns(self, mock_config, tmp_path):
+        """El delta se compara con el perfil histórico (bins fijos) al reunir min_rows filas nuevas."""
+        rng = np.random.default_rng(5)
+        n = 400
+        df = pd.DataFrame({
+            "fecha": pd.date_range("2022-01-01", periods=n, freq="D"),
+            "temperatura_media": rng.normal(24, 3, n),
+            "precipitacion_mm": rng.exponential(4, n),
+            "tipo_lluvia": rng.choice(["Ninguna", "Ligera", "Fuerte"], n)
+        })
+        shifted = df.iloc[-40:].index
+        df.loc[shifted, "temperatura_media"] += 6
+        df.loc[shifted[::2], "tipo_lluvia"] = "N/A"
+        drift_path = str(tmp_path / "clima.drift.json")
+        mock_config["extractions"]["audit"] = {"drift": {"enabled": True, "min_rows": 30}}
+        with patch("src.utils.auditor.load_config", return_value=mock_config):
+            auditor = DataAuditor()
+
+        baseline = auditor.audit_dataframe(df.iloc[:360], "clima", drift_path=drift_path)["drift"]
+        accumulating = auditor.audit_dataframe(df.iloc[:380], "clima", drift_path=drift_path)["drift"]
+        evaluated = auditor.audit_dataframe(df, "clima", drift_path=drift_path)["drift"]
+        unchanged = auditor.audit_dataframe(df, "clima", drift_path=drift_path)["drift"]
+
+        assert baseline["status"] == "baseline" and baseline["history_rows"] == 360
+        assert accumulating["status"] == "accumulating" and accumulating["pending_rows"] == 20
+        assert evaluated["status"] == "evaluated" and evaluated["evaluated_rows"] == 40
+        assert evaluated["flagged_columns"] == ["temperatura_media", "tipo_lluvia"]
+        assert evaluated["columns"]["temperatura_media"]["ks"] > evaluated["columns"]["temperatura_media"]["ks_critical"]
+        assert not evaluated["columns"]["precipitacion_mm"]["flagged"]
+        assert unchanged["status"] == "no_new_rows" and unchanged["history_rows"] == 400
+
+    def test_business_rules_report_counts_and_sample_dates(self, mock_config):
+        """Las reglas declarativas reproducen los Puntos 15-17 y no negatividad, con muestra de fechas."""
+        mock_config["extractions"]["schemas"]["ventas"] = {
+            "fecha": "datetime", "unidades_totales": "int", "unidades_pagas": "int",
+            "unidades_bonificadas": "int", "es_promocion": "int"
+        }
+        df = pd.DataFrame({
+            "fecha": pd.date_range("2024-04-01", periods=6, freq="D"),
+            "unidades_totales": [10, 20, 8, 12, -1, 6],
+            "unidades_pagas": [5, 10, 8, 6, 0, np.nan],
+            "unidades_bonificadas": [5, 10, 0, 4, 0, 3],
+            "es_promocion": [1, 1, 0, 1, 0, 0]
+        })
+
+        report = self._auditor(mock_config, "columnar").audit_dataframe(df, "ventas")["business_rules_validation"]
+
+        assert report["details"] == [
+            "Columna 'unidades_totales': 1 valores negativos detectados.",
+            "Punto 15: 1 filas donde pagas != bonificadas en promoción.",
+            "Punto 17: 1 inconsistencias entre 'es_promocion' y 'unidades_bonificadas'.",
+            "Punto 16: 3 filas donde la suma de unidades no coincide con el total."
+        ]
+        assert report["violations_count"] == 4
+        assert report["rules"]["punto_16"] == {
+            "violations": 3, "sample_dates": ["2024-04-04", "2024-04-05", "2024-04-06"]
+        }
+        # Un NaN viola la igualdad (Punto 16) pero no la desigualdad de no negatividad
+        assert "negativos:unidades_pagas" not in report["rules"]
+
+    def test_business_rules_from_config(self, mock_config):
+        """Una regla nueva en config.yaml se evalúa sin cambios de código; las no evaluables se omiten."""
+        mock_config["extractions"]["business_rules"] = {
+            "clima": {"rules": [
+                {"id": "lluvia", "check": "implies(es_dia_lluvioso == 1, precipitacion_mm > 0)",
+                 "message": "Lluvia sin precipitación: {count} días."},
+                {"id": "viento", "check": "viento_kmh >= 0"}
+            ]}
+        }
+        df = pd.DataFrame({
+            "fecha": pd.date_range("2024-01-01", periods=3, freq="D"),
+            "precipitacion_mm": [0.0, 2.5, 0.0],
+            "es_dia_lluvioso": [1, 1, 0]
+        })
+
+        report = self._auditor(mock_config, "columnar").audit_dataframe(df, "clima")["business_rules_validation"]
+
+        assert report["details"] == ["Lluvia sin precipitación: 1 días."]
+        assert report["rules"] == {"lluvia": {"violations": 1, "sample_dates": ["2024-01-01"]}}
+
+    def test_unknown_engine_raises(self, mock_config):
+        with pytest.raises(ValueError, match="Motor de auditoría"):
+            self._auditor(mock_config, "spark")
@@ -0,0 +1,81 @@
+import pytest
+import numpy as np
+import pandas as pd
+from src.utils.config_loader import load_config
+from src.utils.cleaning_plan import CleaningPlan, DEFAULT_CLEANING_PLAN, compile_cleaning_plans
+
+
+class TestCleaningPlan:
+    """
+    Suite de pruebas unitarias para el plan de limpieza declarativo de la Fase 02.
+    """
+
+    def test_config_replicates_default_plan(self):
+        """config.yaml declara explícitamente el plan histórico."""
+        assert load_config()["preprocessing"]["cleaning_plan"] == DEFAULT_CLEANING_PLAN
+
+    def test_adjacent_steps_are_fused(self):
+        plan = compile_cleaning_plans({})["marketing"]
+        groups = plan._groups(plan.stages["after_reindex"])
+        assert [len(group) for group in groups] == [1, 4]
+
+    def test_input_columns_skip_derived_and_imputed(self):
+        """Las columnas derivadas antes de leerse y las imputadas no se exigen a la fuente (proyección)."""
+        plans = compile_cleaning_plans({})
+        assert "ventas_reales_totales" not in plans["inventario"].input_columns
+        assert "demanda_teorica_total" in plans["inventario"].input_columns
+        assert set(plans["clima"].input_columns) == {"es_dia_lluvioso", "tipo_lluvia"}
+
+    def test_expression_group_reads_updated_columns(self):
+        """Un paso ve los valores escritos por los anteriores del mismo grupo (la caché se invalida)."""
+        plan = CleaningPlan.from_config("t", {"before_reindex": [
+            {"op": "derive", "column": "total", "expr": "a + b"},
+            {"op": "fix_where", "when": "total > 3", "set": {"a": "0"}, "count": "ajustes"},
+            {"op": "recompute", "column": "total", "expr": "a + b", "count": "corregidos"}
+        ]})
+        audit = {}
+        df, stats = plan.run(pd.DataFrame({"a": [1, 5, 2], "b": [1, 1, 1]}), "before_reindex", audit)
+
+        assert df["a"].tolist() == [1, 0, 2]
+        assert df["total"].tolist() == [2, 1, 3]
+        assert audit == {"ajustes": 1, "corregidos": 1}
+        assert [s["op"] for s in stats] == ["derive", "fix_where", "recompute"]
+
+    def test_fix_where_keeps_int_dtype_like_loc(self):
+        """`df.loc[mask, col] = valores` conserva int64 si los valores asignados son enteros exactos."""
+        plan = CleaningPlan.from_config("t", {"before_reindex": [
+            {"op": "fix_where", "when": "p == 1", "set": {"b": "a"}}
+        ]})
+        frame = pd.DataFrame({"p": [1, 0, 0], "a": [4.0, np.nan, 1.0], "b": [0, 0, 0]})
+        df, _ = plan.run(frame.copy(), "before_reindex", {})
+
+        expected = frame.copy()
+        expected.loc[expected["p"] == 1, "b"] = expected.loc[expected["p"] == 1, "a"]
+        pd.testing.assert_frame_equal(df, expected)
+
+    def test_imputations_and_required_columns(self):
+        plan = compile_cleaning_plans({})["clima"]
+        frame = pd.DataFrame({
+            "temperatura_media": [np.nan, 20.0, np.nan],
+            "tipo_lluvia": ["Fuerte", None, "Fuerte"],
+            "es_dia_lluvioso": [0, 0, 0]
+        })
+        df, stats = plan.run(frame, "after_reindex", {}, modes={"tipo_lluvia": "Ninguna"})
+
+        assert df["temperatura_media"].tolist() == [20.0, 20.0, 20.0]
+        assert df["tipo_lluvia"].tolist() == ["Fuerte", "Ninguna", "Fuerte"]
+        assert df["es_dia_lluvioso"].tolist() == [1, 0, 1]
+        assert stats[0]["rows"] == 2
+
+        with pytest.raises(KeyError):
+            compile_cleaning_plans({})["ventas"].run(pd.DataFrame({"fecha": []}), "before_reindex", {})
+
+    @pytest.mark.parametrize("spec", [
+        {"after_reindex": [{"op": "drop"}]},
+        {"after_reindex": [{"op": "impute", "columns": ["a"], "method": "interpolate"}]},
+        {"after_reindex": [{"op": "derive", "column": "a", "expr": "__import__('os')"}]},
+        {"despues": []}
+    ])
+    def test_invalid_plans_are_rejected(self, spec):
+        with pytest.raises(ValueError):
+            CleaningPlan.from_config("t", spec)
@@ -76,3 +76,32 @@ class TestDBConnector:
         DBConnector()
         # Verify load_dotenv was called without a specific path (default behavior)
         mock_load.assert_called_with()
+
+    @patch.dict(os.environ, {}, clear=True)
+    @patch("src.connectors.db_connector.load_dotenv")
+    def test_local_backend_without_credentials(self, mock_load, tmp_path):
+        """The local replay backend must work offline, without Supabase credentials."""
+        connector = DBConnector("local", local_path=str(tmp_path), latency_ms=0)
+        client = connector.get_client()
+        assert connector.backend_name == "local"
+        assert client is connector.get_client()
+
+    @patch.dict(os.environ, {"DB_BACKEND": "local"}, clear=True)
+    @patch("src.connectors.db_connector.load_dotenv")
+    def test_backend_from_env_var(self, mock_load, tmp_path):
+        """DB_BACKEND selects the backend when no explicit argument is given."""
+        connector = DBConnector(local_path=str(tmp_path))
+        assert connector.backend_name == "local"
+
+    @patch.dict(os.environ, {"DB_BACKEND": "local"}, clear=True)
+    @patch("src.connectors.db_connector.load_dotenv")
+    def test_env_var_overrides_config_backend(self, mock_load, tmp_path):
+        """DB_BACKEND takes precedence over the backend type coming from config.yaml."""
+        connector = DBConnector(default_backend="supabase", local_path=str(tmp_path))
+        assert connector.backend_name == "local"
+
+    @patch("src.connectors.db_connector.load_dotenv")
+    def test_unknown_backend(self, mock_load, mock_env_vars):
+        """An unsupported backend name fails fast."""
+        with pytest.raises(ValueError):
+            DBConnector("oracle")
@@ -0,0 +1,51 @@
+import pandas as pd
+from src.utils.explain import ExplainTrace, current_rss
+
+
+class TestExplainTrace:
+    """
+    Suite de pruebas unitarias para el plan de ejecución instrumentado de la Fase 02.
+    """
+
+    def test_nested_steps_with_metrics(self):
+        trace = ExplainTrace()
+        with trace.step("tabla", modo="full"):
+            with trace.step("sentinels") as node:
+                df = pd.DataFrame({"a": range(5)})
+                trace.describe(node, df, rows=2)
+            with trace.step("reindex"):
+                pass
+
+        assert len(trace.roots) == 1
+        root = trace.roots[0]
+        # Métricas primero, los hijos al final
+        assert list(root) == ["step", "seconds", "peak_rss_delta_bytes", "modo", "children"]
+        sentinels = root["children"][0]
+        assert sentinels["rows_touched"] == 2
+        assert sentinels["output_shape"] == [5, 1]
+        assert [child["step"] for child in root["children"]] == ["sentinels", "reindex"]
+        if current_rss() is not None:
+            assert sentinels["peak_rss_delta_bytes"] >= 0
+        # El hilo de muestreo termina al cerrar el último paso
+        assert trace._sampler is None
+
+    def test_disabled_is_noop(self):
+        trace = ExplainTrace(enabled=False)
+        with trace.step("tabla") as node:
+            trace.describe(node, pd.DataFrame({"a": [1]}), rows=1)
+        assert trace.roots == []
+        assert trace._sampler is None
+
+    def test_hotspots_sum_leaves_by_op(self):
+        roots = [
+            {"step": "ventas", "seconds": 1.0, "children": [
+                {"step": "sentinels", "seconds": 0.2},
+                {"step": "after_reindex", "seconds": 0.6, "children": [
+                    {"step": "impute(a)", "op": "impute:ffill_bfill", "seconds": 0.6}]}]},
+            {"step": "clima", "seconds": 1.0, "children": [
+                {"step": "sentinels", "seconds": 0.3},
+                {"step": "impute(b)", "op": "impute:ffill_bfill", "seconds": 0.1}]}
+        ]
+        hotspots = ExplainTrace.hotspots(roots, limit=1)
+        assert hotspots == [{"step": "impute:ffill_bfill", "seconds": 0.7, "share": 0.35}]
+        assert [entry["step"] for entry in ExplainTrace.hotspots(roots)] == ["impute:ffill_bfill", "sentinels"]
@@ -1,5 +1,7 @@
 import pytest
 import os
+import glob
+import json
 import pandas as pd
 from unittest.mock import MagicMock, patch, mock_open
 from src.loader import DataLoader
@@ -27,6 +29,21 @@ class TestDataLoader:
             }
         }
 
+    @patch("src.loader.load_config")
+    @patch("src.loader.DBConnector")
+    @patch("src.loader.DataAuditor")
+    @patch("os.makedirs")
+    def test_loader_config_reaches_auditor_and_backend(self, mock_makedirs, mock_auditor, mock_db, mock_load_config, mock_config):
+        """El auditor usa el mismo config que el loader y el tipo de backend del config es solo el valor por defecto."""
+        mock_config["extractions"]["backend"] = {"type": "local", "local_path": "data/00_replay"}
+        mock_load_config.return_value = mock_config
+
+        DataLoader("custom.yaml")
+
+        mock_load_config.assert_called_once_with("custom.yaml")
+        mock_auditor.assert_called_once_with("custom.yaml")
+        mock_db.assert_called_once_with(default_backend="local", local_path="data/00_replay")
+
     @patch("src.loader.load_config")
     @patch("src.loader.DBConnector")
     @patch("src.loader.DataAuditor")
@@ -48,8 +65,9 @@ class TestDataLoader:
         # Mock de auditoría
         loader.auditor.audit_dataframe = MagicMock(return_value={"status": "ok", "violations_count": 0})
         
-        # Mock de guardado de Parquet y Reporte
+        # Mock de guardado de Parquet (temporal + reemplazo atómico) y Reporte
         with patch("pandas.DataFrame.to_parquet") as mock_parquet, \
+             patch("src.utils.raw_store.os.replace"), \
              patch("src.loader.save_report") as mock_save:
             
             results = loader.run_extraction()
@@ -152,3 +170,457 @@ class TestDataLoader:
         mock_load_config.return_value = mock_config
         DataLoader()
         assert mock_makedirs.called
+
+    @patch("src.loader.load_config")
+    @patch("src.loader.DBConnector")
+    @patch("os.makedirs")
+    def test_run_extraction_concurrent_matches_sequential(self, mock_makedirs, mock_db, mock_load_config, mock_config, tmp_path):
+        """El modo concurrente debe producir las mismas métricas y auditorías que el modo secuencial."""
+        mock_config["general"]["data_raw_path"] = str(tmp_path)
+        mock_load_config.return_value = mock_config
+        frames = {
+            "ventas": pd.DataFrame({"fecha": pd.to_datetime(["2023-01-01", "2023-01-02"]), "unidades": [10, 12]}),
+            "clima": pd.DataFrame({"fecha": pd.to_datetime(["2023-01-01", "2023-01-02"]), "temp": [25.5, 24.0]})
+        }
+
+        reports = {}
+        for mode in ["sequential", "concurrent"]:
+            for table in frames:
+                if os.path.exists(tmp_path / f"{table}.parquet"):
+                    os.remove(tmp_path / f"{table}.parquet")
+            mock_config["extractions"]["execution"] = {"mode": mode, "max_workers": 2, "audit_workers": 2}
+            loader = DataLoader()
+            loader._fetch_table = MagicMock(side_effect=lambda table, last_date=None: frames[table].copy())
+            with patch("src.loader.save_report"):
+                reports[mode] = loader.run_extraction()
+
+        sequential, concurrent = reports["sequential"], reports["concurrent"]
+        assert concurrent["metrics"] == sequential["metrics"]
+        assert concurrent["metrics"]["successful_extractions"] == 2
+        assert list(concurrent["table_audits"]) == ["ventas", "clima"]
+        for table in frames:
+            assert concurrent["table_audits"][table]["audit_details"]["shape"] == sequential["table_audits"][table]["audit_details"]["shape"]
+            assert concurrent["timings"]["tables"][table]["total_seconds"] >= 0
+        assert concurrent["timings"]["execution_mode"] == "concurrent"
+
+    @patch("src.loader.load_config")
+    @patch("src.loader.DBConnector")
+    @patch("os.makedirs")
+    def test_fetch_table_keyset_pagination(self, mock_makedirs, mock_db, mock_load_config, mock_config):
+        """La paginación keyset avanza por cursor de fecha sin partir una fecha entre páginas."""
+        mock_config["extractions"]["pagination"] = {"mode": "keyset", "page_size": 3}
+        mock_load_config.return_value = mock_config
+        loader = DataLoader()
+
+        mock_client = MagicMock()
+        mock_db.return_value.get_client.return_value = mock_client
+        first_page = mock_client.table.return_value.select.return_value.order.return_value.limit.return_value
+        first_page.execute.return_value.data = [
+            {"fecha": "2023-01-01", "unidades": 1},
+            {"fecha": "2023-01-02", "unidades": 2},
+            {"fecha": "2023-01-03", "unidades": 3}
+        ]
+        # La fecha frontera (2023-01-03) se vuelve a pedir completa con gte
+        first_page.gte.return_value.execute.return_value.data = [
+            {"fecha": "2023-01-03", "unidades": 3},
+            {"fecha": "2023-01-04", "unidades": 4}
+        ]
+
+        df = loader._fetch_table("ventas")
+
+        assert df["unidades"].tolist() == [1, 2, 3, 4]
+        first_page.gte.assert_called_once_with("fecha", "2023-01-03")
+        mock_client.table.return_value.select.return_value.range.assert_not_called()
+
+    @patch("src.loader.load_config")
+    @patch("src.loader.DBConnector")
+    @patch("os.makedirs")
+    def test_fetch_table_sharded_full_extraction(self, mock_makedirs, mock_db, mock_load_config, mock_config):
+        """La extracción completa por shards cubre todo el rango y reensambla en orden cronológico."""
+        mock_config["extractions"]["sharding"] = {"enabled": True, "shards": 3, "max_workers": 3}
+        mock_load_config.return_value = mock_config
+        loader = DataLoader()
+
+        days = pd.date_range("2023-01-01", "2023-01-10", freq="D").strftime("%Y-%m-%d").tolist()
+        loader._fetch_date_bounds = MagicMock(return_value=(days[0], days[-1]))
+
+        def fake_range(client, table, mode, page_size, lower, lower_inclusive=False, upper=None, stage=None):
+            rows = [{"fecha": d, "unidades": i} for i, d in enumerate(days) if d >= lower and (upper is None or d < upper)]
+            return [loader._decode_page(rows, table)], 1
+
+        loader._fetch_range = MagicMock(side_effect=fake_range)
+        df = loader._fetch_table("ventas")
+
+        assert loader._fetch_range.call_count == 3
+        assert df["unidades"].tolist() == list(range(10))
+        assert df["fecha"].is_monotonic_increasing
+
+    def test_plan_shards_contiguous(self):
+        """Los shards son contiguos, no se solapan y el último queda abierto."""
+        shards = DataLoader._plan_shards("2023-01-01", "2023-01-10", 4)
+        assert shards[0][0] == "2023-01-01"
+        assert shards[-1][1] is None
+        for (_, upper), (lower, _) in zip(shards, shards[1:]):
+            assert upper == lower
+        assert len(DataLoader._plan_shards("2023-01-01", "2023-01-02", 8)) == 2
+
+    @patch("src.loader.load_config")
+    @patch("os.makedirs")
+    def test_fetch_table_modes_against_local_backend(self, mock_makedirs, mock_load_config, mock_config, tmp_path):
+        """Offset, keyset y shards devuelven los mismos registros contra la réplica local."""
+        days = pd.date_range("2020-01-01", periods=2500, freq="D")
+        pd.DataFrame({"fecha": days, "unidades": range(len(days))}).to_parquet(tmp_path / "ventas.parquet", index=False)
+        mock_config["extractions"]["backend"] = {"type": "local", "local_path": str(tmp_path), "max_rows": 1000}
+        mock_load_config.return_value = mock_config
+
+        frames = {}
+        for name, overrides in {
+            "offset": {"pagination": {"mode": "offset", "page_size": 1000}},
+            "keyset": {"pagination": {"mode": "keyset", "page_size": 1000}},
+            "sharded": {"pagination": {"mode": "keyset", "page_size": 1000}, "sharding": {"enabled": True, "shards": 4}}
+        }.items():
+            loader = DataLoader()
+            loader.extraction_config.update(overrides)
+            frames[name] = loader._fetch_table("ventas")
+
+        assert len(frames["offset"]) == 2500
+        pd.testing.assert_frame_equal(frames["offset"], frames["keyset"])
+        pd.testing.assert_frame_equal(frames["offset"], frames["sharded"])
+        incremental = DataLoader()._fetch_table("ventas", last_date=pd.Timestamp("2026-10-01"))
+        assert incremental["fecha"].min() == pd.Timestamp("2026-10-02")
+
+    @patch("src.loader.load_config")
+    @patch("src.loader.DBConnector")
+    @patch("os.makedirs")
+    def test_fetch_table_decodes_pages_with_contract_types(self, mock_makedirs, mock_db, mock_load_config, mock_config):
+        """Las páginas se decodifican con los tipos del contrato: nulos no degradan un int ni un float entero a object."""
+        mock_load_config.return_value = mock_config
+        loader = DataLoader()
+
+        mock_client = MagicMock()
+        mock_db.return_value.get_client.return_value = mock_client
+        mock_exec = MagicMock()
+        mock_exec.data = [
+            {"fecha": "2023-01-01", "temp": 25},
+            {"fecha": "2023-01-02", "temp": None},
+            {"fecha": "2023-01-03", "temp": 24.5}
+        ]
+        mock_client.table.return_value.select.return_value.range.return_value.execute.return_value = mock_exec
+
+        df = loader._fetch_table("clima")
+
+        assert str(df["fecha"].dtype) == "datetime64[ns]"
+        assert str(df["temp"].dtype) == "float64"
+        assert df["temp"].isna().sum() == 1
+
+        # Un valor que no respeta el contrato se conserva con el tipo inferido (lo reporta el auditor)
+        page = loader._decode_page([{"fecha": "2023-01-01", "unidades": "diez"}], "ventas")
+        assert str(page.schema.field("unidades").type) == "string"
+        assert str(loader._decode_page([{"fecha": "2023-01-01", "unidades": 10.0}], "ventas").schema.field("unidades").type) == "int64"
+        # Columna fuera de contrato (tipo inferido) y claves ausentes en algunas filas (nulos)
+        page = loader._decode_page([{"fecha": "2023-01-01", "unidades": 3, "canal": "web"},
+                                    {"fecha": "2023-01-02", "canal": "tienda"}], "ventas")
+        assert page.column_names == ["fecha", "unidades", "canal"]
+        assert str(page.schema.field("fecha").type) == "timestamp[ns]"
+        assert page.column("unidades").to_pylist() == [3, None]
+        assert page.column("canal").to_pylist() == ["web", "tienda"]
+
+    @patch("src.loader.load_config")
+    @patch("src.loader.DBConnector")
+    @patch("os.makedirs")
+    def test_fetch_table_sends_projected_select(self, mock_makedirs, mock_db, mock_load_config, mock_config):
+        """Con proyección por contrato se envía la lista explícita de columnas en lugar de '*'."""
+        mock_config["extractions"]["projection"] = {"mode": "contract"}
+        mock_load_config.return_value = mock_config
+        loader = DataLoader()
+
+        mock_client = MagicMock()
+        mock_db.return_value.get_client.return_value = mock_client
+        mock_exec = MagicMock()
+        mock_exec.data = [{"fecha": "2023-01-01", "unidades": 10}]
+        mock_client.table.return_value.select.return_value.range.return_value.execute.return_value = mock_exec
+
+        loader._fetch_table("ventas")
+
+        mock_client.table.return_value.select.assert_called_with("fecha,unidades")
+
+    @patch("src.loader.load_config")
+    def test_projection_never_drops_persisted_columns(self, mock_load_config, mock_config, tmp_path):
+        """Con proyección, el raw reescrito conserva las columnas no solicitadas; la vista auditada es la proyectada."""
+        replay, raw = tmp_path / "replay", tmp_path / "raw"
+        replay.mkdir()
+        raw.mkdir()
+        days = pd.date_range("2023-01-01", periods=6, freq="D")
+        source = pd.DataFrame({"fecha": days, "unidades": range(6), "canal": ["web"] * 6})
+        source.iloc[:4].to_parquet(raw / "ventas.parquet", index=False)
+        source.loc[3, "unidades"] = 30  # Corrección dentro de la ventana de backfill
+        source.to_parquet(replay / "ventas.parquet", index=False)
+        mock_config["general"].update({"data_raw_path": str(raw), "outputs_path": str(tmp_path / "outputs")})
+        mock_config["extractions"].update({
+            "backend": {"type": "local", "local_path": str(replay)},
+            "projection": {"mode": "contract"},
+            "backfill_days": 1
+        })
+        mock_load_config.return_value = mock_config
+
+        result = DataLoader()._extract_table("ventas")
+
+        assert result["status"] == "success"
+        assert list(result["df_final"].columns) == ["fecha", "unidades"]
+        persisted = pd.read_parquet(raw / "ventas.parquet")
+        assert persisted["unidades"].tolist() == [0, 1, 2, 30, 4, 5]
+        assert persisted["canal"].tolist()[:4] == ["web"] * 4
+        assert persisted["canal"].isna().tolist()[4:] == [True, True]
+
+    @patch("src.loader.load_config")
+    def test_extraction_resumes_from_checkpoint(self, mock_load_config, mock_config, tmp_path):
+        """Tras un fallo a mitad de paginación el reintento solo pide las páginas faltantes y limpia el staging."""
+        from src.connectors.local_backend import LocalQuery
+
+        replay = tmp_path / "replay"
+        replay.mkdir()
+        days = pd.date_range("2020-01-01", periods=2500, freq="D")
+        pd.DataFrame({"fecha": days, "unidades": range(len(days))}).to_parquet(replay / "ventas.parquet", index=False)
+        mock_config["general"].update({"data_raw_path": str(tmp_path / "raw"), "outputs_path": str(tmp_path / "outputs")})
+        mock_config["extractions"].update({
+            "backend": {"type": "local", "local_path": str(replay), "max_rows": 1000},
+            "pagination": {"mode": "keyset", "page_size": 1000},
+            "checkpoint": {"enabled": True}
+        })
+        mock_load_config.return_value = mock_config
+        loader = DataLoader()
+        client = loader.db.get_client()
+
+        original_execute = LocalQuery.execute
+        calls = {"count": 0}
+
+        def flaky_execute(query):
+            calls["count"] += 1
+            if calls["count"] == 3:
+                raise ConnectionError("conexión reiniciada")
+            return original_execute(query)
+
+        with patch.object(LocalQuery, "execute", flaky_execute):
+            failed = loader._extract_table("ventas")
+        assert failed["status"] == "error"
+        assert (tmp_path / "raw" / "_staging" / "ventas" / "full" / "_checkpoint.json").exists()
+
+        requests_before = client.requests
+        result = loader._extract_table("ventas")
+
+        assert result["status"] == "success"
+        assert client.requests - requests_before == 1
+        assert result["df_final"]["unidades"].tolist() == list(range(2500))
+        assert not (tmp_path / "raw" / "_staging" / "ventas").exists()
+
+    @patch("src.loader.load_config")
+    def test_failed_raw_write_keeps_previous_file_and_checkpoint(self, mock_load_config, mock_config, tmp_path):
+        """Un fallo a mitad de la reescritura del raw no trunca el Parquet vigente ni descarta el staging."""
+        replay = tmp_path / "replay"
+        replay.mkdir()
+        days = pd.date_range("2023-01-01", periods=40, freq="D")
+        pd.DataFrame({"fecha": days[:30], "unidades": range(30)}).to_parquet(replay / "ventas.parquet", index=False)
+        mock_config["general"].update({"data_raw_path": str(tmp_path / "raw"), "outputs_path": str(tmp_path / "outputs")})
+        mock_config["extractions"].update({
+            "backend": {"type": "local", "local_path": str(replay)},
+            "checkpoint": {"enabled": True}
+        })
+        mock_load_config.return_value = mock_config
+        assert DataLoader()._extract_table("ventas")["status"] == "success"
+        raw_file = tmp_path / "raw" / "ventas.parquet"
+        pd.DataFrame({"fecha": days, "unidades": range(40)}).to_parquet(replay / "ventas.parquet", index=False)
+
+        def torn_write(df, path, *args, **kwargs):
+            # Escritura interrumpida: quedan solo los bytes de cabecera
+            with open(path, "wb") as f:
+                f.write(b"PAR1")
+            raise OSError("disco lleno")
+
+        # Loader nuevo por corrida: el backend local cachea la tabla de replay
+        with patch.object(pd.DataFrame, "to_parquet", torn_write):
+            failed = DataLoader()._extract_table("ventas")
+
+        assert failed["status"] == "error"
+        assert pd.read_parquet(raw_file)["unidades"].tolist() == list(range(30))
+        assert not [name for name in os.listdir(tmp_path / "raw") if name.endswith(".tmp")]
+        checkpoints = glob.glob(str(tmp_path / "raw" / "_staging" / "ventas" / "*" / "_checkpoint.json"))
+        assert len(checkpoints) == 1
+        with open(checkpoints[0], encoding="utf-8") as f:
+            assert json.load(f)
+
+        result = DataLoader()._extract_table("ventas")
+        assert result["status"] == "success"
+        assert pd.read_parquet(raw_file)["unidades"].tolist() == list(range(40))
+        assert not (tmp_path / "raw" / "_staging" / "ventas").exists()
+
+    @patch("src.loader.load_config")
+    def test_preflight_skips_unchanged_tables(self, mock_load_config, mock_config, tmp_path):
+        """Una corrida sin cambios en la fuente solo sondea cada tabla y reutiliza la auditoría previa."""
+        replay = tmp_path / "replay"
+        replay.mkdir()
+        days = pd.date_range("2023-01-01", periods=30, freq="D")
+        pd.DataFrame({"fecha": days, "unidades": range(30)}).to_parquet(replay / "ventas.parquet", index=False)
+        pd.DataFrame({"fecha": days, "temp": [20.5] * 30}).to_parquet(replay / "clima.parquet", index=False)
+        mock_config["general"].update({"data_raw_path": str(tmp_path / "raw"), "outputs_path": str(tmp_path / "outputs")})
+        mock_config["extractions"].update({
+            "backend": {"type": "local", "local_path": str(replay)},
+            "preflight": {"enabled": True}
+        })
+        mock_load_config.return_value = mock_config
+
+        first = DataLoader().run_extraction()
+        assert first["metrics"]["skipped_unchanged"] == 0
+
+        loader = DataLoader()
+        client = loader.db.get_client()
+        loader.auditor.audit_dataframe = MagicMock()
+        second = loader.run_extraction()
+
+        assert second["metrics"]["skipped_unchanged"] == 2
+        assert second["metrics"]["successful_extractions"] == 2
+        assert client.requests == 2
+        loader.auditor.audit_dataframe.assert_not_called()
+        assert second["table_audits"]["ventas"]["audit_details"] == first["table_audits"]["ventas"]["audit_details"]
+
+        # Una fila nueva en la fuente vuelve a activar la extracción de esa tabla
+        pd.DataFrame({"fecha": pd.date_range("2023-01-01", periods=31, freq="D"), "unidades": range(31)}) \
+            .to_parquet(replay / "ventas.parquet", index=False)
+        third = DataLoader().run_extraction()
+        assert third["metrics"]["skipped_unchanged"] == 1
+        assert third["metrics"]["total_rows_extracted"] == 1
+
+    @pytest.mark.parametrize("overrides", [
+        {"pagination": {"mode": "keyset", "page_size": 1000}},
+        {"pagination": {"mode": "offset", "page_size": 1000}},
+        {"pagination": {"mode": "keyset", "page_size": 1000}, "sharding": {"enabled": True, "shards": 4},
+         "checkpoint": {"enabled": True}}
+    ])
+    @patch("src.loader.load_config")
+    def test_run_extraction_async_matches_sequential(self, mock_load_config, mock_config, tmp_path, overrides):
+        """El modo async (cliente con pool de conexiones + escritor con cola acotada) produce los mismos datos."""
+        replay = tmp_path / "replay"
+        replay.mkdir()
+        days = pd.date_range("2020-01-01", periods=2500, freq="D")
+        pd.DataFrame({"fecha": days, "unidades": range(len(days))}).to_parquet(replay / "ventas.parquet", index=False)
+        pd.DataFrame({"fecha": days[:40], "temp": [20.5] * 40}).to_parquet(replay / "clima.parquet", index=False)
+        mock_config["extractions"].update(overrides)
+        mock_config["extractions"]["backend"] = {"type": "local", "local_path": str(replay), "max_rows": 1000}
+        mock_load_config.return_value = mock_config
+
+        frames = {}
+        for mode in ["sequential", "async"]:
+            mock_config["general"].update({
+                "data_raw_path": str(tmp_path / mode / "raw"),
+                "outputs_path": str(tmp_path / mode / "outputs")
+            })
+            mock_config["extractions"]["execution"] = {"mode": mode, "writer_queue_size": 2, "audit_workers": 1}
+            report = DataLoader().run_extraction()
+            assert report["metrics"]["successful_extractions"] == 2
+            assert report["metrics"]["total_rows_extracted"] == 2540
+            frames[mode] = pd.read_parquet(tmp_path / mode / "raw" / "ventas.parquet")
+
+        pd.testing.assert_frame_equal(frames["sequential"], frames["async"])
+        assert not (tmp_path / "async" / "raw" / "_staging" / "ventas").exists()
+
+    @patch("src.loader.load_config")
+    def test_async_failed_shard_cancels_siblings_before_close(self, mock_load_config, mock_config, tmp_path):
+        """Si un shard falla, los demás se cancelan y esperan antes de cerrar el cliente; la tabla queda en error."""
+        import asyncio
+        from src.connectors.async_client import LocalAsyncClient
+
+        replay = tmp_path / "replay"
+        replay.mkdir()
+        days = pd.date_range("2020-01-01", periods=2500, freq="D")
+        pd.DataFrame({"fecha": days, "unidades": range(len(days))}).to_parquet(replay / "ventas.parquet", index=False)
+        pd.DataFrame({"fecha": days[:40], "temp": [20.5] * 40}).to_parquet(replay / "clima.parquet", index=False)
+        mock_config["general"].update({"data_raw_path": str(tmp_path / "raw"), "outputs_path": str(tmp_path / "outputs")})
+        mock_config["extractions"].update({
+            "backend": {"type": "local", "local_path": str(replay), "max_rows": 100},
+            "pagination": {"mode": "keyset", "page_size": 100},
+            "sharding": {"enabled": True, "shards": 4},
+            "execution": {"mode": "async", "writer_queue_size": 1, "audit_workers": 1}
+        })
+        mock_load_config.return_value = mock_config
+
+        original_fetch = LocalAsyncClient.fetch
+        state = {"calls": 0, "in_flight": 0, "at_close": None}
+
+        async def flaky_fetch(client, query):
+            state["calls"] += query.table == "ventas"
+            state["in_flight"] += 1
+            try:
+                if query.table == "ventas" and state["calls"] == 8:
+                    raise ConnectionError("conexión reiniciada")
+                if query.table == "ventas" and state["calls"] > 8:
+                    await asyncio.sleep(0.05)  # Shards hermanos todavía descargando tras el fallo
+                return await original_fetch(client, query)
+            finally:
+                state["in_flight"] -= 1
+
+        async def recording_close(client):
+            # Fetches en vuelo y tareas pendientes (ej. bloqueadas en la cola del escritor) al cerrar el cliente
+            state["at_close"] = state["in_flight"] + len(asyncio.all_tasks() - {asyncio.current_task()})
+
+        with patch.object(LocalAsyncClient, "fetch", flaky_fetch), patch.object(LocalAsyncClient, "aclose", recording_close):
+            report = DataLoader().run_extraction()
+
+        assert state["at_close"] == 0
+        assert report["metrics"]["successful_extractions"] == 1
+        assert report["table_audits"]["ventas"]["status"] == "error"
+
+    @patch("src.loader.load_config")
+    def test_backfill_window_picks_up_corrections(self, mock_load_config, mock_config, tmp_path):
+        """La ventana de backfill re-descarga los últimos días y el reporte separa insertadas/actualizadas/sin cambios."""
+        replay = tmp_path / "replay"
+        replay.mkdir()
+        days = pd.date_range("2023-01-01", periods=30, freq="D")
+        pd.DataFrame({"fecha": days, "unidades": range(30)}).to_parquet(replay / "ventas.parquet", index=False)
+        mock_config["general"].update({"data_raw_path": str(tmp_path / "raw"), "outputs_path": str(tmp_path / "outputs")})
+        mock_config["extractions"].update({
+            "tables": ["ventas"],
+            "backend": {"type": "local", "local_path": str(replay)},
+            "backfill_days": 3
+        })
+        mock_load_config.return_value = mock_config
+        DataLoader().run_extraction()
+
+        # La fuente corrige el penúltimo día y agrega uno nuevo
+        units = list(range(30)) + [30]
+        units[28] = 999
+        pd.DataFrame({"fecha": pd.date_range("2023-01-01", periods=31, freq="D"), "unidades": units}) \
+            .to_parquet(replay / "ventas.parquet", index=False)
+        report = DataLoader().run_extraction()
+
+        assert report["table_audits"]["ventas"]["merge_stats"] == {"inserted": 1, "updated": 1, "unchanged": 2}
+        assert report["metrics"]["rows_updated"] == 1
+        df = pd.read_parquet(tmp_path / "raw" / "ventas.parquet")
+        assert df["unidades"].tolist() == units
+        assert df["fecha"].is_monotonic_increasing
+
+    @patch("src.utils.auditor.load_config")
+    @patch("src.loader.load_config")
+    def test_drift_flags_surface_in_phase_report(self, mock_load_config, mock_auditor_config, mock_config, tmp_path):
+        """Las filas nuevas con otra distribución marcan la columna en `drift_flags` del reporte de la fase."""
+        replay = tmp_path / "replay"
+        replay.mkdir()
+        days = pd.date_range("2023-01-01", periods=120, freq="D")
+        units = [10 + i % 7 for i in range(90)] + [40 + i % 7 for i in range(30)]
+        mock_config["general"].update({"data_raw_path": str(tmp_path / "raw"), "outputs_path": str(tmp_path / "outputs")})
+        mock_config["extractions"].update({
+            "tables": ["ventas"],
+            "backend": {"type": "local", "local_path": str(replay)},
+            "audit": {"drift": {"enabled": True, "min_rows": 30}}
+        })
+        mock_load_config.return_value = mock_auditor_config.return_value = mock_config
+
+        pd.DataFrame({"fecha": days[:90], "unidades": units[:90]}).to_parquet(replay / "ventas.parquet", index=False)
+        first = DataLoader().run_extraction()
+        pd.DataFrame({"fecha": days, "unidades": units}).to_parquet(replay / "ventas.parquet", index=False)
+        second = DataLoader().run_extraction()
+
+        assert first["table_audits"]["ventas"]["audit_details"]["drift"]["status"] == "baseline"
+        drift = second["table_audits"]["ventas"]["audit_details"]["drift"]
+        assert drift["status"] == "evaluated" and drift["evaluated_rows"] == 30
+        assert second["drift_flags"] == {"ventas": ["unidades"]}
+        assert second["metrics"]["tables_with_drift"] == 1
+        assert (tmp_path / "raw" / "ventas.drift.json").exists()
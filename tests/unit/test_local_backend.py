@@ -0,0 +1,77 @@
+import time
+import asyncio
+import pytest
+import pandas as pd
+from src.connectors.local_backend import LocalReplayBackend, LocalReplayClient
+from src.connectors.async_client import AsyncRangeQuery
+
+class TestLocalReplayBackend:
+    """
+    Unit tests for the offline replay backend: it must honour the PostgREST query surface used by DataLoader.
+    """
+
+    @pytest.fixture
+    def replay_dir(self, tmp_path):
+        df = pd.DataFrame({
+            "fecha": pd.date_range("2023-01-01", periods=10, freq="D"),
+            "unidades": range(10),
+            "tipo": ["a", None] * 5
+        })
+        df.to_parquet(tmp_path / "ventas.parquet", index=False)
+        return tmp_path
+
+    def test_range_and_filters(self, replay_dir):
+        """range() is inclusive and date filters accept ISO strings, like Supabase."""
+        client = LocalReplayClient(str(replay_dir))
+        data = client.table("ventas").select("*").gt("fecha", "2023-01-03").range(0, 2).execute().data
+        assert [row["fecha"] for row in data] == ["2023-01-04", "2023-01-05", "2023-01-06"]
+        assert data[0]["tipo"] is None
+        assert isinstance(data[0]["unidades"], int)
+
+    def test_order_limit_projection_and_count(self, replay_dir):
+        """Descending order, limit, column projection and exact count."""
+        response = LocalReplayClient(str(replay_dir)).table("ventas") \
+            .select("fecha", count="exact").lt("fecha", "2023-01-08").order("fecha", desc=True).limit(1).execute()
+        assert response.data == [{"fecha": "2023-01-07"}]
+        assert response.count == 7
+
+    def test_max_rows_cap(self, replay_dir):
+        """Responses are capped like the server-side max-rows setting."""
+        client = LocalReplayClient(str(replay_dir), max_rows=4)
+        assert len(client.table("ventas").select("*").range(0, 999).execute().data) == 4
+
+    def test_latency_injection(self, replay_dir):
+        """Each request sleeps the configured latency."""
+        client = LocalReplayClient(str(replay_dir), latency_ms=30)
+        start = time.perf_counter()
+        client.table("ventas").select("*").execute()
+        client.table("ventas").select("*").execute()
+        assert time.perf_counter() - start >= 0.06
+        assert client.requests == 2
+
+    def test_missing_table_and_directory(self, replay_dir, tmp_path):
+        """Unknown tables and directories fail explicitly."""
+        with pytest.raises(FileNotFoundError):
+            LocalReplayClient(str(replay_dir)).table("clima").select("*").execute()
+        with pytest.raises(FileNotFoundError):
+            LocalReplayBackend(str(tmp_path / "missing")).create_client()
+
+    def test_async_client_overlaps_latency(self, tmp_path):
+        """The async client overlaps the simulated round trips up to the connection pool size."""
+        days = pd.date_range("2023-01-01", periods=10, freq="D")
+        pd.DataFrame({"fecha": days, "unidades": range(10)}).to_parquet(tmp_path / "ventas.parquet", index=False)
+        client = LocalReplayBackend(str(tmp_path), latency_ms=100).create_async_client(max_connections=4)
+        query = AsyncRangeQuery("ventas", "fecha,unidades", limit=3, lower="2023-01-05", upper="2023-01-09")
+
+        async def fetch_many():
+            return await asyncio.gather(*(client.fetch(query) for _ in range(4)))
+
+        start = time.perf_counter()
+        pages = asyncio.run(fetch_many())
+
+        assert time.perf_counter() - start < 0.3
+        assert [row["fecha"] for row in pages[0]] == ["2023-01-06", "2023-01-07", "2023-01-08"]
+        assert query.to_params() == [
+            ("select", "fecha,unidades"), ("order", "fecha.asc"),
+            ("fecha", "gt.2023-01-05"), ("fecha", "lt.2023-01-09"), ("limit", "3")
+        ]
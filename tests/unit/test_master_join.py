@@ -0,0 +1,70 @@
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pytest
+from src.utils.master_join import CalendarJoiner
+
+
+def _table(start, periods, **cols):
+    data = {"fecha": pd.date_range(start, periods=periods, freq="D")}
+    data.update({name: values for name, values in cols.items()})
+    return pa.Table.from_pandas(pd.DataFrame(data), preserve_index=False)
+
+
+class TestCalendarJoiner:
+    """
+    Suite de pruebas unitarias para la unión del maestro sobre el calendario diario compartido.
+    """
+
+    def _tables(self):
+        return {
+            "ventas": _table("2023-01-01", 10, unidades=np.arange(10), promo=[0, 1] * 5),
+            "clima": _table("2023-01-03", 10, temperatura=np.linspace(18.0, 22.0, 10),
+                            tipo_lluvia=["Ninguna", "Fuerte"] * 5),
+            "finanzas": _table("2022-12-30", 8, precio=[1000.0] * 8)
+        }
+
+    def test_matches_chained_inner_merge(self):
+        """Mismo maestro (valores, dtypes y orden de columnas) que los `pd.merge` encadenados."""
+        tables = self._tables()
+        master, coverage = CalendarJoiner().join(tables)
+
+        frames = [table.to_pandas() for table in tables.values()]
+        expected = frames[0]
+        for frame in frames[1:]:
+            expected = pd.merge(expected, frame, on="fecha", how="inner")
+        pd.testing.assert_frame_equal(master.to_pandas(), expected)
+        assert coverage["start"] == "2023-01-03"
+        assert coverage["end"] == "2023-01-06"
+        assert coverage["shared_dates"] == 4
+        assert coverage["tables"]["ventas"]["rows_outside_range"] == 6
+
+    def test_gaps_inside_common_range_use_intersection(self):
+        tables = self._tables()
+        clima = tables["clima"].to_pandas()
+        tables["clima"] = pa.Table.from_pandas(clima.drop(index=[1]).sample(frac=1, random_state=0),
+                                               preserve_index=False)
+        master, coverage = CalendarJoiner().join(tables)
+
+        assert pd.Series(master.column("fecha").to_numpy()).dt.strftime("%Y-%m-%d").tolist() == [
+            "2023-01-03", "2023-01-05", "2023-01-06"]
+        assert master.column("temperatura").to_pylist() == clima["temperatura"].iloc[[0, 2, 3]].tolist()
+        assert coverage["calendar_gaps"] == 1
+        assert coverage["tables"]["ventas"]["rows_not_shared"] == 1
+
+    def test_column_collision_raises(self):
+        tables = self._tables()
+        tables["marketing"] = _table("2023-01-01", 5, precio=[1.0] * 5)
+        with pytest.raises(ValueError, match="precio"):
+            CalendarJoiner().join(tables)
+
+    def test_disjoint_ranges_raise(self):
+        tables = {"a": _table("2023-01-01", 3, x=[1, 2, 3]), "b": _table("2024-01-01", 3, y=[1, 2, 3])}
+        with pytest.raises(ValueError):
+            CalendarJoiner().join(tables)
+
+    def test_duplicate_dates_raise(self):
+        frame = pd.DataFrame({"fecha": pd.to_datetime(["2023-01-02", "2023-01-01", "2023-01-02"]), "x": [1, 2, 3]})
+        tables = {"a": pa.Table.from_pandas(frame, preserve_index=False), "b": _table("2023-01-01", 3, y=[1, 2, 3])}
+        with pytest.raises(ValueError, match="repetidas"):
+            CalendarJoiner().join(tables)
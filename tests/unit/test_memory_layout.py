@@ -0,0 +1,49 @@
+import numpy as np
+import pandas as pd
+from src.utils.memory_layout import CompactLayout
+
+
+class TestCompactLayout:
+    """
+    Suite de pruebas unitarias para el esquema compacto del master.
+    """
+
+    def _frame(self):
+        rows = 40
+        return pd.DataFrame({
+            "tipo_lluvia": ["Ninguna", "Fuerte", "Ligera", "Ninguna"] * (rows // 4),
+            "texto_unico": [f"id_{i}" for i in range(rows)],
+            "es_promocion": [0, 1] * (rows // 2),
+            "unidades": np.arange(rows) * 1000,
+            "grande": [2 ** 40] * rows,
+            "temperatura_media": np.linspace(15.0, 25.0, rows),
+            "trm": np.linspace(3800.0, 4200.0, rows)
+        }, index=pd.date_range("2023-01-01", periods=rows, freq="D", name="fecha"))
+
+    def test_dtypes_and_values(self):
+        df = self._frame()
+        result, report = CompactLayout(float32=["temperatura_media"]).compact(df)
+
+        assert isinstance(result["tipo_lluvia"].dtype, pd.CategoricalDtype)
+        assert result["texto_unico"].dtype == object
+        assert result["es_promocion"].dtype == np.int8
+        assert result["unidades"].dtype == np.int32
+        assert result["grande"].dtype == np.int64
+        assert result["temperatura_media"].dtype == np.float32
+        assert result["trm"].dtype == np.float64
+        assert report["columns"]["es_promocion"] == "int64 -> int8"
+        assert report["memory_bytes"]["after"] < report["memory_bytes"]["before"]
+        pd.testing.assert_frame_equal(result.astype(df.dtypes.to_dict()), df)
+
+    def test_roundtrip_through_parquet(self, tmp_path):
+        result, _ = CompactLayout(float32="all").compact(self._frame())
+        path = tmp_path / "master_data.parquet"
+        result.to_parquet(path, index=True)
+
+        pd.testing.assert_frame_equal(pd.read_parquet(path), result, check_freq=False)
+
+    def test_untouched_frame(self):
+        df = pd.DataFrame({"real": [1.5, 2.5], "bandera": [True, False]})
+        result, report = CompactLayout().compact(df)
+        assert report["columns"] == {}
+        pd.testing.assert_frame_equal(result, df)
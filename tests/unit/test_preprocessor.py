@@ -3,7 +3,9 @@ import pandas as pd
 import numpy as np
 import os
 import shutil
+from unittest.mock import patch
 from src.preprocessor import DataPreprocessor
+from src.utils.raw_store import RawStore
 
 class TestDataPreprocessor(unittest.TestCase):
     @classmethod
@@ -193,6 +195,224 @@ extractions:
         self.assertEqual(audit["index_name"], "fecha")
         self.assertEqual(audit["null_values_count"], 0)
 
+    def test_run_parallel_matches_sequential(self):
+        """El modo parallel produce el mismo reporte de fase y el mismo master que el secuencial."""
+        raw_dir = os.path.join(self.test_dir, "raw")
+        dates = pd.date_range("2023-01-01", periods=10, freq="D")
+        pd.DataFrame({
+            "fecha": dates, "unidades_totales": range(10), "unidades_pagas": [5, -999] * 5,
+            "unidades_bonificadas": [1] * 10, "es_promocion": [0, 1] * 5
+        }).to_parquet(os.path.join(raw_dir, "ventas.parquet"), index=False)
+        pd.DataFrame({
+            "fecha": dates, "temperatura_media": [20.0, np.nan] * 5,
+            "tipo_lluvia": ["Fuerte", "NULL"] * 5, "es_dia_lluvioso": [1, 0] * 5
+        }).to_parquet(os.path.join(raw_dir, "clima.parquet"), index=False)
+
+        reports = {}
+        try:
+            for mode in ["sequential", "parallel"]:
+                preprocessor = DataPreprocessor(config_path=self.config_path)
+                preprocessor.config["preprocessing"] = {"execution": {"mode": mode, "workers": 2}}
+                report = preprocessor.run()
+                report.pop("timestamp")
+                master = pd.read_parquet(os.path.join(self.test_dir, "cleansed/master_data.parquet"))
+                reports[mode] = (report, master)
+        finally:
+            for table in ["ventas", "clima"]:
+                os.remove(os.path.join(raw_dir, f"{table}.parquet"))
+
+        self.assertEqual(list(reports["parallel"][0]["table_reports"]), ["ventas", "clima"])
+        self.assertEqual(reports["sequential"][0], reports["parallel"][0])
+        pd.testing.assert_frame_equal(reports["sequential"][1], reports["parallel"][1])
+
+    def test_incremental_tail_matches_full_rebuild(self):
+        """La limpieza incremental (solo la cola + semilla de ffill) produce las mismas tablas y master que la completa."""
+        raw_dir = os.path.join(self.test_dir, "raw")
+        cleansed_dir = os.path.join(self.test_dir, "cleansed")
+        dates = pd.date_range("2023-01-01", periods=30, freq="D")
+        clima = pd.DataFrame({
+            "fecha": dates, "temperatura_media": [20.0, np.nan, 21.0, -999, 19.5, np.nan] * 5,
+            "tipo_lluvia": ["Fuerte", None, "Ninguna", "Ninguna", "NULL", "Ninguna"] * 5,
+            "es_dia_lluvioso": [1, 0] * 15
+        })
+        finanzas = pd.DataFrame({
+            "fecha": dates, "precio_unitario": [1000, np.nan, np.nan, 1100, np.nan] * 6,
+            "costo_unitario": [500.0, np.nan, 520.0, np.nan, np.nan] * 6,
+            "margen_bruto": [0.0] * 30, "porcentaje_margen": [0.0] * 30
+        })
+
+        def write_raw(rows):
+            # Fila 22 ausente en el raw: hueco que la reindexación debe cubrir con ffill desde la semilla
+            keep = [i for i in range(rows) if i != 22]
+            clima.iloc[keep].to_parquet(os.path.join(raw_dir, "clima.parquet"), index=False)
+            finanzas.iloc[keep].to_parquet(os.path.join(raw_dir, "finanzas.parquet"), index=False)
+
+        def run(incremental):
+            preprocessor = DataPreprocessor(config_path=self.config_path)
+            preprocessor.config["preprocessing"] = {"incremental": {"enabled": incremental, "verify": incremental}}
+            report = preprocessor.run()
+            tables = {t: pd.read_parquet(os.path.join(cleansed_dir, f"{t}.parquet")) for t in ["clima", "finanzas"]}
+            master = pd.read_parquet(os.path.join(cleansed_dir, "master_data.parquet"))
+            return report, tables, master
+
+        try:
+            write_raw(20)
+            first, _, _ = run(incremental=True)
+            self.assertEqual(first["table_reports"]["clima"]["mode"], "full")
+
+            write_raw(30)
+            report, tables, master = run(incremental=True)
+            for table in ["clima", "finanzas"]:
+                self.assertEqual(report["table_reports"][table]["mode"], "incremental")
+                self.assertEqual(report["table_reports"][table]["rows_reprocessed"], 9)
+                self.assertTrue(report["table_reports"][table]["verified"])
+
+            _, expected_tables, expected_master = run(incremental=False)
+            for table in ["clima", "finanzas"]:
+                pd.testing.assert_frame_equal(tables[table], expected_tables[table])
+            pd.testing.assert_frame_equal(master, expected_master)
+
+            # Sin filas nuevas la tabla limpia se conserva tal cual
+            run(incremental=True)
+            report, tables, _ = run(incremental=True)
+            self.assertEqual(report["table_reports"]["clima"]["rows_reprocessed"], 0)
+            pd.testing.assert_frame_equal(tables["clima"], expected_tables["clima"])
+        finally:
+            for table in ["clima", "finanzas"]:
+                os.remove(os.path.join(raw_dir, f"{table}.parquet"))
+                state_path = os.path.join(cleansed_dir, f"{table}.prep.json")
+                if os.path.exists(state_path):
+                    os.remove(state_path)
+
+    def test_incremental_modes_from_state_counts(self):
+        """La moda de la cola sale de los conteos del estado (filas deduplicadas) sin releer el histórico."""
+        raw_dir = os.path.join(self.test_dir, "raw")
+        cleansed_dir = os.path.join(self.test_dir, "cleansed")
+        dates = pd.date_range("2023-01-01", periods=60, freq="D")
+        clima = pd.DataFrame({
+            "fecha": dates, "temperatura_media": [20.0] * 60,
+            "tipo_lluvia": (["Fuerte"] * 8 + ["Ninguna"] * 10 + [None] * 2) + ["Ninguna"] * 10 + ["Fuerte"] * 30,
+            "es_dia_lluvioso": [1, 0] * 30
+        })
+        # Versiones anteriores de 5 fechas "Ninguna": en el raw sin deduplicar "Fuerte" sería la moda
+        stale = clima.iloc[8:13].assign(tipo_lluvia="Fuerte")
+
+        def write_raw(rows):
+            pd.concat([stale, clima.iloc[:rows]], ignore_index=True).to_parquet(
+                os.path.join(raw_dir, "clima.parquet"), index=False)
+
+        def run(incremental):
+            preprocessor = DataPreprocessor(config_path=self.config_path)
+            preprocessor.config["preprocessing"] = {"incremental": {"enabled": incremental}}
+            return preprocessor.run(), pd.read_parquet(os.path.join(cleansed_dir, "clima.parquet"))
+
+        try:
+            write_raw(20)
+            run(incremental=True)
+
+            write_raw(30)
+            with patch.object(RawStore, "read", autospec=True, side_effect=RawStore.read) as mock_read:
+                report, table = run(incremental=True)
+            self.assertEqual(report["table_reports"]["clima"]["mode"], "incremental")
+            self.assertTrue(all(call.kwargs.get("since") is not None for call in mock_read.call_args_list))
+            _, expected = run(incremental=False)
+            pd.testing.assert_frame_equal(table, expected)
+            self.assertEqual(table["tipo_lluvia"].iloc[18], "Ninguna")
+
+            # La cola cambia la moda: las filas ya imputadas quedarían con la moda anterior
+            run(incremental=True)
+            write_raw(60)
+            report, _ = run(incremental=True)
+            self.assertEqual(report["table_reports"]["clima"]["mode"], "full")
+        finally:
+            os.remove(os.path.join(raw_dir, "clima.parquet"))
+            state_path = os.path.join(cleansed_dir, "clima.prep.json")
+            if os.path.exists(state_path):
+                os.remove(state_path)
+
+    def test_streaming_matches_in_memory(self):
+        """La limpieza por lotes (corridas ordenadas + bordes de ffill/bfill) produce las mismas tablas, auditoría y master."""
+        raw_dir = os.path.join(self.test_dir, "raw")
+        cleansed_dir = os.path.join(self.test_dir, "cleansed")
+        dates = pd.date_range("2023-01-01", periods=30, freq="D")
+        # Desordenado, con huecos, fechas repetidas (la última versión gana) y filas idénticas repetidas
+        order = list(reversed(range(0, 30, 2))) + [i for i in range(1, 30, 2) if i != 21]
+        clima = pd.DataFrame({
+            "fecha": dates, "temperatura_media": [np.nan, np.nan, 21.0, -999, 19.5, np.nan] * 5,
+            "tipo_lluvia": [None, "Fuerte", "Ninguna", "Ninguna", "NULL", "Ninguna"] * 5,
+            "es_dia_lluvioso": [1, 0] * 15
+        }).iloc[order]
+        clima = pd.concat([clima, clima.iloc[[3, 7]], clima.iloc[[5]].assign(temperatura_media=30.0)], ignore_index=True)
+        ventas = pd.DataFrame({
+            "fecha": dates, "unidades_totales": range(30), "unidades_pagas": [5, -999, 7] * 10,
+            "unidades_bonificadas": [1] * 30, "es_promocion": [0, 1] * 15
+        }).iloc[order]
+        ventas = pd.concat([ventas, ventas.iloc[[0, 1]]], ignore_index=True)
+
+        def run(streaming):
+            preprocessor = DataPreprocessor(config_path=self.config_path)
+            preprocessor.config["preprocessing"] = {"streaming": {"enabled": streaming, "batch_rows": 4}}
+            report = preprocessor.run()
+            tables = {t: pd.read_parquet(os.path.join(cleansed_dir, f"{t}.parquet")) for t in ["clima", "ventas"]}
+            master = pd.read_parquet(os.path.join(cleansed_dir, "master_data.parquet"))
+            return report, tables, master
+
+        try:
+            clima.to_parquet(os.path.join(raw_dir, "clima.parquet"), index=False, row_group_size=5)
+            ventas.to_parquet(os.path.join(raw_dir, "ventas.parquet"), index=False, row_group_size=5)
+            report, tables, master = run(streaming=True)
+            expected_report, expected_tables, expected_master = run(streaming=False)
+        finally:
+            for table in ["clima", "ventas"]:
+                os.remove(os.path.join(raw_dir, f"{table}.parquet"))
+
+        for table in ["clima", "ventas"]:
+            table_report = report["table_reports"][table]
+            self.assertEqual(table_report["mode"], "streaming")
+            self.assertGreater(table_report["streaming"]["runs"], 1)
+            self.assertEqual(table_report["audit_log"], expected_report["table_reports"][table]["audit_log"])
+            pd.testing.assert_frame_equal(tables[table], expected_tables[table])
+        self.assertEqual(report["table_reports"]["clima"]["audit_log"]["exact_duplicates_removed"], 2)
+        pd.testing.assert_frame_equal(master, expected_master)
+        self.assertEqual([p for p in os.listdir(cleansed_dir) if "spill" in p], [])
+
+    def test_explain_tree_in_phase_report(self):
+        """Con `preprocessing.explain` el reporte trae el árbol de pasos por tabla y del merge, sin alterar la auditoría."""
+        raw_dir = os.path.join(self.test_dir, "raw")
+        dates = pd.date_range("2023-01-01", periods=10, freq="D")
+        pd.DataFrame({
+            "fecha": dates.delete(3), "temperatura_media": [20.0, np.nan, -999] * 3,
+            "tipo_lluvia": ["Fuerte", "NULL", "Ninguna"] * 3, "es_dia_lluvioso": [1, 0, 0] * 3
+        }).to_parquet(os.path.join(raw_dir, "clima.parquet"), index=False)
+
+        reports = {}
+        try:
+            for enabled in [True, False]:
+                preprocessor = DataPreprocessor(config_path=self.config_path)
+                preprocessor.config["preprocessing"] = {"explain": {"enabled": enabled}}
+                reports[enabled] = preprocessor.run()
+        finally:
+            os.remove(os.path.join(raw_dir, "clima.parquet"))
+
+        self.assertNotIn("explain", reports[False])
+        self.assertEqual(reports[True]["table_reports"], reports[False]["table_reports"])
+        explain = reports[True]["explain"]
+        table = explain["tables"]["clima"]
+        self.assertEqual(table["step"], "clima")
+        self.assertEqual([node["step"] for node in table["children"]], ["read_raw", "clean_table", "write_cleansed"])
+        steps = {node["step"]: node for node in table["children"][1]["children"]}
+        self.assertEqual(list(steps), ["sentinels", "exact_duplicates", "contract_columns", "date_dedup",
+                                       "before_reindex", "reindex", "after_reindex", "null_check"])
+        self.assertEqual(steps["sentinels"]["rows_touched"], 6)
+        self.assertEqual(steps["reindex"]["rows_touched"], 1)
+        self.assertEqual(steps["reindex"]["output_shape"], [10, 4])
+        self.assertIn("seconds", steps["reindex"])
+        self.assertIn("peak_rss_delta_bytes", steps["reindex"])
+        plan_ops = [node["op"] for node in steps["after_reindex"]["children"]]
+        self.assertIn("impute:mode", plan_ops)
+        self.assertIn("calendar_join", [node["step"] for node in explain["master_merge"]["children"]])
+        self.assertTrue(explain["hotspots"])
+
     # --- FLUJOS NO POSITIVOS (Abogado del Diablo) ---
 
     def test_clean_table_unknown_name(self):
@@ -226,6 +446,7 @@ extractions:
         
         self.assertTrue(pd.isna(df_clean.loc[1, "unidades_pagas"]))
         self.assertTrue(pd.isna(df_clean.loc[1, "es_promocion"]))
+        self.assertEqual(audit["sentinels_replaced"], {"unidades_pagas": 1, "es_promocion": 1})
 
     def test_merge_master_missing_files(self):
         """Verifica que el merge maestro falle o reporte error si faltan archivos físicos."""
@@ -0,0 +1,61 @@
+import pytest
+from src.utils.projection import ProjectionPlanner
+
+class TestProjectionPlanner:
+    """
+    Suite de pruebas unitarias para el planificador de proyección de columnas.
+    """
+
+    @pytest.fixture
+    def config(self):
+        return {
+            "extractions": {
+                "schemas": {
+                    "inventario": {
+                        "fecha": "datetime",
+                        "kit_recibido": "int",
+                        "buñuelos_preparados": "int",
+                        "demanda_teorica_total": "int"
+                    },
+                    "macroeconomia": {"fecha": "datetime", "smlv": "int", "trm": "float", "ipc_bruto": "float"}
+                },
+                "projection": {"mode": "consumed"}
+            },
+            "preprocessing": {"target_column": "demanda_teorica_total", "date_column": "fecha"},
+            "features": {
+                "drop_columns": ["kit_recibido", "buñuelos_preparados", "smlv", "trm", "ipc_bruto"],
+                "transformations": {"exogenous_lags": {"trm": 30}},
+                "simulation_ratios": {"asequibilidad": {"formula": "precio_unitario / (smlv / 30)"}}
+            }
+        }
+
+    def test_consumed_mode_prunes_only_unused_dropped_columns(self, config):
+        """Se podan columnas descartadas por FeatureEngineer que nada referencia antes."""
+        planner = ProjectionPlanner(config)
+
+        assert planner.columns("inventario") == ["fecha", "buñuelos_preparados", "demanda_teorica_total"]
+        # smlv (fórmula) y trm (lag exógeno) se conservan aunque estén en drop_columns
+        assert planner.columns("macroeconomia") == ["fecha", "smlv", "trm"]
+        assert planner.select_clause("macroeconomia") == "fecha,smlv,trm"
+
+    def test_modes_all_and_contract(self, config):
+        """`all` mantiene select('*'); `contract` pide exactamente el contrato."""
+        config["extractions"]["projection"]["mode"] = "all"
+        assert ProjectionPlanner(config).select_clause("inventario") == "*"
+
+        config["extractions"]["projection"]["mode"] = "contract"
+        planner = ProjectionPlanner(config)
+        assert planner.columns("inventario") == list(config["extractions"]["schemas"]["inventario"])
+        assert planner.columns("tabla_sin_contrato") is None
+
+    def test_exclude_consumed_column_fails(self, config):
+        """Excluir manualmente una columna consumida aguas abajo es un error de configuración."""
+        config["extractions"]["projection"]["exclude"] = {"inventario": ["demanda_teorica_total"]}
+        with pytest.raises(ValueError):
+            ProjectionPlanner(config)
+
+    def test_invalid_mode(self, config):
+        """Un modo desconocido debe fallar de forma explícita."""
+        config["extractions"]["projection"]["mode"] = "smart"
+        with pytest.raises(ValueError):
+            ProjectionPlanner(config)
@@ -0,0 +1,176 @@
+import os
+import glob
+import pytest
+import pandas as pd
+from unittest.mock import patch
+from src.utils.raw_store import RawStore, sorted_merge
+
+class TestRawStore:
+    """
+    Suite de pruebas unitarias para la capa de persistencia raw (layouts file y partitioned).
+    """
+
+    @pytest.fixture
+    def df_history(self):
+        return pd.DataFrame({
+            "fecha": pd.date_range("2023-01-30", "2023-02-02", freq="D"),
+            "unidades": [10, 11, 12, 13]
+        })
+
+    def test_file_layout_upsert_keeps_last(self, tmp_path, df_history):
+        """El layout file conserva el comportamiento histórico: concat + última versión por fecha."""
+        store = RawStore(str(tmp_path), layout="file")
+        store.upsert("ventas", df_history)
+        df_new = pd.DataFrame({"fecha": pd.to_datetime(["2023-02-02", "2023-02-03"]), "unidades": [99, 14]})
+
+        df_final = store.upsert("ventas", df_new, store.read("ventas"))
+
+        assert os.path.exists(tmp_path / "ventas.parquet")
+        assert len(df_final) == 5
+        assert df_final.loc[df_final["fecha"] == "2023-02-02", "unidades"].item() == 99
+
+    def test_partitioned_append_writes_only_delta_fragments(self, tmp_path, df_history):
+        """Un delta sin solapamiento se agrega como fragmento nuevo sin reescribir particiones previas."""
+        store = RawStore(str(tmp_path), layout="partitioned")
+        store.upsert("ventas", df_history)
+        january = glob.glob(str(tmp_path / "ventas" / "year=2023" / "month=01" / "part-*.parquet"))
+
+        store.upsert("ventas", pd.DataFrame({"fecha": pd.to_datetime(["2023-02-03"]), "unidades": [14]}))
+
+        assert glob.glob(str(tmp_path / "ventas" / "year=2023" / "month=01" / "part-*.parquet")) == january
+        assert len(glob.glob(str(tmp_path / "ventas" / "year=2023" / "month=02" / "part-*.parquet"))) == 2
+        df = store.read("ventas")
+        assert df["unidades"].tolist() == [10, 11, 12, 13, 14]
+        assert list(df.columns) == ["fecha", "unidades"]
+
+    def test_partitioned_overlap_compacts_partition(self, tmp_path, df_history):
+        """Un delta que corrige una fecha existente compacta solo su partición y prevalece la nueva versión."""
+        store = RawStore(str(tmp_path), layout="partitioned")
+        store.upsert("ventas", df_history)
+
+        df = store.upsert("ventas", pd.DataFrame({"fecha": pd.to_datetime(["2023-02-01"]), "unidades": [50]}))
+
+        assert len(glob.glob(str(tmp_path / "ventas" / "year=2023" / "month=02" / "part-*.parquet"))) == 1
+        assert df["unidades"].tolist() == [10, 11, 50, 13]
+        assert df["fecha"].is_unique
+
+    def test_partitioned_unifies_fragment_schemas(self, tmp_path, df_history):
+        """Fragmentos con int64 y double (delta con nulos) se leen con un esquema unificado."""
+        store = RawStore(str(tmp_path), layout="partitioned")
+        store.upsert("ventas", df_history)
+        store.upsert("ventas", pd.DataFrame({"fecha": pd.to_datetime(["2023-02-03"]), "unidades": [float("nan")]}))
+
+        df = store.read("ventas")
+
+        assert len(df) == 5
+        assert pd.isna(df["unidades"].iloc[-1])
+
+    def test_invalid_layout(self, tmp_path):
+        """Un layout desconocido debe fallar de forma explícita."""
+        with pytest.raises(ValueError):
+            RawStore(str(tmp_path), layout="delta_lake")
+
+    def test_high_water_mark_from_watermark_sidecar(self, tmp_path, df_history):
+        """Tras un upsert, el watermark se resuelve desde el sidecar sin leer datos."""
+        store = RawStore(str(tmp_path), layout="file")
+        store.upsert("ventas", df_history)
+
+        assert os.path.exists(store.watermark_path("ventas"))
+        with patch("pandas.read_parquet") as mock_read, patch("pyarrow.parquet.ParquetFile") as mock_file:
+            assert store.high_water_mark("ventas") == pd.Timestamp("2023-02-02")
+            mock_read.assert_not_called()
+            mock_file.assert_not_called()
+
+    def test_high_water_mark_from_footer_statistics(self, tmp_path, df_history):
+        """Sin sidecar (o con uno desactualizado) se usan las estadísticas del footer Parquet."""
+        df_history.to_parquet(tmp_path / "ventas.parquet", index=False)
+        store = RawStore(str(tmp_path), layout="file")
+
+        with patch("pandas.read_parquet") as mock_read:
+            assert store.high_water_mark("ventas") == pd.Timestamp("2023-02-02")
+            mock_read.assert_not_called()
+
+    def test_high_water_mark_partitioned_reads_last_partition(self, tmp_path, df_history):
+        """En el layout particionado el watermark sale de la última partición."""
+        store = RawStore(str(tmp_path), layout="partitioned")
+        store.upsert("ventas", df_history)
+        os.remove(store.watermark_path("ventas"))
+
+        assert store._watermark_candidates("ventas")[0].split(os.sep)[-2] == "month=02"
+        assert store.high_water_mark("ventas") == pd.Timestamp("2023-02-02")
+
+    def test_high_water_mark_falls_back_to_scan(self, tmp_path, df_history):
+        """Si el footer no trae estadísticas se escanea solo la columna de fecha."""
+        df_history.to_parquet(tmp_path / "ventas.parquet", index=False, write_statistics=False)
+        store = RawStore(str(tmp_path), layout="file")
+
+        assert store.high_water_mark("ventas") == pd.Timestamp("2023-02-02")
+
+    @pytest.mark.parametrize("layout", ["file", "partitioned"])
+    def test_read_with_column_projection(self, tmp_path, df_history, layout):
+        """La lectura proyectada decodifica solo las columnas pedidas y tolera columnas ausentes."""
+        store = RawStore(str(tmp_path), layout=layout)
+        store.upsert("ventas", df_history.assign(extra=1))
+
+        df = store.read("ventas", ["unidades", "no_existe"])
+
+        assert list(df.columns) == ["fecha", "unidades"]
+        assert len(df) == 4
+
+    @pytest.mark.parametrize("layout", ["file", "partitioned"])
+    def test_read_since_filters_rows_and_row_count(self, tmp_path, df_history, layout):
+        """`since` lee solo la cola de la tabla; `row_count` sale del sidecar o del footer sin leer datos."""
+        store = RawStore(str(tmp_path), layout=layout)
+        store.upsert("ventas", df_history)
+
+        df = store.read("ventas", ["unidades"], since=pd.Timestamp("2023-02-01"))
+
+        assert df["unidades"].tolist() == [12, 13]
+        assert store.row_count("ventas") == 4
+
+    def test_sorted_merge_counts_and_skips_identical_resend(self, tmp_path, df_history):
+        """El merge ordenado distingue filas nuevas, corregidas e idénticas; un re-envío idéntico no reescribe."""
+        store = RawStore(str(tmp_path), layout="file")
+        store.upsert("ventas", df_history)
+        mtime = os.stat(store.table_path("ventas")).st_mtime_ns
+
+        _, stats = store.merge("ventas", df_history.tail(2), store.read("ventas"))
+        assert stats == {"inserted": 0, "updated": 0, "unchanged": 2}
+        assert os.stat(store.table_path("ventas")).st_mtime_ns == mtime
+
+        delta = pd.DataFrame({"fecha": pd.to_datetime(["2023-02-03", "2023-01-31"]), "unidades": [14, 50]})
+        df, stats = store.merge("ventas", delta, store.read("ventas"))
+        assert stats == {"inserted": 1, "updated": 1, "unchanged": 0}
+        assert df["unidades"].tolist() == [10, 50, 12, 13, 14]
+        assert df["fecha"].is_monotonic_increasing
+
+    def test_partitioned_merge_reads_only_touched_partitions(self, tmp_path, df_history):
+        """El merge particionado no relee la tabla: watermark y filas salen del sidecar previo y del delta."""
+        store = RawStore(str(tmp_path), layout="partitioned")
+        store.upsert("ventas", df_history)
+        # Fechas repetidas dentro del delta: cuentan una sola vez, gana la última
+        delta = pd.DataFrame({"fecha": pd.to_datetime(["2023-03-01", "2023-03-02", "2023-03-02"]),
+                              "unidades": [20, 21, 22]})
+
+        with patch.object(RawStore, "read") as mock_read:
+            df_final, stats = store.merge("ventas", delta)
+            mock_read.assert_not_called()
+
+        assert df_final is None
+        assert stats == {"inserted": 2, "updated": 0, "unchanged": 0}
+        assert store.row_count("ventas") == 6
+        assert store.high_water_mark("ventas") == pd.Timestamp("2023-03-02")
+        assert store.read("ventas")["unidades"].tolist() == [10, 11, 12, 13, 20, 22]
+
+    def test_sorted_merge_keeps_columns_missing_from_delta(self, df_history):
+        """Una columna que el delta no trae (proyección) se conserva: valor previo en corregidas, nulo en nuevas."""
+        existing = df_history.assign(canal=["web", "tienda", "web", "tienda"])
+        delta = pd.DataFrame({"fecha": pd.to_datetime(["2023-01-31", "2023-02-03"]), "unidades": [50, 14]})
+
+        merged, stats = sorted_merge(existing, delta)
+
+        assert stats == {"inserted": 1, "updated": 1, "unchanged": 0}
+        assert list(merged.columns) == ["fecha", "unidades", "canal"]
+        assert merged["unidades"].tolist() == [10, 50, 12, 13, 14]
+        assert merged["canal"].tolist()[:4] == ["web", "tienda", "web", "tienda"]
+        assert pd.isna(merged["canal"].iloc[4])
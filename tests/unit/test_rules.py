@@ -0,0 +1,50 @@
+import pytest
+import numpy as np
+import pandas as pd
+from src.utils.rules import BusinessRule, RuleSet, parse_expression, negate
+
+class TestBusinessRules:
+    """
+    Suite de pruebas unitarias para el compilador de reglas de negocio declarativas.
+    """
+
+    @pytest.mark.parametrize("expression", [
+        "__import__('os').system('ls')",
+        "df.unidades > 0",
+        "unidades[0] > 0",
+        "unidades + 1",
+        "lambda: True",
+    ])
+    def test_rejects_unsafe_or_non_boolean_expressions(self, expression):
+        with pytest.raises(ValueError):
+            parse_expression(expression)
+
+    def test_negation_is_pushed_to_comparisons(self):
+        """not / implies / and / or se reescriben hasta comparaciones (De Morgan)."""
+        ir = parse_expression("implies(a == 1, b > 0) and not c < 2")
+        assert negate(ir) == ("or", (
+            ("and", (("cmp", "==", ("col", "a"), ("const", 1)), ("cmp", "<=", ("col", "b"), ("const", 0)))),
+            ("cmp", "<", ("col", "c"), ("const", 2))
+        ))
+
+    def test_rule_set_evaluates_shared_subexpressions_once(self):
+        """Las reglas de una tabla comparten subexpresiones y columnas materializadas."""
+        rule_set = RuleSet([
+            BusinessRule("r1", "implies(promo == 1, pagas == bonif)"),
+            BusinessRule("r2", "implies(promo == 1, bonif > 0)"),
+            BusinessRule("r3", "abs(total - (pagas + bonif)) <= 0.5 and 0 <= total <= 100"),
+        ])
+        df = pd.DataFrame({
+            "fecha": pd.date_range("2024-01-01", periods=4, freq="D"),
+            "promo": [1, 1, 0, 1],
+            "pagas": [2, 3, 1, np.nan],
+            "bonif": [2, 0, 0, 1],
+            "total": [4, 3.2, 150, 1]
+        })
+
+        results = rule_set.evaluate(df)
+
+        assert {rule: r["count"] for rule, r in results.items()} == {"r1": 2, "r2": 1, "r3": 1}
+        # El NaN de la fila 4 viola la igualdad de r1 pero no la desigualdad de r3
+        assert results["r1"]["sample_dates"] == ["2024-01-02", "2024-01-04"]
+        assert results["r3"]["sample_dates"] == ["2024-01-03"]
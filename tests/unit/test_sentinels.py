@@ -0,0 +1,54 @@
+import numpy as np
+import pandas as pd
+from src.utils.sentinels import SentinelReplacer
+
+SENTINELS = {
+    "numeric": [-999, 9999, -1],
+    "object": ["N/A", "NULL", ""],
+    "datetime": ["1900-01-01", "9999-12-31"]
+}
+
+
+class TestSentinelReplacer:
+    """
+    Suite de pruebas unitarias para el reemplazo de centinelas por dtype de columna.
+    """
+
+    def _frame(self):
+        return pd.DataFrame({
+            "entero": [1, -999, 3, 9999],
+            "real": [1.5, -1.0, np.nan, 2.0],
+            "texto": ["a", "N/A", "-999", ""],
+            "mixta": pd.Series([0, "NULL", 1, 2], dtype=object),
+            "objeto_entero": pd.Series([0, 1, 2, 3], dtype=object),
+            "fecha": pd.to_datetime(["2024-01-01", "1900-01-01", "2024-01-03", "2024-01-04"]),
+            "bandera": [True, False, True, True],
+            "categoria": pd.Series(["x", "N/A", "y", "x"], dtype="category")
+        })
+
+    def test_matches_legacy_replace(self):
+        """Mismo resultado (valores y dtypes) que `df.replace` con la lista plana original."""
+        replacer = SentinelReplacer(SENTINELS)
+        df = self._frame()
+        result, _ = replacer.replace(df)
+        pd.testing.assert_frame_equal(result, df.replace(replacer.all_values, np.nan))
+
+    def test_counts_per_column(self):
+        replacer = SentinelReplacer(SENTINELS)
+        _, counts = replacer.replace(self._frame())
+        assert counts == {"entero": 2, "real": 1, "texto": 3, "mixta": 1, "fecha": 1, "categoria": 1}
+
+    def test_datetime_sentinels_in_non_ns_units(self):
+        """9999-12-31 no cabe en datetime64[ns] pero sí en ms: se compara en la unidad de la columna."""
+        replacer = SentinelReplacer(SENTINELS)
+        values = np.array(["2024-01-01", "9999-12-31", "1900-01-01"], dtype="datetime64[ms]")
+        result, counts = replacer.replace(pd.DataFrame({"fecha": values}))
+        assert result["fecha"].isna().tolist() == [False, True, True]
+        assert counts == {"fecha": 2}
+
+    def test_untouched_frame_is_returned_as_is(self):
+        replacer = SentinelReplacer(SENTINELS)
+        df = pd.DataFrame({"entero": [1, 2], "texto": ["a", "b"]})
+        result, counts = replacer.replace(df)
+        assert result is df
+        assert counts == {}
@@ -0,0 +1,53 @@
+import pytest
+import numpy as np
+import pandas as pd
+from src.utils.sketches import KLLSketch, HyperLogLog, HeavyHitters
+
+class TestSketches:
+    """
+    Suite de pruebas unitarias para los sketches de perfilamiento aproximado (KLL, HyperLogLog, SpaceSaving).
+    """
+
+    def test_kll_rank_error_and_memory_are_bounded(self):
+        values = np.random.default_rng(0).lognormal(3, 1, 300000)
+        left, right = KLLSketch(200), KLLSketch(200)
+        left.update(values[:100000])
+        right.update(values[100000:])
+        merged = KLLSketch.from_dict(left.merge(right).to_dict())
+
+        items, weights = merged.sorted_view()
+        assert weights.sum() == len(values)
+        assert len(items) <= 3 * merged.k + KLLSketch.MIN_CAPACITY * len(merged.levels)
+        ordered, cumulative = np.sort(values), np.cumsum(weights)
+        for q in np.linspace(0.01, 0.99, 99):
+            estimate = items[np.searchsorted(cumulative, q * len(values))]
+            assert np.searchsorted(ordered, estimate) / len(values) == pytest.approx(q, abs=0.0165)
+
+    def test_kll_is_exact_below_capacity(self):
+        sketch = KLLSketch(200)
+        sketch.update(np.array([3.0, 1.0, 2.0, 2.0]))
+        items, weights = sketch.sorted_view()
+        assert items.tolist() == [1.0, 2.0, 2.0, 3.0] and weights.tolist() == [1, 1, 1, 1]
+
+    @pytest.mark.parametrize("cardinality", [7, 3000, 250000])
+    def test_hyperloglog_relative_error(self, cardinality):
+        values = np.random.default_rng(1).permutation(cardinality).astype("float64")
+        left, right = HyperLogLog(12), HyperLogLog(12)
+        left.update(values[::2])
+        right.update(values[1::2])
+        merged = HyperLogLog.from_dict(left.merge(right).to_dict())
+        assert merged.estimate() == pytest.approx(cardinality, rel=3 * merged.relative_error)
+
+    def test_heavy_hitters_bounds_hold_across_merges(self):
+        values = np.random.default_rng(2).zipf(1.5, 200000)
+        sketch = HeavyHitters(32)
+        for chunk in np.array_split(values, 7):
+            codes, uniques = pd.factorize(chunk)
+            sketch.update(np.asarray(uniques, dtype=object), np.bincount(codes))
+
+        exact = pd.Series(values).value_counts()
+        assert len(sketch.items) == 32
+        assert sketch.max_error <= len(values) / 32
+        for item, count, error in zip(sketch.items, sketch.counts, sketch.errors):
+            assert exact[item] <= count <= exact[item] + error
+        assert sketch.items[np.argmax(sketch.counts)] == exact.index[0]
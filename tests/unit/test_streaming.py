@@ -0,0 +1,66 @@
+import numpy as np
+import pandas as pd
+from src.utils.streaming import SortedRuns, ChunkStats, MemoryBudget
+
+
+class TestSortedRuns:
+    """
+    Suite de pruebas unitarias para la deduplicación por fecha fuera de memoria.
+    """
+
+    def test_merge_matches_in_memory_dedup(self, tmp_path):
+        """Corridas solapadas y desordenadas: última versión de cada fecha y mismos conteos que pandas."""
+        rng = np.random.default_rng(7)
+        rows = 300
+        df = pd.DataFrame({
+            "fecha": pd.Timestamp("2023-01-01") + pd.to_timedelta(rng.integers(0, 60, rows), unit="D"),
+            "valor": rng.integers(0, 3, rows),
+            "texto": rng.choice(["a", "b", None], rows)
+        })
+        df.loc[rng.random(rows) < 0.05, "fecha"] = pd.NaT
+
+        runs = SortedRuns(str(tmp_path))
+        for start in range(0, rows, 37):
+            batch = df.iloc[start:start + 37]
+            runs.add(batch, SortedRuns.row_hashes(batch))
+        merged = pd.concat(list(runs.merge(chunk_rows=16)), ignore_index=True)
+
+        deduped = df.drop_duplicates(keep="last")
+        expected = deduped.sort_values("fecha", kind="stable").groupby("fecha").tail(1).reset_index(drop=True)
+        pd.testing.assert_frame_equal(merged, expected)
+        assert runs.exact_duplicates == len(df) - len(deduped)
+        assert runs.duplicate_dates == len(deduped) - len(expected)
+
+    def test_row_hashes_ignore_int_float_and_null_kind(self):
+        """La misma fila coincide aunque un lote tenga la columna en float o nulos NaN en lugar de None."""
+        left = pd.DataFrame({"a": [1, 0], "b": pd.Series(["x", None], dtype=object)})
+        right = pd.DataFrame({"a": [1.0, np.nan], "b": pd.Series(["x", np.nan], dtype=object)})
+        left_hashes, right_hashes = SortedRuns.row_hashes(left), SortedRuns.row_hashes(right)
+        assert left_hashes[0] == right_hashes[0]
+        assert left_hashes[1] != right_hashes[1]
+
+
+class TestChunkStats:
+
+    def test_modes_and_lookahead(self):
+        stats = ChunkStats({"tipo": "Ninguna", "vacia": "N/A"})
+        stats.observe(pd.DataFrame({"tipo": ["b", None], "vacia": [None, None], "x": [np.nan, np.nan]}))
+        stats.observe(pd.DataFrame({"tipo": ["a", "a"], "vacia": [None, None], "x": [np.nan, 2.0]}))
+        stats.observe(pd.DataFrame({"tipo": ["b", None], "vacia": [None, None], "x": [3.0, np.nan]}))
+
+        # Empate a ↔ b: como Series.mode()[0], el menor
+        assert stats.modes() == {"tipo": "a", "vacia": "N/A"}
+        lookahead = stats.lookahead()
+        assert lookahead[0] == {"tipo": "a", "x": 2.0}
+        assert lookahead[1] == {"tipo": "b", "x": 3.0}
+        assert lookahead[2] == {}
+
+
+class TestMemoryBudget:
+
+    def test_batch_rows_from_sample(self):
+        sample = pd.DataFrame({"a": np.zeros(1000), "b": np.zeros(1000)})
+        budget = MemoryBudget(limit_mb=0.01, working_copies=4)
+        assert budget.batch_rows(sample) == MemoryBudget.MIN_BATCH_ROWS
+        assert MemoryBudget(limit_mb=64, working_copies=4).batch_rows(sample) == int(64 * 1024 * 1024 / (24 * 4))
+        assert MemoryBudget(limit_mb=64, batch_rows=10).batch_rows(sample) == 10